@@ -0,0 +1,148 @@
+# Eliminação de sub-rotinas e variáveis globais mortas
+#
+# O gerador emite o código de todas as functions/procedures declaradas e reserva uma
+# posição do gp (e, nos arrays, um bloco ALLOCN) para cada variável global, mesmo que
+# nada as use. alcancaveis() percorre o programa a partir do bloco principal, seguindo o
+# grafo de chamadas: uma sub-rotina é alcançável se é referida (chamada, ou lida sem
+# parêntesis) pelo bloco principal ou por uma sub-rotina alcançável, e uma variável
+# global está viva se é referida (lida ou escrita) nesse código. O gerador não regista
+# as restantes: as sub-rotinas mortas não são geradas e as variáveis vivas ficam com
+# posições do gp seguidas.
+#
+# Os nomes são comparados em minúsculas. Dentro de uma sub-rotina, os seus parâmetros e
+# declarações escondem as globais com o mesmo nome; as sub-rotinas declaradas dentro de
+# uma sub-rotina alcançável contam como alcançáveis. A análise é conservadora: qualquer
+# nome do código (exceto as strings literais) que coincida com uma global conta como
+# uma referência, e uma variável só escrita continua viva (a atribuição pode falhar ou
+# chamar sub-rotinas).
+#
+# As sub-rotinas expandidas em linha (ver expansao.py) não são geradas: as referidas pelo
+# código alcançável não contam como alcançáveis, mas os nomes usados pelo seu corpo sim.
+
+# Tags das declarações de sub-rotinas
+_ROTINAS = ('function', 'procedure')
+
+
+class Alcance:
+    """
+    Resultado de alcancaveis(programa).
+    Atributos:
+        subrotinas (frozenset): Nomes (em minúsculas) das sub-rotinas alcançáveis.
+        globais (frozenset): Nomes (em minúsculas) das variáveis globais vivas.
+    """
+    __slots__ = ('subrotinas', 'globais')
+
+    def __init__(self, subrotinas, globais):
+        self.subrotinas = frozenset(subrotinas)
+        self.globais = frozenset(globais)
+
+    def __repr__(self):
+        return f"Alcance({len(self.subrotinas)} sub-rotinas, {len(self.globais)} globais)"
+
+
+def _nomes_declarados(decls):
+    # Nomes (em minúsculas) declarados por uma lista de declarações
+    nomes = set()
+    for d in decls or ():
+        if type(d) is not tuple or not d:
+            continue
+        if d[0] in _ROTINAS:
+            nomes.add(d[1].lower())
+        elif d[0] == 'var_decl':
+            for item in d[1]:
+                nomes.update(nome.lower() for nome in item[1])
+        elif d[0] in ('consts', 'types'):
+            nomes.update(nome.lower() for nome, _ in d[1])
+    return nomes
+
+
+def _nomes_usados(no, ocultos, nomes):
+    # Acrescenta a 'nomes' as strings (em minúsculas) da subárvore 'no', exceto as de
+    # 'ocultos' e as das strings literais
+    pilha = [no]
+    while pilha:
+        atual = pilha.pop()
+        tipo = type(atual)
+        if tipo is str:
+            nome = atual.lower()
+            if nome not in ocultos:
+                nomes.add(nome)
+        elif tipo is list:
+            pilha.extend(atual)
+        elif tipo is tuple and atual and atual[0] != 'const':
+            pilha.extend(atual[1:])
+
+
+def _nomes_rotina(decl, ocultos, nomes):
+    # Acrescenta a 'nomes' os nomes exteriores usados pela sub-rotina 'decl' (e pelas
+    # sub-rotinas nela declaradas)
+    bloco = decl[-1]
+    if type(bloco) is not tuple or len(bloco) < 3:
+        return
+    locais = set(ocultos)
+    for param in decl[2] or ():
+        if type(param) is tuple and len(param) > 1:
+            locais.update(nome.lower() for nome in param[1])
+    locais |= _nomes_declarados(bloco[1])
+    _nomes_usados(bloco[2], locais, nomes)
+    for d in bloco[1] or ():
+        if type(d) is tuple and d and d[0] in _ROTINAS:
+            _nomes_rotina(d, locais, nomes)
+
+
+def alcancaveis(programa, expandidas=()):
+    """
+    Alcance das sub-rotinas e variáveis globais do nó 'program' 'programa'; 'expandidas'
+    são os nomes (em minúsculas) das sub-rotinas expandidas em linha.
+    """
+    bloco = programa[2]
+    rotinas = {}
+    globais = set()
+    for d in bloco[1] or ():
+        if type(d) is not tuple or not d:
+            continue
+        if d[0] in _ROTINAS:
+            rotinas.setdefault(d[1].lower(), d)
+        elif d[0] == 'var_decl':
+            for item in d[1]:
+                globais.update(nome.lower() for nome in item[1])
+
+    alcancadas = set()
+    percorridas = set()
+    vivas = set()
+    pendentes = []
+
+    def seguir(nomes):
+        for nome in nomes:
+            if nome in rotinas:
+                if nome not in percorridas:
+                    percorridas.add(nome)
+                    if nome not in expandidas:
+                        alcancadas.add(nome)
+                    pendentes.append(rotinas[nome])
+            elif nome in globais:
+                vivas.add(nome)
+
+    nomes = set()
+    _nomes_usados(bloco[2], frozenset(), nomes)
+    seguir(nomes)
+    while pendentes:
+        nomes = set()
+        _nomes_rotina(pendentes.pop(), frozenset(), nomes)
+        seguir(nomes)
+    return Alcance(alcancadas, vivas)
+
+
+def relatorio(subrotinas, globais):
+    """
+    Texto com o que a eliminação removeu: 'subrotinas' são os nomes das sub-rotinas não
+    geradas e 'globais' os pares (nome, tamanho do array ou None) das variáveis sem posição.
+    """
+    arrays = [tamanho for _, tamanho in globais if tamanho is not None]
+    linhas = [
+        f"Sub-rotinas removidas ({len(subrotinas)}): {', '.join(subrotinas) or '-'}",
+        f"Variáveis globais removidas ({len(globais)}): {', '.join(nome for nome, _ in globais) or '-'}",
+        f"Posições do gp poupadas: {len(globais)}; arrays não alocados: {len(arrays)} "
+        f"({sum(arrays)} elementos)",
+    ]
+    return '\n'.join(linhas)
@@ -1,4 +1,11 @@
+import io
+import os
 import sys
+import mmap
+import codecs
+import bisect
+import types
+from array import array
 import ply.lex as lex
 
 # Lista completa de tokens
@@ -281,6 +288,15 @@ def t_ID(t):
     r'[A-Za-z_][A-Za-z0-9_]*'
     return t
 
+# Identificadores no modo 'tabela': uma única regra para identificadores e
+# palavras-reservadas, classificadas depois por consulta à tabela (hash)
+def id_ou_palavra_reservada(t):
+    r'[A-Za-z_][A-Za-z0-9_]*'
+    tipo = palavras_reservadas.get(t.value.lower())
+    if tipo is not None and _isolada(t.lexer.lexdata, t.lexpos, t.lexpos + len(t.value)):
+        t.type = tipo
+    return t
+
 # Comentários: { ... } ou (* ... *)
 def t_COMMENT(t):
     r'\{[^}]*\}|\(\*([^*]|\*+[^*)])*\*+\)'
@@ -299,5 +315,369 @@ def t_error(t):
     print(f"Carácter ilegal '{t.value[0]}' na linha {t.lexer.lineno}")
     t.lexer.skip(1)
 
-def build_lexer(**kwargs):
-    return lex.lex(module=sys.modules[__name__], **kwargs)
\ No newline at end of file
+# Tabela de palavras-reservadas (em minúsculas) usada pelo modo 'tabela'.
+# Cobre também TIPO e BOOLEAN, tal como as funções t_TIPO e t_BOOLEAN acima.
+palavras_reservadas = {
+    'integer': 'TIPO', 'real': 'TIPO', 'boolean': 'TIPO', 'char': 'TIPO',
+    'true': 'BOOLEAN', 'false': 'BOOLEAN',
+}
+for _tok in tokens[2:tokens.index('ID')]:
+    palavras_reservadas[_tok.lower()] = _tok
+del _tok
+
+# As regras por palavra-reservada usam '\b', que também considera letras
+# Unicode (ex.: 'é') como parte da palavra. Para produzir exatamente os mesmos
+# tokens, só se aceita a palavra-reservada se estiver isolada dessa forma.
+def _isolada(dados, inicio, fim):
+    if inicio > 0:
+        c = dados[inicio - 1]
+        if c.isalnum() or c == '_':
+            return False
+    if fim < len(dados):
+        c = dados[fim]
+        if c.isalnum() or c == '_':
+            return False
+    return True
+
+# Modos disponíveis:
+#   'regras' - uma função t_<PALAVRA> por palavra-reservada (comportamento original)
+#   'tabela' - uma única regra de identificadores + tabela 'palavras_reservadas'
+MODOS_LEXER = ('regras', 'tabela')
+
+def _regras_tabela():
+    modulo = sys.modules[__name__]
+    regras = {'__file__': __file__}
+    for nome in dir(modulo):
+        if nome.startswith('t_') and nome[2:] in palavras_reservadas.values():
+            continue
+        regras[nome] = getattr(modulo, nome)
+    regras['t_ID'] = id_ou_palavra_reservada
+    return types.SimpleNamespace(**regras)
+
+def build_lexer(modo='regras', **kwargs):
+    if modo == 'regras':
+        return lex.lex(module=sys.modules[__name__], **kwargs)
+    if modo == 'tabela':
+        return lex.lex(module=_regras_tabela(), **kwargs)
+    raise ValueError(f"Modo de lexer desconhecido: '{modo}' (esperado um de {MODOS_LEXER})")
+
+
+# Sinaliza que o lexer chegou ao fim da janela a meio de um token (ex.: comentário
+# ou string ainda por fechar) e precisa de mais texto para decidir
+class _FaltamDados(Exception):
+    def __init__(self, posicao):
+        self.posicao = posicao
+
+
+class StreamingLexer:
+    """
+    Lexer que lê o código-fonte diretamente de um ficheiro mapeado em memória (mmap),
+    produzindo os tokens à medida que o parser os pede.
+
+    Em vez de carregar o ficheiro inteiro numa string, o texto é descodificado em blocos
+    para uma janela deslizante sobre a qual corre o lexer PLY. Quando um token termina
+    demasiado perto do fim da janela (podendo estar truncado), ou quando um comentário
+    ou string ainda não fechou, a janela é recarregada a partir do início desse token.
+    A memória usada depende assim do tamanho do bloco e não do tamanho do ficheiro.
+
+    A contagem de linhas continua a ser feita por t_newline, de forma incremental, e
+    'lexpos' é devolvido como posição absoluta (em caracteres) no ficheiro.
+    As mudanças de linha são normalizadas como em open(..., 'r') ('\\r\\n' -> '\\n').
+    """
+    TAMANHO_BLOCO = 1 << 16
+    # Tokens que terminem a menos de MARGEM caracteres do fim da janela são relidos
+    MARGEM = 256
+
+    def __init__(self, caminho, lexer=None, modo='regras', tamanho_bloco=None):
+        self.lexer = lexer if lexer is not None else build_lexer(modo)
+        self.tamanho_bloco = tamanho_bloco or self.TAMANHO_BLOCO
+        # Interceta os erros léxicos para distinguir "falta texto" de erro real
+        self._erro_original = self.lexer.lexerrorf
+        self.lexer.lexerrorf = self._erro
+        self._ficheiro = open(caminho, 'rb')
+        tamanho = os.fstat(self._ficheiro.fileno()).st_size
+        self._mapa = mmap.mmap(self._ficheiro.fileno(), 0, access=mmap.ACCESS_READ) if tamanho else None
+        self._tamanho = tamanho
+        self._pos_bytes = 0
+        self._descodificador = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder('utf-8')(), translate=True)
+        self._base = 0      # posição (em caracteres) do início da janela no ficheiro
+        self._fim = False   # True quando já todo o ficheiro foi descodificado
+        self.lexer.input(self._ler_bloco())
+
+    @property
+    def lineno(self):
+        return self.lexer.lineno
+
+    @property
+    def lexpos(self):
+        return self._base + self.lexer.lexpos
+
+    def _ler_bloco(self):
+        fim = min(self._pos_bytes + self.tamanho_bloco, self._tamanho)
+        dados = self._mapa[self._pos_bytes:fim] if self._mapa is not None else b''
+        self._pos_bytes = fim
+        self._fim = fim >= self._tamanho
+        return self._descodificador.decode(dados, final=self._fim)
+
+    # Descarta o texto da janela antes de 'desde' e acrescenta o bloco seguinte. Fica
+    # um carácter antes de 'desde': as regras das palavras-reservadas olham para trás
+    # com '\b' (ex.: o 'end' de '1end' é parte de um identificador)
+    def _recarregar(self, desde):
+        contexto = 1 if desde > 0 else 0
+        resto = self.lexer.lexdata[desde - contexto:]
+        self._base += desde - contexto
+        self.lexer.input(resto + self._ler_bloco())
+        self.lexer.lexpos = contexto
+
+    def _erro(self, t):
+        if not self._fim and t.value[:1] in "{'":
+            raise _FaltamDados(t.lexpos)
+        return self._erro_original(t)
+
+    def input(self, data):
+        raise TypeError("StreamingLexer lê diretamente do ficheiro; input() não é suportado")
+
+    def token(self):
+        lexer = self.lexer
+        while True:
+            janela = lexer.lexdata
+            inicio = lexer.lexpos
+            # Garante algum texto à frente antes de procurar o próximo token
+            if not self._fim and len(janela) - inicio < self.MARGEM:
+                self._recarregar(inicio)
+                continue
+            try:
+                tok = lexer.token()
+            except _FaltamDados as e:
+                self._recarregar(e.posicao)
+                continue
+            if tok is None:
+                if self._fim:
+                    self.close()
+                    return None
+                # (no fim da janela o PLY deixa lexpos = len + 1)
+                self._recarregar(len(janela))
+                continue
+            fim_tok = lexer.lexpos
+            if not self._fim and (len(janela) - fim_tok < self.MARGEM
+                                  or (tok.type == 'LPAREN' and janela.startswith('*', fim_tok))
+                                  or (tok.type == 'TEXTO' and janela.startswith("'", fim_tok))):
+                # O token pode estar truncado (ou ser o início de um '(*' por fechar, ou uma
+                # string com "''" cujo fecho está depois da janela, como em CompactTokenStream)
+                self._recarregar(tok.lexpos)
+                continue
+            tok.lexpos += self._base
+            return tok
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        tok = self.token()
+        if tok is None:
+            raise StopIteration
+        return tok
+
+    def close(self):
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._ficheiro.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+
+# Identificador numérico de cada tipo de token (posição no tuplo 'tokens')
+TOKEN_IDS = {nome: i for i, nome in enumerate(tokens)}
+
+
+class CompactTokenStream:
+    """
+    Representação compacta de uma sequência de tokens.
+
+    Em vez de guardar um LexToken por token, guarda colunas paralelas em array('i'):
+        tipos   - id do tipo de token (ver TOKEN_IDS)
+        inicios - posição de início do lexema no texto
+        fins    - posição de fim do lexema no texto
+        linhas  - número da linha
+    O valor de cada token só é calculado quando pedido, a partir de um slice do texto
+    original (convertendo-o como fazem t_INTEGER, t_REAL, t_CHAR e t_TEXTO).
+    """
+    def __init__(self, texto, lexer=None, modo='regras'):
+        self.texto = texto
+        self.tipos = array('i')
+        self.inicios = array('i')
+        self.fins = array('i')
+        self.linhas = array('i')
+        # Posições onde o lexer teve de olhar até ao fim do texto sem encontrar o fecho
+        # de um comentário ou string ('{' ou "'" sem fecho, '(*' lido como LPAREN,
+        # TEXTO seguido de "'").
+        # Usadas por relex_incremental para escolher um ponto de recomeço seguro.
+        self.instaveis = array('i')
+        self._lexar(lexer if lexer is not None else build_lexer(modo))
+
+    # Lexa self.texto a partir de 'inicio' (com o contador de linhas em 'linha'),
+    # acrescentando os tokens às colunas. Se 'sincronizar' for dado, é chamado após
+    # cada token com (fim, linha); se devolver algo diferente de None, pára e devolve-o.
+    def _lexar(self, lexer, inicio=0, linha=1, sincronizar=None):
+        texto = self.texto
+        ids = TOKEN_IDS
+        tipos, inicios, fins, linhas = self.tipos, self.inicios, self.fins, self.linhas
+        instaveis = self.instaveis
+        erro_original = lexer.lexerrorf
+
+        def erro(t):
+            if t.value[:1] in "{'":
+                instaveis.append(t.lexpos)
+            return erro_original(t)
+
+        lexer.lexerrorf = erro
+        lexer.input(texto)
+        lexer.lexpos = inicio
+        lexer.lineno = linha
+        try:
+            while True:
+                tok = lexer.token()
+                if tok is None:
+                    return None
+                fim = lexer.lexpos
+                tipos.append(ids[tok.type])
+                inicios.append(tok.lexpos)
+                fins.append(fim)
+                linhas.append(tok.lineno)
+                if tok.type == 'LPAREN' and texto.startswith('*', fim):
+                    instaveis.append(tok.lexpos)
+                elif tok.type == 'TEXTO' and texto.startswith("'", fim):
+                    # "''" a seguir ao fecho: t_TEXTO procurou (em vão) outro fecho mais à frente
+                    instaveis.append(tok.lexpos)
+                if sincronizar is not None:
+                    resultado = sincronizar(fim, tok.lineno)
+                    if resultado is not None:
+                        return resultado
+        finally:
+            lexer.lexerrorf = erro_original
+
+    @classmethod
+    def _vazio(cls, texto):
+        fluxo = cls.__new__(cls)
+        fluxo.texto = texto
+        return fluxo
+
+    def __len__(self):
+        return len(self.tipos)
+
+    def tipo(self, i):
+        return tokens[self.tipos[i]]
+
+    def valor(self, i):
+        lexema = self.texto[self.inicios[i]:self.fins[i]]
+        tipo = tokens[self.tipos[i]]
+        if tipo == 'INTEGER':
+            return int(lexema)
+        if tipo == 'REAL':
+            return float(lexema)
+        if tipo in ('CHAR', 'TEXTO'):
+            return lexema[1:-1].replace("''", "'")
+        return lexema
+
+    def token(self, i):
+        tok = lex.LexToken()
+        tok.type = tokens[self.tipos[i]]
+        tok.value = self.valor(i)
+        tok.lineno = self.linhas[i]
+        tok.lexpos = self.inicios[i]
+        return tok
+
+    # Adaptador com a interface esperada pelo parser PLY (método token())
+    def adaptador(self):
+        return _AdaptadorTokens(self)
+
+
+# Quantos caracteres depois do fim de um token podem ter influenciado o seu
+# reconhecimento (ex.: '3.1e' só se decide como REAL/INTEGER 3 caracteres depois)
+HORIZONTE_LEXER = 3
+
+def relex_incremental(fluxo, offset, apagados, inseridos, lexer=None, modo='regras'):
+    """
+    Atualiza um CompactTokenStream após uma edição do texto, sem lexar tudo de novo.
+
+    A edição remove 'apagados' caracteres a partir de 'offset' e insere 'inseridos'.
+    Recomeça a lexar a partir do fim do último token cujo reconhecimento não dependeu
+    do texto editado, e pára assim que o lexer volta a estar numa posição de fim de
+    token do fluxo antigo (já depois da edição): daí em diante os tokens antigos são
+    reaproveitados, deslocando posições e linhas.
+    Comentários '{ ... }' / '(* ... *)' e strings por fechar antes da edição forçam o
+    recomeço antes deles (ver CompactTokenStream.instaveis).
+    O lexer (ou 'modo') deve ser o mesmo usado para construir 'fluxo'.
+    Retorna um novo CompactTokenStream, igual ao que se obteria lexando o texto todo.
+    """
+    texto = fluxo.texto
+    if offset < 0 or apagados < 0 or offset + apagados > len(texto):
+        raise ValueError(f"Edição fora do texto: offset={offset}, apagados={apagados}, tamanho={len(texto)}")
+    novo_texto = texto[:offset] + inseridos + texto[offset + apagados:]
+    delta = len(inseridos) - apagados
+    fim_edicao = offset + len(inseridos)
+
+    # 1) Ponto de recomeço: fim de um token que não "viu" o texto editado
+    limite = offset - HORIZONTE_LEXER
+    if fluxo.instaveis and fluxo.instaveis[0] < offset:
+        limite = min(limite, fluxo.instaveis[0])
+    k = bisect.bisect_right(fluxo.fins, limite) - 1
+    inicio = fluxo.fins[k] if k >= 0 else 0
+    linha = fluxo.linhas[k] if k >= 0 else 1
+
+    novo = CompactTokenStream._vazio(novo_texto)
+    novo.tipos = fluxo.tipos[:k + 1]
+    novo.inicios = fluxo.inicios[:k + 1]
+    novo.fins = fluxo.fins[:k + 1]
+    novo.linhas = fluxo.linhas[:k + 1]
+    novo.instaveis = fluxo.instaveis[:bisect.bisect_left(fluxo.instaveis, inicio)]
+
+    # 2) Relexar até o fim de um token coincidir com o fim de um token antigo. O carácter
+    #    anterior também tem de estar fora da edição (as regras olham para trás com '\b').
+    fins_antigos = fluxo.fins
+
+    def sincronizar(fim, _linha):
+        if fim <= fim_edicao:
+            return None
+        j = bisect.bisect_left(fins_antigos, fim - delta)
+        if j < len(fins_antigos) and fins_antigos[j] == fim - delta:
+            return j
+        return None
+
+    j = novo._lexar(lexer if lexer is not None else build_lexer(modo), inicio, linha, sincronizar)
+
+    # 3) Reaproveitar os tokens antigos depois do ponto de sincronização
+    if j is not None:
+        desvio_linhas = novo.linhas[-1] - fluxo.linhas[j]
+        novo.tipos.extend(fluxo.tipos[j + 1:])
+        novo.inicios.extend(array('i', map(delta.__add__, fluxo.inicios[j + 1:])))
+        novo.fins.extend(array('i', map(delta.__add__, fluxo.fins[j + 1:])))
+        novo.linhas.extend(array('i', map(desvio_linhas.__add__, fluxo.linhas[j + 1:])))
+        resto = fluxo.instaveis[bisect.bisect_left(fluxo.instaveis, fins_antigos[j]):]
+        novo.instaveis.extend(array('i', map(delta.__add__, resto)))
+    return novo
+
+
+class _AdaptadorTokens:
+    # Entrega ao parser um token de cada vez, criado apenas no momento em que é pedido
+    def __init__(self, fluxo):
+        self.fluxo = fluxo
+        self.pos = 0
+
+    def input(self, data):
+        raise TypeError("O adaptador já tem os tokens; input() não é suportado")
+
+    def token(self):
+        if self.pos >= len(self.fluxo):
+            return None
+        tok = self.fluxo.token(self.pos)
+        tok.lexer = self
+        self.pos += 1
+        return tok
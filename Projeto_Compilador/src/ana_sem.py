@@ -1,3 +1,9 @@
+from visitante import Visitante
+from fluxo import GrafoFluxo, relatorio
+from tipos import (INTEGER, REAL, BOOLEAN, CHAR, ENUM, SET, FILE, RECORD, TEXTO, LABEL, UNKNOWN,
+                   NUMERICOS, ORDINAIS, canonico, array_de, conjunto_de)
+
+
 class SemanticError(Exception):
     pass
 
@@ -10,10 +16,16 @@ class Symbol:
         name (str): Nome do símbolo (identificador).
         type (str | Symbol): Tipo associado ao símbolo (ex: 'integer', 'boolean' ou outro símbolo).
         kind (str): Natureza do símbolo ('var' para variável, 'const' para constante).
+        params, return_type (opcionais): Parâmetros e tipo de retorno de funções/procedimentos.
+        fields (opcional): Campos de um tipo record.
 
     Este objeto é utilizado para armazenar informação semântica sobre identificadores
     declarados no programa, como variáveis, constantes, tipos ou procedimentos.
+    Os atributos opcionais só existem quando são atribuídos (hasattr distingue, por
+    exemplo, um símbolo de função de um de variável).
     """
+    __slots__ = ('name', 'type', 'kind', 'params', 'return_type', 'fields')
+
     def __init__(self, name, type_, kind='var'):
         self.name = name
         self.type = type_
@@ -23,22 +35,66 @@ class Symbol:
         return f"<Symbol name={self.name}, type={self.type}, kind={self.kind}>"
 
 
+class SymbolTable:
+    """
+    Tabela de símbolos achatada, partilhada por todos os scopes de uma análise.
+    Atributos:
+        bindings (dict): Mapeamento nome -> pilha de (profundidade, Symbol), com a
+            declaração mais interna no topo.
+        scopes (list): Pilha dos scopes abertos; o índice é a profundidade.
+    Resolver um nome é olhar para o topo da sua pilha, qualquer que seja o número de
+    scopes abertos; fechar um scope remove apenas os k nomes que ele declarou.
+    """
+    def __init__(self):
+        self.bindings = {}
+        self.scopes = []
+
+    def push_scope(self):
+        """Abre um scope filho do atual (ou o scope global, se não houver nenhum)."""
+        scope = Scope(self, len(self.scopes))
+        self.scopes.append(scope)
+        return scope
+
+    def pop_scope(self):
+        """Fecha o scope atual, retirando as suas declarações das pilhas. Devolve o pai."""
+        scope = self.scopes.pop()
+        bindings = self.bindings
+        for name in scope.symbols:
+            pilha = bindings[name]
+            pilha.pop()
+            if not pilha:
+                del bindings[name]
+        return scope.parent
+
+
 class Scope:
     """
     Representa um scope de declaração, como um bloco de código ou função.
     Atributos:
-        symbols (dict): Mapeamento entre nomes de identificadores e os seus símbolos.
-        parent (Scope): Scope pai, permitindo encadeamento para suportar scopes aninhados.
+        symbols (dict): Mapeamento entre nomes de identificadores e os símbolos declarados
+            neste scope.
+        table (SymbolTable): Tabela a que o scope pertence.
+        depth (int): Profundidade do scope (0 para o global).
+        parent (Scope): Scope pai (None no global).
     Métodos:
         define(name, type_, kind): Adiciona um novo símbolo ao scope atual.
-        resolve(name): Procura um símbolo pelo nome, recursivamente nos scopes pai.
+        bind(name, sym): Adiciona um símbolo já construído, sem verificar duplicados.
+        resolve(name): Procura um símbolo pelo nome, neste scope ou nos scopes pai.
     Esta classe é usada para gerir tabelas de símbolos em programas com blocos aninhados,
     garantindo que declarações e utilizações de identificadores respeitam as regras
-    de visibilidade e scope do Pascal ISO 7185.
+    de visibilidade e scope do Pascal ISO 7185. Os scopes são criados pela SymbolTable
+    (push_scope), que mantém as ligações de todos os scopes abertos.
     """
-    def __init__(self, parent=None):
+    __slots__ = ('symbols', 'table', 'depth')
+
+    def __init__(self, table=None, depth=0):
         self.symbols = {}
-        self.parent = parent
+        self.table = table if table is not None else SymbolTable()
+        self.depth = depth
+
+    @property
+    def parent(self):
+        return self.table.scopes[self.depth - 1] if self.depth > 0 else None
 
     """
     Declara um novo símbolo no scope atual. Lança erro se já existir.
@@ -58,7 +114,15 @@ class Scope:
             sym.kind = kind  # Define o tipo como 'var' ou 'const'
         else:
             sym = Symbol(name, type_, kind)
+        self.bind(name, sym)
+
+    def bind(self, name, sym):
         self.symbols[name] = sym
+        pilha = self.table.bindings.get(name)
+        if pilha is None:
+            self.table.bindings[name] = [(self.depth, sym)]
+        else:
+            pilha.append((self.depth, sym))
 
     """
     Procura um símbolo com o nome dado, neste scope ou nos scopes pai.
@@ -70,15 +134,20 @@ class Scope:
         SemanticError: Se o nome não estiver declarado em nenhum scope acessível.
     """
     def resolve(self, name):
-        if name in self.symbols:
-            return self.symbols[name]
-        elif self.parent:
-            return self.parent.resolve(name)
-        else:
-            raise SemanticError(f"Variável '{name}' usada mas não declarada.")
-
-
-class SemanticAnalyzer:
+        pilha = self.table.bindings.get(name)
+        if pilha:
+            depth, sym = pilha[-1]
+            if depth <= self.depth:
+                return sym
+            # Procura a partir de um scope exterior (ex.: global_scope.resolve): ignora as
+            # declarações dos scopes mais internos
+            for depth, sym in reversed(pilha):
+                if depth <= self.depth:
+                    return sym
+        raise SemanticError(f"Variável '{name}' usada mas não declarada.")
+
+
+class SemanticAnalyzer(Visitante):
     """
     Analisador semântico para um programa Pascal (ISO 7185).
     Responsável por:
@@ -87,11 +156,21 @@ class SemanticAnalyzer:
     - Validar chamadas e tipos de funções e procedimentos.
     - Aplicar regras semânticas da linguagem Pascal.
     """
+    PREFIXO = 'visit_'
+
     def __init__(self):
-        self.global_scope = Scope()
+        # Tabela tag -> visit_<tag> ligado a esta instância (ver visitante.py)
+        self.despacho = self.tabela_despacho(self.generic_visit)
+        self.symtab = SymbolTable()
+        self.global_scope = self.symtab.push_scope()
         self.current_scope = self.global_scope
-        # Conjunto de variáveis já inicializadas (para validações)
-        self.initialized = set()
+        # Inicialização das variáveis (ver fluxo.py): os símbolos das variáveis declaradas,
+        # o grafo da rotina em análise, os resumos das rotinas já analisadas e, por rotina,
+        # as variáveis exteriores que atribui em todos os caminhos
+        self.variaveis = set()
+        self.fluxo = None
+        self.fluxos = []
+        self.efeitos = {}
         self._init_builtins()
     
     def _init_builtins(self):
@@ -99,11 +178,11 @@ class SemanticAnalyzer:
         Inicializa procedimentos e funções builtin, como write e real().
         """
         for proc in ['write', 'writeln', 'read', 'readln']:
-            self.global_scope.symbols[proc] = Symbol(proc, 'procedure')
+            self.global_scope.bind(proc, Symbol(proc, 'procedure'))
         # Exemplo de função builtin: real(x: integer): real
         real_sym = Symbol('real', 'function')
-        real_sym.params = [('x', 'integer')]  # Cast de integer para real
-        real_sym.return_type = 'real'
+        real_sym.params = [('x', INTEGER)]  # Cast de integer para real
+        real_sym.return_type = REAL
         self.global_scope.define('real', real_sym)
 
     def analyze(self, node):
@@ -112,7 +191,52 @@ class SemanticAnalyzer:
         Args:
             node (tuple): Nó da AST correspondente ao programa.
         """
-        self.visit(node)
+        try:
+            self.visit(node)
+        except SemanticError:
+            self._verificar_pendentes()
+            raise
+
+    def _verificar_pendentes(self):
+        # Os usos antes de inicialização só são verificados no fim de cada rotina; se
+        # outro erro interromper a análise, um uso inválido já registado vem antes dele
+        # no texto e é esse o erro a mostrar. O grafo ainda incompleto tem menos arestas:
+        # pode deixar passar um uso inválido, mas nunca acusa um uso válido
+        grafo, ativos = self.fluxo, []
+        while grafo is not None:
+            ativos.append(grafo)
+            grafo = grafo.pai
+        for grafo in reversed(ativos):
+            grafo.resolver()
+            nome = grafo.primeira_falha()
+            if nome is not None:
+                raise SemanticError(f"Variável '{nome}' usada antes de inicialização.") from None
+
+    def relatorio_fluxo(self):
+        """Texto com o resultado da análise de inicialização de cada scope (rotina)."""
+        return relatorio(self.fluxos)
+
+    def _declarar_variavel(self, nome, inicializada=False):
+        # Regista a variável acabada de declarar no scope atual no grafo da rotina
+        sym = self.current_scope.symbols[nome]
+        self.variaveis.add(sym)
+        self.fluxo.declarar(sym, inicializada)
+
+    def _definir_variavel(self, sym):
+        if sym in self.variaveis:
+            self.fluxo.definir(sym)
+
+    def _fechar_fluxo(self):
+        # Resolve o grafo da rotina atual e verifica os usos; volta ao grafo da rotina pai
+        grafo = self.fluxo
+        grafo.resolver()
+        resumo = grafo.resumo()
+        self.fluxos.append(resumo)
+        self.fluxo = grafo.pai
+        nome = grafo.primeira_falha()
+        if nome is not None:
+            raise SemanticError(f"Variável '{nome}' usada antes de inicialização.")
+        return resumo
 
     def visit(self, node):
         """
@@ -120,11 +244,10 @@ class SemanticAnalyzer:
         Args:
             node (tuple|list): Nó da AST (tupla com tag ou lista de nós).
         """
-        if isinstance(node, tuple):
-            method_name = f"visit_{node[0]}"
-            method = getattr(self, method_name, self.generic_visit)
-            return method(node)
-        elif isinstance(node, list):
+        tipo = type(node)
+        if tipo is tuple:
+            return self.despacho[node[0]](node)
+        elif tipo is list:
             for item in node:
                 self.visit(item)
 
@@ -143,7 +266,9 @@ class SemanticAnalyzer:
         Visita a estrutura principal de um programa Pascal.
         node = ('program', nome, bloco)
         """
+        self.fluxo = GrafoFluxo(node[1])
         self.visit(node[2])  # Visita o bloco principal
+        self._fechar_fluxo()
 
 
 
@@ -168,11 +293,9 @@ class SemanticAnalyzer:
             if nome.lower() in self.current_scope.symbols:
                 raise SemanticError(f"Constante '{nome}' já declarada.")
             # Avalia a expressão associada à constante e obtém o tipo resultante
-            tipo = self.visit(expr).lower()
+            tipo = canonico(self.visit(expr))
             # Regista a constante na tabela de símbolos com o tipo e marca como 'const'
             self.current_scope.define(nome.lower(), tipo, kind='const')  # Marca como 'const'
-            # Adiciona ao conjunto de identificadores inicializados (para gerir inicializações)
-            self.initialized.add(nome.lower())
     
 
 
@@ -193,16 +316,15 @@ class SemanticAnalyzer:
                             raise SemanticError(f"Campo '{id_name}' já definido no record '{name}'.")
                         campos[key] = t_str
                 # Cria símbolo para o tipo record, com os campos associados
-                rec_sym = Symbol(name.lower(), name.lower())
+                rec_sym = Symbol(name.lower(), canonico(name))
                 rec_sym.fields = campos
                 self.current_scope.define(name.lower(), rec_sym)
             else:
                 # Processamento de ENUMs
                 if kind == 'enum':
-                    self.current_scope.define(name.lower(), 'enum')
+                    self.current_scope.define(name.lower(), ENUM)
                     for e in tipo[1]:  # Elementos do enum
-                        self.current_scope.define(e.lower(), 'enum')
-                        self.initialized.add(e.lower())
+                        self.current_scope.define(e.lower(), ENUM)
                 # Processamento de subranges (ex: 1..10)
                 elif kind == 'subrange':
                     base_type = self._normalize_type(tipo)   # isto já retorna 'integer'
@@ -276,7 +398,7 @@ class SemanticAnalyzer:
             if key in self.current_scope.symbols:
                 raise SemanticError(f"Label '{lbl}' já declarada neste scope.")
             # Regista a label como símbolo do tipo 'label' na tabela de símbolos
-            self.current_scope.symbols[key] = Symbol(key, 'label')
+            self.current_scope.bind(key, Symbol(key, LABEL))
 
 
 
@@ -327,6 +449,7 @@ class SemanticAnalyzer:
                 self.visit(tipo)
             # Regista a variável na tabela de símbolos com o tipo e marca como 'var'
             self.current_scope.define(nome.lower(), type_str, kind='var')
+            self._declarar_variavel(nome.lower())
 
 
 
@@ -366,17 +489,19 @@ class SemanticAnalyzer:
         prev_fn = getattr(self, 'current_function', None)
         self.current_function = nl
 
-        # Cria novo scope filho para os parâmetros e o corpo
-        self.current_scope = Scope(self.current_scope)
+        # Cria novo scope filho e novo grafo de fluxo para os parâmetros e o corpo
+        self.current_scope = self.symtab.push_scope()
+        self.fluxo = GrafoFluxo(nome, self.fluxo)
         for param_nome, param_tipo in func_sym.params:
             self.current_scope.define(param_nome.lower(), param_tipo)
-            self.initialized.add(param_nome.lower())   # Marca como inicializado
+            self._declarar_variavel(param_nome.lower(), inicializada=True)
 
-        # Analisa o bloco da função
+        # Analisa o bloco da função e verifica as inicializações
         self.visit(block)
+        self.efeitos[func_sym] = self._fechar_fluxo().exteriores
 
         # Fecha o scope e repõe a função anterior (caso haja)
-        self.current_scope = self.current_scope.parent
+        self.current_scope = self.symtab.pop_scope()
         self.current_function = prev_fn
         # Devolve o tipo de retorno da função (útil para verificação posterior)
         return func_sym.return_type
@@ -437,17 +562,19 @@ class SemanticAnalyzer:
         prev_proc = getattr(self, 'current_procedure', None)
         self.current_procedure = nl
 
-        # 4) Abre novo scope e define os parâmetros como variáveis iniciais
-        self.current_scope = Scope(self.current_scope)
+        # 4) Abre novo scope e novo grafo de fluxo; os parâmetros estão inicializados
+        self.current_scope = self.symtab.push_scope()
+        self.fluxo = GrafoFluxo(nome, self.fluxo)
         for param_nome, param_tipo in proc_sym.params:
             self.current_scope.define(param_nome, param_tipo)
-            self.initialized.add(param_nome.lower())
+            self._declarar_variavel(param_nome, inicializada=True)
 
-        # 5) Analisa o bloco do procedimento
+        # 5) Analisa o bloco do procedimento e verifica as inicializações
         self.visit(block)
+        self.efeitos[proc_sym] = self._fechar_fluxo().exteriores
 
         # 6) Fecha o scope e restaura o nome da procedure anterior (se aplicável)
-        self.current_scope = self.current_scope.parent
+        self.current_scope = self.symtab.pop_scope()
         self.current_procedure = prev_proc
     
 
@@ -476,7 +603,7 @@ class SemanticAnalyzer:
             if key_disc not in fields_map:
                 raise SemanticError(f"Discriminador '{discrim_id}' não declarado como campo do record.")
             discrim_tipo = fields_map[key_disc]
-            if discrim_tipo not in ('integer', 'char', 'boolean', 'enum'):
+            if discrim_tipo not in ORDINAIS:
                 raise SemanticError(
                     f"Tipo do discriminador '{discrim_id}' inválido para variant: {discrim_tipo} não é ordinal."
                 )
@@ -517,13 +644,13 @@ class SemanticAnalyzer:
             # Trata diferentes tipos de nó para o tipo de elemento do conjunto
             kind = tipo_node[0].lower()
             if kind == 'simple_type':
-                elem_type = tipo_node[1].lower()
+                elem_type = canonico(tipo_node[1])
             elif kind == 'id_type':
                 # resolve identificador de tipo previamente definido
                 sym = self.current_scope.resolve(tipo_node[1].lower())
                 elem_type = sym.type
             elif kind == 'enum':
-                elem_type = 'enum'
+                elem_type = ENUM
             elif kind == 'subrange':
                 lower_node = tipo_node[1] 
                 upper_node = tipo_node[2]
@@ -547,7 +674,7 @@ class SemanticAnalyzer:
                     elif kind != 'integer':
                         raise SemanticError(
                             f"Limite do array deve ser do tipo INTEGER, mas é do tipo '{kind}'.")
-                elem_type = 'integer'
+                elem_type = INTEGER
             else:
                 raise SemanticError(
                     f"Tipos de conjuntos só suportam ordinal (integer, char, enum, subrange), "
@@ -555,14 +682,14 @@ class SemanticAnalyzer:
                 )
         else:
             # tipo_node já está normalizado como string
-            elem_type = tipo_node.lower()
+            elem_type = canonico(tipo_node)
         # 2) Verifica se o tipo do elemento do conjunto é ordinal (integer, char, enum, boolean)
-        if elem_type not in ('integer', 'char', 'enum', 'boolean'):
+        if elem_type not in ORDINAIS:
             raise SemanticError(
                 f"Tipo de elemento de conjunto inválido: {elem_type} não é ordinal."
             )
         # 3) Retorna a representação semântica do conjunto
-        return ('set', elem_type)
+        return conjunto_de(elem_type)
 
 
         
@@ -573,9 +700,9 @@ class SemanticAnalyzer:
         if type == 'id':
             const_node = 'var', b.lower()
             # Visita o identificador e devolve o tipo associado
-            return self.visit(const_node).lower()
+            return canonico(self.visit(const_node))
         # Caso contrário, devolve diretamente o tipo
-        return type
+        return canonico(type)
 
 
 
@@ -600,11 +727,11 @@ class SemanticAnalyzer:
             nome_var = nome_var.lower()
             if nome_var == getattr(self, 'current_function', None):
                 # Se for o retorno, verifica tipo de retorno
-                expr_type = self.visit(expr).lower()
+                expr_type = canonico(self.visit(expr))
                 # Busca símbolo da função no scope global (onde definimos return_type)
                 func_sym = self.global_scope.resolve(nome_var.lower())
-                ret_type = func_sym.return_type.lower()
-                if expr_type != ret_type:
+                ret_type = canonico(func_sym.return_type)
+                if expr_type is not ret_type:
                     raise SemanticError(
                         f"Tipo de retorno incorreto em '{var_node[1]}': "
                         f"esperado {ret_type}, mas foi {expr_type}."
@@ -615,13 +742,15 @@ class SemanticAnalyzer:
         if var_node[0] == 'var':
             # Verifica se a variável é constante e não pode ser alterada
             if nome_var in self.current_scope.symbols:
-                if self.current_scope.symbols[nome_var].kind == 'const':
+                sym = self.current_scope.symbols[nome_var]
+                if sym.kind == 'const':
                     raise SemanticError(f"Não pode atribuir a constante '{nome_var}'")
-                var_type = self.current_scope.symbols[nome_var].type
+                var_type = sym.type
             else:
                 # Se não encontrar no scope local, tenta no scope global
                 if nome_var in self.global_scope.symbols:
-                    var_type = self.global_scope.symbols[nome_var].type
+                    sym = self.global_scope.symbols[nome_var]
+                    var_type = sym.type
                 else:
                     raise SemanticError(f"Variável '{nome_var}' não declarada.")
 
@@ -630,29 +759,26 @@ class SemanticAnalyzer:
             var_type = self.visit(var_node)
         # Verifica se o tipo da expressão é compatível com o tipo da variável
         expr_type = self.visit(expr)
-        if isinstance(expr_type, tuple):
+        if type(expr_type) is tuple:
             expr_type = expr_type[0]
-        if expr_type.upper() != var_type.upper():
+        if expr_type is not var_type:
             raise SemanticError(
                 f"Tipos incompatíveis na atribuição: variável '{var_node}' é {var_type}, "
                 f"mas expressão é {expr_type}."
             )
-        # Se a variável for normal (não const), marca como inicializada
+        # Se a variável for normal (não const), fica inicializada a partir daqui
         if var_node[0] == 'var':
-            self.initialized.add(var_node[1].lower())
+            self._definir_variavel(sym)
 
 
 
     def visit_var(self, node):
         # node = ('var', nome)
         _, nome = node
-        key = nome.lower()
-        # se ainda não foi inicializada, erro
-        if key not in self.initialized:
-            raise SemanticError(f"Variável '{nome}' usada antes de inicialização.")
-
-        # Se a variável foi inicializada, resolve e retorna o tipo
-        sym = self.current_scope.resolve(key)
+        # Resolve e retorna o tipo; a inicialização é verificada no fim da rotina, sobre o
+        # grafo de fluxo (ver fluxo.py)
+        sym = self.current_scope.resolve(nome.lower())
+        self.fluxo.usar(sym, nome)
         return sym.type
     
 
@@ -663,11 +789,11 @@ class SemanticAnalyzer:
         # Resolve o tipo da variável base (deve ser um array)
         base_type = self.current_scope.resolve(key).type
         # Verifica se a base é um array
-        if not (isinstance(base_type, tuple) and base_type[0] == 'array'):
+        if not (type(base_type) is tuple and base_type[0] == 'array'):
             raise SemanticError(f"Tentativa de indexar uma variável que não é um array, mas do tipo '{base_type}'")
         idx_type = self.visit(indice)
         # Verifica o tipo do índice (deve ser 'integer')
-        if idx_type != 'integer':
+        if idx_type is not INTEGER:
             raise SemanticError(f"Índice do array deve ser INTEGER, mas é do tipo {idx_type}.")
         return base_type[1]  # tipo do elemento do array
     
@@ -713,7 +839,7 @@ class SemanticAnalyzer:
                 raise SemanticError(f"Cast para '{nome}' espera 1 argumento, mas recebeu {len(argumentos)}.")
             # Valida o tipo do argumento no cast
             t = self.visit(argumentos[0])
-            return nl   # Retorna o tipo do cast
+            return canonico(nl)   # Retorna o tipo do cast
 
         # —————— CAST PARA REAL ——————
         if nl == 'real':
@@ -721,9 +847,9 @@ class SemanticAnalyzer:
                 raise SemanticError(f"Cast para '{nome}' espera 1 argumento, mas recebeu {len(argumentos)}.")
             at = self.visit(argumentos[0])
             # Valida se o tipo do argumento pode ser convertido
-            if nl == 'real' and at not in ('integer','real'):
+            if nl == 'real' and at not in NUMERICOS:
                 raise SemanticError(f"Cast real({at}) inválido; só integer ou real.")
-            return nl   # Retorna o tipo do cast
+            return REAL   # Retorna o tipo do cast
         # Verifica a chamada da função   
         simbolo = self.current_scope.resolve(nl)
         if hasattr(simbolo, 'params'):
@@ -735,12 +861,16 @@ class SemanticAnalyzer:
                     at = self.visit(a)
                 else:
                     at = self.current_scope.resolve(a[1].lower()).type
-                if at != ptype:
-                    if not ((ptype=='real' and at=='integer') or (ptype=='texto' and at==('array', 'char')) or (ptype==('array', 'char') and at=='texto')):
+                if at is not ptype:
+                    if not ((ptype is REAL and at is INTEGER) or (ptype is TEXTO and at == ('array', 'char')) or (ptype == ('array', 'char') and at is TEXTO)):
                         raise SemanticError(f"Argumento para '{pname}' deve ser {ptype}, mas recebeu {at}.")
+            # A chamada inicializa as variáveis exteriores que a rotina atribui em todos os
+            # caminhos (nenhuma numa chamada recursiva, ainda sem resumo)
+            for sym in self.efeitos.get(simbolo, ()):
+                self.fluxo.definir(sym)
             # Retorna o tipo de retorno da função, se definido
             if hasattr(simbolo, 'return_type'):
-                return simbolo.return_type.casefold()
+                return canonico(simbolo.return_type)
             return None
 
         # 5) Built‑in simples (write, writeln, read, readln)
@@ -756,7 +886,7 @@ class SemanticAnalyzer:
                         key = nome.lower()
                         sym = self.current_scope.resolve(key)
                         if sym.type[0] != ('array'):
-                            self.initialized.add(key)
+                            self._definir_variavel(sym)
                             return sym.type
                         else:
                             raise SemanticError(f"A função '{simbolo.name}' não pode receber um argumento do tipo '{sym.type[0]}'.")
@@ -766,13 +896,13 @@ class SemanticAnalyzer:
                         _, nome = a[1]  # 'a[1]' será a tupla ('var', 'nome_do_array')
                         key = nome.lower()
                         sym = self.current_scope.resolve(key)
-                        self.initialized.add(key)
+                        self._definir_variavel(sym)
 
                         # Verificar se há um terceiro elemento que representa os índices
                         if len(a) > 2:  # Caso haja índices
                             index = a[2]  # Os índices estão em 'a[2]'
                             index_type = self.visit(index)  # Processa o índice
-                            if index_type != 'integer':
+                            if index_type is not INTEGER:
                                 raise SemanticError(f"O índice do array tem de ser do tipo INTEGER mas é do tipo '{index_type}'.")
                         return sym.type  # Retorna o tipo da variável do tipo array
                     elif tipo == 'field':
@@ -800,13 +930,24 @@ class SemanticAnalyzer:
         _, cond, then_stmt, else_stmt = node
         # Verifica o tipo da condição do IF (deve ser boolean)
         cond_type = self.visit(cond)
-        if cond_type != 'boolean':
+        if cond_type is not BOOLEAN:
             raise SemanticError(f"A condição do IF deve ser boolean, mas é {cond_type}.")
+        fluxo = self.fluxo
+        condicao = fluxo.atual
+        fim = fluxo.novo_bloco()
         # Processa a parte 'then' da instrução
+        fluxo.seguir(fluxo.novo_bloco())
         self.visit(then_stmt)
+        fluxo.ligar(fluxo.atual, fim)
         if else_stmt is not None:
             # Se existir, processa a parte 'else'
+            fluxo.atual = condicao
+            fluxo.seguir(fluxo.novo_bloco())
             self.visit(else_stmt)
+            fluxo.ligar(fluxo.atual, fim)
+        else:
+            fluxo.ligar(condicao, fim)
+        fluxo.atual = fim
 
 
 
@@ -816,74 +957,98 @@ class SemanticAnalyzer:
 
         # 1) A variável de controlo do loop deve ser definida e ser do tipo 'integer'
         sym = self.current_scope.resolve(var_name.lower())
-        if sym.type.lower() != 'integer'.lower():
+        if canonico(sym.type) is not INTEGER:
             raise SemanticError(
                 f"Variável de controlo do FOR '{var_name}' deve ser integer, mas é {sym.type}."
             )
 
         # 2) A expressão de início e a expressão de fim do loop devem ser do tipo 'integer'
-        t_start = self.visit(start_expr).lower()
-        t_end   = self.visit(end_expr).lower()
-        if t_start != 'integer'.lower():
+        t_start = canonico(self.visit(start_expr))
+        t_end   = canonico(self.visit(end_expr))
+        if t_start is not INTEGER:
             raise SemanticError(
                 f"Expressão inicial do FOR deve ser integer, mas é {t_start}."
             )
-        if t_end != 'integer'.lower():
+        if t_end is not INTEGER:
             raise SemanticError(
                 f"Expressão final do FOR deve ser integer, mas é {t_end}."
             )
         # Marca a variável de controlo como inicializada
-        self.initialized.add(var_name.lower())
-        # 3) Processa o corpo do laço 'for'
+        fluxo = self.fluxo
+        self._definir_variavel(sym)
+        # 3) Processa o corpo do laço 'for' (que pode não ser executado nenhuma vez)
+        cabeca = fluxo.seguir(fluxo.novo_bloco())
+        fluxo.seguir(fluxo.novo_bloco())
         self.visit(body)
+        fluxo.ligar(fluxo.atual, cabeca)
+        fluxo.atual = cabeca
+        fluxo.seguir(fluxo.novo_bloco())
 
 
 
     def visit_while(self, node):
         # node = ('while', condition_expr, body_stmt)
         _, cond_expr, body = node
-        # 1) A condição do 'while' deve ser do tipo 'boolean'
+        # 1) A condição do 'while' deve ser do tipo 'boolean'; é avaliada num bloco próprio,
+        # a que o corpo volta
+        fluxo = self.fluxo
+        cabeca = fluxo.seguir(fluxo.novo_bloco())
         cond_type = self.visit(cond_expr)
-        if cond_type != 'boolean':
+        if cond_type is not BOOLEAN:
             raise SemanticError(
                 f"Condição de WHILE deve ser boolean, mas é {cond_type}."
             )
         # 2) Analisa o corpo do laço 'while'
+        saida = fluxo.atual
+        fluxo.seguir(fluxo.novo_bloco())
         self.visit(body)
+        fluxo.ligar(fluxo.atual, cabeca)
+        fluxo.atual = saida
+        fluxo.seguir(fluxo.novo_bloco())
 
 
 
     def visit_repeat(self, node):
         # node = ('repeat', statement_list, expression)
         _, stmts, cond = node
-        # 1) Analisa cada instrução dentro do 'repeat...until'
+        # 1) Analisa cada instrução dentro do 'repeat...until' (executadas pelo menos uma vez)
+        fluxo = self.fluxo
+        corpo = fluxo.seguir(fluxo.novo_bloco())
         for stmt in stmts:
             if stmt is not None:
                 self.visit(stmt)
         # 2) A condição do 'until' deve ser do tipo 'boolean'
         cond_type = self.visit(cond)
-        if cond_type.lower() != 'boolean':
+        if canonico(cond_type) is not BOOLEAN:
             raise SemanticError(
                 f"Condição de REPEAT…UNTIL deve ser boolean, mas é {cond_type}."
             )
+        fluxo.ligar(fluxo.atual, corpo)
+        fluxo.seguir(fluxo.novo_bloco())
         
 
 
     def visit_case(self, node):
         _, expr_node, case_list = node
         # 1) A expressão do 'case' deve ser do tipo ordinal: 'integer', 'char' ou 'enum'
-        expr_type = self.visit(expr_node).lower()
-        if expr_type not in ('integer', 'char', 'enum'):
+        expr_type = canonico(self.visit(expr_node))
+        if expr_type not in (INTEGER, CHAR, ENUM):
             raise SemanticError(
                 f"Expressão de CASE deve ser ordinal (INTEGER, CHAR ou ENUM), mas é {expr_type}."
             )
-        # 2) Percorre todas as alternativas do 'case' e valida os tipos das constantes
+        # 2) Percorre todas as alternativas do 'case' e valida os tipos das constantes.
+        # Cada alternativa é um ramo do fluxo; sem alternativa escolhida, segue para o fim
+        fluxo = self.fluxo
+        escolha = fluxo.atual
+        fim = fluxo.novo_bloco()
+        fluxo.ligar(escolha, fim)
         seen_labels = set()
         for const_list, stmts in case_list:
+            fluxo.atual = escolha
             # Cada 'const_list' é uma lista de nós de expressões constantes
             for const_node in const_list:
-                label_type = self.visit(const_node).lower()
-                if label_type != expr_type:
+                label_type = canonico(self.visit(const_node))
+                if label_type is not expr_type:
                     raise SemanticError(
                         f"Label de CASE tem tipo {label_type}, mas a expressão é {expr_type}."
                     )
@@ -894,8 +1059,11 @@ class SemanticAnalyzer:
                 seen_labels.add(key)
 
             # 3) Analisa semanticamente todas as instruções dentro do ramo do 'case'
+            fluxo.seguir(fluxo.novo_bloco())
             for stmt in stmts:
                 self.visit(stmt)
+            fluxo.ligar(fluxo.atual, fim)
+        fluxo.atual = fim
 
 
 
@@ -904,7 +1072,7 @@ class SemanticAnalyzer:
 
         # 1) Prepara um novo scope filho onde vamos introduzir os campos
         old_scope = self.current_scope
-        with_scope = Scope(parent=old_scope)
+        with_scope = self.symtab.push_scope()
 
         # 2) Para cada variável em WITH, extrai os campos do seu tipo record
         for var_node in var_list:
@@ -939,7 +1107,7 @@ class SemanticAnalyzer:
         self.visit(stmt)
 
         # 5) Restaura o scope anterior após o fim do bloco 'WITH'
-        self.current_scope = old_scope
+        self.current_scope = self.symtab.pop_scope()
 
 
 
@@ -949,8 +1117,12 @@ class SemanticAnalyzer:
         # Resolve o símbolo associado ao rótulo (label) no scope atual
         simbolo = self.current_scope.resolve(key)
         # Verifica se o rótulo está presente no scope e se é do tipo 'label'
-        if simbolo is None or simbolo.type != 'label':
+        if simbolo is None or simbolo.type is not LABEL:
             raise SemanticError(f"GOTO para label '{label}' que não está declarada.")
+        # O código a seguir ao goto só é alcançável através de outra label
+        fluxo = self.fluxo
+        fluxo.ligar(fluxo.atual, fluxo.rotulo(simbolo))
+        fluxo.atual = fluxo.novo_bloco()
         
 
 
@@ -960,8 +1132,10 @@ class SemanticAnalyzer:
         # Resolve o símbolo associado ao rótulo (label) no scope atual
         simbolo = self.current_scope.resolve(key)
         # Verifica se o rótulo está declarado antes de ser usado
-        if simbolo is None or simbolo.type != 'label':
+        if simbolo is None or simbolo.type is not LABEL:
             raise SemanticError(f"Label '{label}' não declarada antes de ser usada.")
+        # A label começa um bloco, alcançável também a partir dos goto para ela
+        self.fluxo.seguir(self.fluxo.rotulo(simbolo))
         # Analisa semanticamente a instrução associada ao rótulo
         self.visit(stmt)
 
@@ -970,7 +1144,7 @@ class SemanticAnalyzer:
     def visit_const(self, node):
         _, type, _ = node
         # A função visita o nó de uma constante e retorna o tipo da constante
-        return type
+        return canonico(type)
 
         
 
@@ -980,12 +1154,12 @@ class SemanticAnalyzer:
         expr_type = self.visit(expr)
         # 2) A largura (width) deve ser do tipo 'integer'
         width_type = self.visit(width_expr)
-        if width_type.casefold() != 'integer':
+        if canonico(width_type) is not INTEGER:
             raise SemanticError(f"Formato width em '{node}' deve ser INTEGER, mas foi {width_type}.")
         # 3) Se a precisão (precision) for fornecida, também deve ser do tipo 'integer'
         if precision_expr is not None:
             prec_type = self.visit(precision_expr)
-            if prec_type.casefold() != 'integer':
+            if canonico(prec_type) is not INTEGER:
                 raise SemanticError(f"Formato precision em '{node}' deve ser INTEGER, mas foi {prec_type}.")
         # 4) O tipo do resultado do formato (fmt) é o mesmo tipo da expressão analisada
         return expr_type
@@ -997,10 +1171,10 @@ class SemanticAnalyzer:
         # Analisa o tipo da expressão após o operador 'not'
         expr_type = self.visit(expr)
         # Analisa o tipo da expressão após o operador 'not'
-        if expr_type != 'boolean':
+        if expr_type is not BOOLEAN:
             raise SemanticError(f"Operador 'not' espera expressão do tipo boolean, mas é do tipo {expr_type}.")
         # O resultado do operador 'not' também é do tipo 'boolean'
-        return 'boolean'
+        return BOOLEAN
     
 
 
@@ -1008,7 +1182,7 @@ class SemanticAnalyzer:
         _, elementos = node
         # Se a lista de elementos estiver vazia, considera um conjunto vazio genérico
         if not elementos:
-            return ('set', 'unknown')
+            return conjunto_de(UNKNOWN)
         # Analisa todos os elementos e verifica se são consistentes em termos de tipo
         tipos = [self.visit(elem) for elem in elementos]
         tipo_base = tipos[0]
@@ -1017,7 +1191,7 @@ class SemanticAnalyzer:
             if t != tipo_base:
                 raise SemanticError(f"Todos os elementos do conjunto devem ter o mesmo tipo, mas encontrou {tipo_base} e {t}.")
         # Retorna o tipo do conjunto e o tipo base dos seus elementos
-        return ('set', tipo_base)
+        return conjunto_de(tipo_base)
     
 
 
@@ -1028,54 +1202,52 @@ class SemanticAnalyzer:
         tipo_esq = self.visit(esq)
         tipo_dir = self.visit(dir_)
     
-        # Função auxiliar para obter o nome base do tipo
-        def tipo_base(t):
-            return t.lower() if isinstance(t, str) else t[0].lower()
-    
-        base_esq = tipo_base(tipo_esq)
-        base_dir = tipo_base(tipo_dir)
+        # Nome base do tipo: o próprio tipo, ou a etiqueta de um tuplo ('array', 'set', ...).
+        # Os tipos são canónicos (ver tipos.py), por isso comparam-se por identidade
+        base_esq = tipo_esq if type(tipo_esq) is str else canonico(tipo_esq[0])
+        base_dir = tipo_dir if type(tipo_dir) is str else canonico(tipo_dir[0])
     
         # Operadores aritméticos (+, -, *, /)
-        if op in ['+', '-', '*', '/']:
-            if base_esq not in ['integer', 'real'] or base_dir not in ['integer', 'real']:
+        if op in ('+', '-', '*', '/'):
+            if base_esq not in NUMERICOS or base_dir not in NUMERICOS:
                 raise SemanticError(f"Operador '{op}' só pode ser aplicado a tipos numéricos, mas recebeu {tipo_esq} e {tipo_dir}.")
             # Se algum dos operandos for 'real' ou o operador for '/', o resultado será 'real'
-            if 'real' in [base_esq, base_dir] or op == '/':
-                return 'real'
-            return 'integer'
+            if base_esq is REAL or base_dir is REAL or op == '/':
+                return REAL
+            return INTEGER
     
         # Operadores div e mod (divisão inteira e módulo)
-        if op in ['div', 'mod']:
-            if base_esq != 'integer' or base_dir != 'integer':
+        if op in ('div', 'mod'):
+            if base_esq is not INTEGER or base_dir is not INTEGER:
                 raise SemanticError(f"Operador '{op}' requer dois inteiros, mas recebeu {tipo_esq} e {tipo_dir}.")
-            return 'integer'
+            return INTEGER
     
         # Operadores relacionais (=, <>)
-        if op in ['=', '<>']:
-            if {base_esq, base_dir} <= {'integer', 'real'}:
-                return 'boolean'
+        if op in ('=', '<>'):
+            if base_esq in NUMERICOS and base_dir in NUMERICOS:
+                return BOOLEAN
             if tipo_esq != tipo_dir:
                 raise SemanticError(f"Comparação '{op}' requer operandos compatíveis, mas recebeu {tipo_esq} e {tipo_dir}.")
-            if base_esq not in ['boolean', 'char', 'texto', 'set']:
+            if base_esq not in (BOOLEAN, CHAR, TEXTO, SET):
                 raise SemanticError(f"Operador '{op}' não suportado para tipo {tipo_esq}.")
-            return 'boolean'
+            return BOOLEAN
     
         # Operadores relacionais (<, <=, >, >=)
-        elif op in ['<', '<=', '>', '>=']:
-            if base_esq == base_dir and base_esq in ['integer','real','char','texto']:
-                return 'boolean'
+        elif op in ('<', '<=', '>', '>='):
+            if base_esq is base_dir and base_esq in (INTEGER, REAL, CHAR, TEXTO):
+                return BOOLEAN
             raise SemanticError(
                 f"Operador relacional '{op}' não suportado para tipos {tipo_esq} e {tipo_dir}."
             )
     
         # Operador IN (verifica se o elemento pertence a um conjunto)
         if op == 'in':
-            if tipo_dir == 'set':
-                elem_type = tipo_dir.lower()
-                if tipo_esq != 'enum':
+            if tipo_dir is SET:
+                elem_type = tipo_dir
+                if tipo_esq is not ENUM:
                     raise SemanticError(f"Elemento do tipo {tipo_esq} não compatível com o conjunto de {elem_type}.")
             else:
-                if not (isinstance(tipo_dir, tuple)):
+                if not (type(tipo_dir) is tuple):
                     raise SemanticError(
                         f"Operador 'in' requer um conjunto do lado direito, mas recebeu {tipo_dir}."
                     )
@@ -1085,23 +1257,24 @@ class SemanticAnalyzer:
                     raise SemanticError(
                         f"Elemento do tipo {tipo_esq} não compatível com o conjunto de {elem_type}."
                     )
-            return 'boolean'
+            return BOOLEAN
     
         # Operadores lógicos (and, or)
-        if op in ['and', 'or']:
-            if base_esq != 'boolean' or base_dir != 'boolean':
+        if op in ('and', 'or'):
+            if base_esq is not BOOLEAN or base_dir is not BOOLEAN:
                 raise SemanticError(f"Operador lógico '{op}' requer dois boolean, mas recebeu {tipo_esq} e {tipo_dir}.")
-            return 'boolean'
+            return BOOLEAN
         # Se o operador não for reconhecido ou a operação não for suportada entre os tipos
         raise SemanticError(f"Operador desconhecido '{op}' ou operação não suportada entre {tipo_esq} e {tipo_dir}.")
     
 
 
     def _normalize_type(self, tipo_node):
+        # Devolve sempre o tipo canónico (ver tipos.py): strings internadas e tuplos únicos
         kind = tipo_node[0].lower()
         # Caso o tipo seja um tipo simples, retorna o tipo simples
         if kind == 'simple_type':
-            return tipo_node[1].lower()
+            return canonico(tipo_node[1])
         # Caso o tipo seja identificado por um nome (ID), resolve o tipo associado ao identificador
         if kind == 'id_type':
             sym = self.current_scope.resolve(tipo_node[1].lower())
@@ -1109,28 +1282,28 @@ class SemanticAnalyzer:
         # Caso o tipo seja um tipo de array, normaliza o tipo do elemento do array
         if kind == 'array_type':
             elem_type = self._normalize_type(tipo_node[2])
-            return ('array', elem_type)
+            return array_de(elem_type)
         # Caso o tipo seja um 'enum', retorna 'ENUM'
         if kind == 'enum':
-            return 'ENUM'.lower()
+            return ENUM
         # Caso o tipo seja um subintervalo (subrange), considera como 'integer'
         if kind == 'subrange':
-            return 'integer'.lower()
+            return INTEGER
         # Caso o tipo seja 'packed', normaliza o tipo do conteúdo
         if kind == 'packed':
             return self._normalize_type(tipo_node[1])
         # Caso o tipo seja uma short_string, é considerado como 'texto'
         if kind == 'short_string':
-            return 'texto'.lower()
+            return TEXTO
         # Caso o tipo seja 'set', é considerado como 'SET'
         if kind == 'set':
-            return 'SET'.lower()
+            return SET
         # Caso o tipo seja 'file', é considerado como 'FILE'
         if kind == 'file':
-            return 'FILE'.lower()
+            return FILE
         # Caso o tipo seja um 'record', é considerado como 'RECORD'
         if kind == 'record':
-            return 'RECORD'.lower()
+            return RECORD
         
 
 
@@ -1,4 +1,6 @@
-from ana_lex import tokens, build_lexer
+import os
+import sys
+from ana_lex import tokens, build_lexer, StreamingLexer, CompactTokenStream
 import ply.yacc as yacc
 
 # Definição da tupla 'precedence'
@@ -38,6 +40,14 @@ def p_block(p):
     'block : declarations BEGIN statement_list END'
     p[0] = ('block', p[1], p[3])
 
+# Recuperação de erros (modo pânico): um erro nas declarações que nenhuma das regras
+# abaixo apanhe descarta tokens até ao BEGIN do bloco; um erro na última instrução
+# descarta tokens até ao END
+def p_block_error(p):
+    '''block : declarations error BEGIN statement_list END
+             | declarations BEGIN statement_list error END'''
+    p[0] = None
+
 
 
 # Declarações
@@ -49,7 +59,8 @@ def p_declarations(p):
     if p[1] is None:
         p[0] = []
     elif len(p) == 3:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 
 
@@ -80,7 +91,14 @@ def p_const_list(p):
         # Único elemento na lista: inicializa lista com tuplo (nome, expr)
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
+
+# Recuperação de erros: constante inválida, descartada até ao ';'
+def p_const_list_error(p):
+    '''const_list : const_list error SEMI
+                  | error SEMI'''
+    p[0] = p[1] if len(p) == 4 else []
 
 # Cada item representa uma constante nomeada com o respetivo valor.
 def p_CONST_ITEM(p):
@@ -103,7 +121,14 @@ def p_type_list(p):
     if len(p) == 3:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
+
+# Recuperação de erros: definição de tipo inválida, descartada até ao ';'
+def p_type_list_error(p):
+    '''type_list : type_list error SEMI
+                 | error SEMI'''
+    p[0] = p[1] if len(p) == 4 else []
 
 # Cada item associa um identificador a uma definição de tipo (AST)
 def p_type_item(p):
@@ -127,7 +152,8 @@ def p_label_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 
@@ -145,7 +171,8 @@ def p_var_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 # ID_LIST é uma lista de identificadores separados por vírgula
 # Associa múltiplas variáveis ao mesmo tipo
@@ -153,6 +180,12 @@ def p_var_item(p):
     'var_item : ID_LIST COLON type SEMI'
     p[0] = ('vars', p[1], p[3])
 
+# Recuperação de erros: declaração de variáveis (ou campo de record) inválida,
+# descartada até ao ';'
+def p_var_item_error(p):
+    'var_item : error SEMI'
+    p[0] = None
+
 
 
 # Declaração de função
@@ -161,6 +194,11 @@ def p_function_declaration(p):
     'function_declaration : FUNCTION ID LPAREN params RPAREN COLON type SEMI block SEMI'
     p[0] = ('function', p[2], p[4], p[7], p[9])
 
+# Recuperação de erros: cabeçalho de função inválido, descartado até ao início do corpo
+def p_function_declaration_error(p):
+    'function_declaration : FUNCTION error block SEMI'
+    p[0] = None
+
 
 
 # Declaração de procedimento
@@ -169,6 +207,11 @@ def p_procedure_declaration(p):
     'procedure_declaration : PROCEDURE ID LPAREN params RPAREN SEMI block SEMI'
     p[0] = ('procedure', p[2], p[4], p[7])
 
+# Recuperação de erros: cabeçalho de procedimento inválido, descartado até ao início do corpo
+def p_procedure_declaration_error(p):
+    'procedure_declaration : PROCEDURE error block SEMI'
+    p[0] = None
+
 
 
 # Diferentes tipos
@@ -278,7 +321,8 @@ def p_field_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 
 
@@ -297,7 +341,8 @@ def p_variant_list(p):
     if len(p)==3: 
         p[0] = [p[1]]
     else: 
-        p[0] = p[1] + [p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 # Representa uma única alternativa do CASE num registo variante.
 # Cada alternativa é associada a uma constante e um conjunto de campos (field_list).
@@ -315,7 +360,8 @@ def p_ID_LIST(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 
@@ -334,7 +380,8 @@ def p_param_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 # Um parâmetro pode ser:
 # - por valor (ex: `a: Integer`)
@@ -365,9 +412,22 @@ def p_statement_list(p):
         stmts = p[1]
         last = p[3]
         if last is not None:
-            stmts = stmts + [last]
+            stmts.append(last)
         p[0] = stmts
 
+# Recuperação de erros (modo pânico): uma instrução inválida é descartada até ao ';'
+# seguinte e a lista continua com a próxima instrução. O fecho da lista (END/UNTIL)
+# também serve de ponto de sincronização, nas regras de compound, block e repeat.
+# Todas as regras com 'error' terminam num token: uma regra 'X : error' (ou uma
+# alternativa que reduza logo a seguir ao 'error') seria reduzida sem ler tokens e o
+# PLY voltaria ao mesmo erro indefinidamente.
+def p_statement_list_error(p):
+    'statement_list : statement_list error SEMI statement'
+    stmts = p[1]
+    if p[4] is not None:
+        stmts.append(p[4])
+    p[0] = stmts
+
 
 
 # Bloco composto BEGIN ... END com várias instruções dentro.
@@ -376,6 +436,11 @@ def p_compound(p):
     'compound : BEGIN statement_list END'
     p[0] = ('compound', p[2])
 
+# Recuperação de erros: erro na última instrução do bloco, descartada até ao END
+def p_compound_error(p):
+    'compound : BEGIN statement_list error END'
+    p[0] = None
+
 
 
 # Statement genérico — engloba todos os tipos possíveis de instruções válidas.
@@ -470,6 +535,11 @@ def p_repeat_statement(p):
     'repeat_statement : REPEAT statement_list UNTIL expression'
     p[0] = ('repeat', p[2], p[4])
 
+# Recuperação de erros: erro na última instrução do ciclo, descartada até ao UNTIL
+def p_repeat_statement_error(p):
+    'repeat_statement : REPEAT statement_list error UNTIL expression'
+    p[0] = None
+
 
 
 # Instrução CASE (ex: case x of 1: writeln('um'); 2: writeln('dois'); end;)
@@ -485,7 +555,8 @@ def p_case_list(p):
     if len(p)==3: 
         p[0]=[p[1]]
     else: 
-        p[0]=p[1]+[p[2]]
+        p[1].append(p[2])
+        p[0] = p[1]
 
 # Cada item do CASE é uma lista de constantes seguida de ':' e de uma lista de statements
 def p_case_item(p):
@@ -499,7 +570,8 @@ def p_constant_list(p):
     if len(p)==2: 
         p[0]=[p[1]]
     else: 
-        p[0]=p[1]+[p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 
@@ -515,7 +587,8 @@ def p_variable_list(p):
     if len(p)==2: 
         p[0]=[p[1]]
     else: 
-        p[0]=p[1]+[p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 
@@ -600,7 +673,8 @@ def p_expression_list(p):
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 
 
@@ -611,23 +685,163 @@ def p_empty(p):
 
 
 
+class Diagnostico:
+    """
+    Erro sintático encontrado durante o parse.
+    Atributos:
+        lineno (int | None): linha do token inesperado (None no fim do ficheiro).
+        lexpos (int | None): posição do token inesperado no texto.
+        token (str | None): tipo do token inesperado (ex.: 'SEMI'), ou None no fim do ficheiro.
+        valor: valor do token inesperado.
+        mensagem (str): mensagem de erro, tal como é mostrada ao utilizador.
+    """
+    __slots__ = ('lineno', 'lexpos', 'token', 'valor', 'mensagem')
+
+    def __init__(self, tok):
+        if tok:
+            self.lineno, self.lexpos, self.token, self.valor = tok.lineno, tok.lexpos, tok.type, tok.value
+            self.mensagem = f"Erro sintático: token inesperado '{tok.value}' na linha {tok.lineno}"
+        else:
+            self.lineno = self.lexpos = self.token = self.valor = None
+            self.mensagem = "Erro sintático: fim de ficheiro inesperado"
+
+    def __str__(self):
+        return self.mensagem
+
+    def __repr__(self):
+        return f"<Diagnostico linha={self.lineno}, token={self.token}, valor={self.valor!r}>"
+
+
+# Diagnósticos do parse em curso (ver _executar)
+_diagnosticos = None
+
 # Error rule
+# Regista o erro e deixa o PLY recuperar através das regras com 'error' (modo pânico):
+# o parser desempilha até uma declaração/instrução e descarta tokens até um ponto de
+# sincronização (';', END, BEGIN, ...). Para não reportar erros em cascata, o PLY só
+# volta a chamar p_error depois de consumir 3 tokens sem erro.
 def p_error(p):
-    if p:
-        print(f"Erro sintático: token inesperado '{p.value}' na linha {p.lineno}")
-    else:
-        print("Erro sintático: fim de ficheiro inesperado")
+    diagnostico = Diagnostico(p)
+    print(diagnostico.mensagem)
+    if _diagnosticos is not None:
+        _diagnosticos.append(diagnostico)
+
 
 
+# Diretoria onde ficam as tabelas pré-geradas (parsetab.py e lextab_<modo>.py)
+_DIR_TABELAS = os.path.dirname(os.path.abspath(__file__))
+
+# Instâncias construídas uma única vez por processo:
+#   _lexers_mestre: (modo_lexer, otimizado) -> lexer mestre, clonado a cada parse
+#   _parsers:       otimizado -> parser LALR
+_lexers_mestre = {}
+_parsers = {}
+
+
+
+# Devolve o parser LALR, construindo-o apenas na primeira utilização.
+# No modo otimizado não é escrito o parser.out; as tabelas são lidas de parsetab.py
+# e o PLY só as regenera se a assinatura da gramática tiver mudado.
+def obter_parser(otimizado=False):
+    parser = _parsers.get(otimizado)
+    if parser is None:
+        modulo = sys.modules[__name__]
+        if otimizado:
+            parser = yacc.yacc(module=modulo, debug=False, write_tables=True,
+                               tabmodule='parsetab', outputdir=_DIR_TABELAS)
+        else:
+            parser = yacc.yacc(module=modulo)
+        _parsers[otimizado] = parser
+    return parser
+
+
+
+# Devolve um lexer pronto a usar.
+# No modo otimizado, o lexer mestre é construído uma vez a partir de lextab_<modo>.py
+# (sem validação das regras) e cada chamada recebe um clone barato desse mestre.
+# Caso contrário, o lexer é reconstruído a partir das regras em cada chamada.
+# Nota: o lextab não guarda assinatura; se as regras de ana_lex.py mudarem,
+# é necessário regenerar as tabelas com gerar_tabelas().
+def obter_lexer(modo_lexer='regras', otimizado=False):
+    if not otimizado:
+        return build_lexer(modo_lexer)
+    chave = (modo_lexer, otimizado)
+    mestre = _lexers_mestre.get(chave)
+    if mestre is None:
+        mestre = build_lexer(modo_lexer, optimize=True, lextab=f'lextab_{modo_lexer}',
+                             outputdir=_DIR_TABELAS)
+        _lexers_mestre[chave] = mestre
+    return mestre.clone()
+
+
+
+# (Re)gera as tabelas pré-geradas do lexer (para cada modo) e do parser
+def gerar_tabelas():
+    from ana_lex import MODOS_LEXER
+    for modo in MODOS_LEXER:
+        caminho = os.path.join(_DIR_TABELAS, f'lextab_{modo}.py')
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        sys.modules.pop(f'lextab_{modo}', None)
+        _lexers_mestre.pop((modo, True), None)
+        obter_lexer(modo, otimizado=True)
+    caminho = os.path.join(_DIR_TABELAS, 'parsetab.py')
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    sys.modules.pop('parsetab', None)
+    _parsers.pop(True, None)
+    obter_parser(otimizado=True)
+
+
+
+# Corre o parser. Se houver erros sintáticos a AST (parcial, após recuperação) é descartada.
+# Com 'diagnosticos' devolve (ast, lista de Diagnostico); caso contrário só a ast.
+def _executar(parser, diagnosticos, **kwargs):
+    global _diagnosticos
+    _diagnosticos = erros = []
+    try:
+        resultado = parser.parse(**kwargs)
+    finally:
+        _diagnosticos = None
+    if erros:
+        resultado = None
+    return (resultado, erros) if diagnosticos else resultado
+
 
-# Construir parser
-parser = yacc.yacc()
 
 # Função de interface
-def parse(data):
+def parse(data, modo_lexer='regras', otimizado=False, diagnosticos=False):
     """
     Analisa sintaticamente o código Pascal em 'data'.
+    'modo_lexer' escolhe o lexer usado (ver ana_lex.MODOS_LEXER).
+    'otimizado' usa as tabelas pré-geradas e as instâncias em cache.
+    Depois de um erro sintático o parser recupera e continua, reportando todos os erros.
     Retorna a estrutura de programa ou None se erro.
+    Com 'diagnosticos' retorna (programa ou None, lista de Diagnostico).
+    """
+    lexer = obter_lexer(modo_lexer, otimizado)
+    return _executar(obter_parser(otimizado), diagnosticos, input=data, lexer=lexer)
+
+
+def parse_ficheiro(caminho, modo_lexer='regras', otimizado=False, diagnosticos=False):
+    """
+    Analisa sintaticamente o ficheiro Pascal em 'caminho' sem o carregar para memória:
+    os tokens são lidos de forma preguiçosa de um mmap do ficheiro (ver StreamingLexer).
+    Retorna a estrutura de programa ou None se erro (ou o par com 'diagnosticos').
     """
-    lexer = build_lexer()
-    return parser.parse(data, lexer=lexer)
\ No newline at end of file
+    with StreamingLexer(caminho, obter_lexer(modo_lexer, otimizado)) as lexer:
+        return _executar(obter_parser(otimizado), diagnosticos, lexer=lexer)
+
+
+def parse_compacto(data, modo_lexer='regras', otimizado=False, diagnosticos=False):
+    """
+    Analisa sintaticamente o código Pascal em 'data', lexando primeiro para um
+    CompactTokenStream (colunas array('i')) que o parser consome através de um adaptador.
+    Retorna a estrutura de programa ou None se erro (ou o par com 'diagnosticos').
+    """
+    fluxo = CompactTokenStream(data, obter_lexer(modo_lexer, otimizado))
+    return _executar(obter_parser(otimizado), diagnosticos, lexer=fluxo.adaptador())
+
+
+if __name__ == "__main__":
+    gerar_tabelas()
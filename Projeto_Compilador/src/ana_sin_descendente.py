@@ -0,0 +1,507 @@
+import re
+from ana_lex import StreamingLexer
+from ana_sin import precedence, p_expression, obter_lexer, Diagnostico
+
+# Parser descendente recursivo, alternativo ao parser LALR do PLY (ana_sin.py).
+# Reconhece a mesma gramática e produz exatamente a mesma AST: as regras abaixo têm
+# os nomes das produções de ana_sin.py e seguem as mesmas decisões do LALR nos
+# conflitos (ELSE associa-se ao IF mais próximo; num ramo de CASE o ';' termina o
+# ramo, porque a regra case_item tem a precedência de COLON).
+# As expressões são analisadas por Pratt (precedence climbing) a partir da mesma
+# tupla 'precedence' de ana_sin.py.
+
+
+# Operadores binários: os tokens das alternativas 'expression OP expression' de p_expression
+_OPERADORES = re.findall(r'expression (\w+) expression', p_expression.__doc__)
+
+# Nível e associatividade de cada token na tupla 'precedence' (nível 1 = menor precedência)
+_NIVEIS = {tok: (nivel, assoc) for nivel, (assoc, *toks) in enumerate(precedence, start=1) for tok in toks}
+
+def _nivel_operando(tok):
+    # Nível mínimo dos operadores que o operando à direita de 'tok' pode absorver
+    nivel, assoc = _NIVEIS[tok]
+    return nivel if assoc == 'right' else nivel + 1
+
+# token -> (nível do operador, nível mínimo do operando à direita)
+BINARIOS = {tok: (_NIVEIS[tok][0], _nivel_operando(tok)) for tok in _OPERADORES}
+NIVEL_NOT = _nivel_operando('NOT')
+
+# Tokens que formam 'constant' e 'const_expr'
+CONSTANTES = ('INTEGER', 'REAL', 'BOOLEAN', 'CHAR', 'TEXTO')
+CONST_EXPR = CONSTANTES + ('ID',)
+
+
+class _ErroSintatico(Exception):
+    # 'token' é o token inesperado (None no fim do ficheiro)
+    def __init__(self, token):
+        self.token = token
+
+
+class ParserDescendente:
+    """
+    Analisa um programa a partir de qualquer lexer com o método token() (lexer do PLY,
+    StreamingLexer ou o adaptador de CompactTokenStream), com um token de antevisão
+    e, quando necessário, um segundo (ID seguido de '(', ':=', '..', ...).
+    """
+    def __init__(self, lexer):
+        self._ler = lexer.token
+        self._espreitado = None
+        self._tem_espreitado = False
+        self.tok = None
+        self.tipo = None
+        self._avancar()
+
+    # Consome o token atual e devolve-o
+    def _avancar(self):
+        tok = self.tok
+        if self._tem_espreitado:
+            self.tok = self._espreitado
+            self._tem_espreitado = False
+        else:
+            self.tok = self._ler()
+        self.tipo = self.tok.type if self.tok is not None else None
+        return tok
+
+    # Tipo do token a seguir ao atual
+    def _espreitar(self):
+        if not self._tem_espreitado:
+            self._espreitado = self._ler()
+            self._tem_espreitado = True
+        return self._espreitado.type if self._espreitado is not None else None
+
+    def _esperar(self, tipo):
+        if self.tipo != tipo:
+            raise _ErroSintatico(self.tok)
+        return self._avancar()
+
+    # PROGRAM <ID> ';' <block> '.'
+    def program(self):
+        self._esperar('PROGRAM')
+        nome = self._esperar('ID').value
+        self._esperar('SEMI')
+        bloco = self.block()
+        self._esperar('DOT')
+        if self.tok is not None:
+            raise _ErroSintatico(self.tok)
+        return ('program', nome, bloco)
+
+    # <declarations> BEGIN <statement_list> END
+    def block(self):
+        declaracoes = self.declarations()
+        self._esperar('BEGIN')
+        instrucoes = self.statement_list()
+        self._esperar('END')
+        return ('block', declaracoes, instrucoes)
+
+    def declarations(self):
+        declaracoes = []
+        while True:
+            tipo = self.tipo
+            if tipo == 'CONST':
+                declaracoes.append(self.const_declaration())
+            elif tipo == 'TYPE':
+                declaracoes.append(self.type_declaration())
+            elif tipo == 'LABEL':
+                declaracoes.append(self.label_declaration())
+            elif tipo == 'VAR':
+                declaracoes.append(self.var_declaration())
+            elif tipo == 'FUNCTION':
+                declaracoes.append(self.function_declaration())
+            elif tipo == 'PROCEDURE':
+                declaracoes.append(self.procedure_declaration())
+            else:
+                return declaracoes
+
+    # CONST (ID '=' expression ';')+
+    def const_declaration(self):
+        self._avancar()
+        itens = []
+        while True:
+            nome = self._esperar('ID').value
+            self._esperar('EQ')
+            itens.append((nome, self.expression()))
+            self._esperar('SEMI')
+            if self.tipo != 'ID':
+                return ('consts', itens)
+
+    # TYPE (ID '=' type ';')+
+    def type_declaration(self):
+        self._avancar()
+        itens = []
+        while True:
+            nome = self._esperar('ID').value
+            self._esperar('EQ')
+            itens.append((nome, self.type()))
+            self._esperar('SEMI')
+            if self.tipo != 'ID':
+                return ('types', itens)
+
+    # LABEL INTEGER (',' INTEGER)* ';'
+    def label_declaration(self):
+        self._avancar()
+        rotulos = [self._esperar('INTEGER').value]
+        while self.tipo == 'COMMA':
+            self._avancar()
+            rotulos.append(self._esperar('INTEGER').value)
+        self._esperar('SEMI')
+        return ('labels', rotulos)
+
+    # VAR var_item+
+    def var_declaration(self):
+        self._avancar()
+        return ('var_decl', self.var_list())
+
+    # var_item+ (também usado como field_list dos records)
+    def var_list(self):
+        itens = [self.var_item()]
+        while self.tipo == 'ID':
+            itens.append(self.var_item())
+        return itens
+
+    # ID_LIST ':' type ';'
+    def var_item(self):
+        nomes = self.ID_LIST()
+        self._esperar('COLON')
+        tipo = self.type()
+        self._esperar('SEMI')
+        return ('vars', nomes, tipo)
+
+    # FUNCTION ID '(' params ')' ':' type ';' block ';'
+    def function_declaration(self):
+        self._avancar()
+        nome = self._esperar('ID').value
+        self._esperar('LPAREN')
+        params = self.params()
+        self._esperar('RPAREN')
+        self._esperar('COLON')
+        tipo = self.type()
+        self._esperar('SEMI')
+        bloco = self.block()
+        self._esperar('SEMI')
+        return ('function', nome, params, tipo, bloco)
+
+    # PROCEDURE ID '(' params ')' ';' block ';'
+    def procedure_declaration(self):
+        self._avancar()
+        nome = self._esperar('ID').value
+        self._esperar('LPAREN')
+        params = self.params()
+        self._esperar('RPAREN')
+        self._esperar('SEMI')
+        bloco = self.block()
+        self._esperar('SEMI')
+        return ('procedure', nome, params, bloco)
+
+    # param (';' param)*, ou None se não houver parâmetros
+    def params(self):
+        if self.tipo == 'RPAREN':
+            return None
+        params = [self.param()]
+        while self.tipo == 'SEMI':
+            self._avancar()
+            params.append(self.param())
+        return params
+
+    # [VAR | CONST] ID_LIST ':' type
+    def param(self):
+        tag = 'param_val'
+        if self.tipo in ('VAR', 'CONST'):
+            tag = 'param_var' if self._avancar().value.lower() == 'var' else 'param_const'
+        nomes = self.ID_LIST()
+        self._esperar('COLON')
+        return (tag, nomes, self.type())
+
+    def type(self):
+        tipo = self.tipo
+        tok = self.tok
+        if tipo == 'PACKED':
+            self._avancar()
+            return ('packed', self.type())
+        if tipo == 'TIPO':
+            return ('simple_type', self._avancar().value)
+        if tipo == 'ID' and self._espreitar() != 'RANGE':
+            return ('id_type', self._avancar().value)
+        if tipo == 'ARRAY':
+            self._avancar()
+            self._esperar('LBRACKET')
+            intervalo = self.range()
+            self._esperar('RBRACKET')
+            self._esperar('OF')
+            return ('array_type', intervalo, self.type())
+        if tipo == 'LPAREN':
+            self._avancar()
+            nomes = self.ID_LIST()
+            self._esperar('RPAREN')
+            return ('enum', nomes)
+        if tipo in CONST_EXPR:
+            inf, sup = self.range()
+            return ('subrange', inf, sup)
+        if tipo == 'RECORD':
+            self._avancar()
+            campos = self.var_list()
+            variante = self.variant_part() if self.tipo == 'CASE' else None
+            self._esperar('END')
+            return ('record', campos, variante)
+        if tipo in ('SET', 'FILE'):
+            self._avancar()
+            self._esperar('OF')
+            return (tipo.lower(), self.type())
+        raise _ErroSintatico(tok)
+
+    # const_expr '..' const_expr
+    def range(self):
+        inf = self.const_expr()
+        self._esperar('RANGE')
+        return (inf, self.const_expr())
+
+    def const_expr(self):
+        if self.tipo not in CONST_EXPR:
+            raise _ErroSintatico(self.tok)
+        tok = self._avancar()
+        return ('const_expr', tok.type.lower(), tok.value)
+
+    def constant(self):
+        if self.tipo not in CONSTANTES:
+            raise _ErroSintatico(self.tok)
+        tok = self._avancar()
+        return ('const', tok.type.lower(), tok.value)
+
+    # CASE ID ':' TIPO OF (constant ':' '(' field_list ')' ';')+
+    def variant_part(self):
+        self._avancar()
+        nome = self._esperar('ID').value
+        self._esperar('COLON')
+        tipo = self._esperar('TIPO').value
+        self._esperar('OF')
+        variantes = []
+        while True:
+            constante = self.constant()
+            self._esperar('COLON')
+            self._esperar('LPAREN')
+            campos = self.var_list()
+            self._esperar('RPAREN')
+            self._esperar('SEMI')
+            variantes.append((constante, campos))
+            if self.tipo not in CONSTANTES:
+                return ('variant', nome, tipo, variantes)
+
+    def ID_LIST(self):
+        nomes = [self._esperar('ID').value]
+        while self.tipo == 'COMMA':
+            self._avancar()
+            nomes.append(self._esperar('ID').value)
+        return nomes
+
+    # Tal como em p_statement_list, a primeira instrução entra sempre na lista (mesmo
+    # vazia, como None) e as seguintes só se não forem vazias
+    def statement_list(self):
+        instrucoes = [self.statement()]
+        while self.tipo == 'SEMI':
+            self._avancar()
+            instrucao = self.statement()
+            if instrucao is not None:
+                instrucoes.append(instrucao)
+        return instrucoes
+
+    # Devolve None para a instrução vazia
+    def statement(self):
+        tipo = self.tipo
+        tok = self.tok
+        if tipo == 'ID':
+            seguinte = self._espreitar()
+            if seguinte in ('ASSIGN', 'LBRACKET', 'DOT'):
+                alvo = self.variable()
+                self._esperar('ASSIGN')
+                return ('assign', alvo, self.expression())
+            self._avancar()
+            args = []
+            if seguinte == 'LPAREN':
+                self._avancar()
+                args = self.expression_list()
+                self._esperar('RPAREN')
+            return ('call', tok.value, args)
+        if tipo == 'IF':
+            self._avancar()
+            cond = self.expression()
+            self._esperar('THEN')
+            entao = self.statement()
+            senao = None
+            if self.tipo == 'ELSE':
+                self._avancar()
+                senao = self.statement()
+            return ('if', cond, entao, senao)
+        if tipo == 'FOR':
+            self._avancar()
+            var = self._esperar('ID').value
+            self._esperar('ASSIGN')
+            inicio = self.expression()
+            if self.tipo not in ('TO', 'DOWNTO'):
+                raise _ErroSintatico(self.tok)
+            direcao = 'to' if self._avancar().value.lower() == 'to' else 'downto'
+            fim = self.expression()
+            self._esperar('DO')
+            return ('for', var, inicio, fim, direcao, self.statement())
+        if tipo == 'WHILE':
+            self._avancar()
+            cond = self.expression()
+            self._esperar('DO')
+            return ('while', cond, self.statement())
+        if tipo == 'REPEAT':
+            self._avancar()
+            instrucoes = self.statement_list()
+            self._esperar('UNTIL')
+            return ('repeat', instrucoes, self.expression())
+        if tipo == 'CASE':
+            return self.case_statement()
+        if tipo == 'WITH':
+            self._avancar()
+            variaveis = [self.variable()]
+            while self.tipo == 'COMMA':
+                self._avancar()
+                variaveis.append(self.variable())
+            self._esperar('DO')
+            return ('with', variaveis, self.statement())
+        if tipo == 'GOTO':
+            self._avancar()
+            return ('goto', self._esperar('INTEGER').value)
+        if tipo == 'INTEGER':
+            self._avancar()
+            self._esperar('COLON')
+            return ('label_stmt', tok.value, self.statement())
+        if tipo == 'BEGIN':
+            self._avancar()
+            instrucoes = self.statement_list()
+            self._esperar('END')
+            return ('compound', instrucoes)
+        return None
+
+    # CASE expression OF (constant_list ':' statement ';')+ END
+    # O ';' a seguir à instrução fecha sempre o ramo (ver nota no início do ficheiro),
+    # por isso cada ramo tem uma lista com uma única instrução.
+    def case_statement(self):
+        self._avancar()
+        expr = self.expression()
+        self._esperar('OF')
+        ramos = []
+        while True:
+            constantes = [self.const_expr()]
+            while self.tipo == 'COMMA':
+                self._avancar()
+                constantes.append(self.const_expr())
+            self._esperar('COLON')
+            ramos.append((constantes, [self.statement()]))
+            self._esperar('SEMI')
+            if self.tipo not in CONST_EXPR:
+                break
+        self._esperar('END')
+        return ('case', expr, ramos)
+
+    # ID ('[' expression ']' | '.' ID)*
+    def variable(self):
+        tok = self._esperar('ID')
+        var = ('var', tok.value)
+        while True:
+            if self.tipo == 'LBRACKET':
+                self._avancar()
+                indice = self.expression()
+                self._esperar('RBRACKET')
+                var = ('array', var, indice)
+            elif self.tipo == 'DOT':
+                self._avancar()
+                var = ('field', var, self._esperar('ID').value)
+            else:
+                return var
+
+    def expression_list(self):
+        exprs = [self.expression()]
+        while self.tipo == 'COMMA':
+            self._avancar()
+            exprs.append(self.expression())
+        return exprs
+
+    # Pratt: analisa um operando e depois os operadores binários com nível >= 'minimo'.
+    # O operando à direita de cada operador só absorve operadores de nível superior
+    # (associatividade à esquerda), tal como o LALR resolve os conflitos com 'precedence'.
+    def expression(self, minimo=0):
+        esq = self.operand()
+        while True:
+            operador = BINARIOS.get(self.tipo)
+            if operador is None or operador[0] < minimo:
+                return esq
+            op = self._avancar()
+            dir = self.expression(operador[1])
+            if op.type == 'COLON':
+                # x:largura ou x:largura:precisao (ver p_expression)
+                if esq[0] == 'fmt' and esq[3] is None:
+                    esq = ('fmt', esq[1], esq[2], dir)
+                else:
+                    esq = ('fmt', esq, dir, None)
+            else:
+                esq = ('binop', op.value, esq, dir)
+
+    def operand(self):
+        tipo = self.tipo
+        tok = self.tok
+        if tipo == 'ID':
+            if self._espreitar() != 'LPAREN':
+                return self.variable()
+            self._avancar()
+        elif tipo == 'TIPO':
+            self._avancar()
+            if self.tipo != 'LPAREN':
+                raise _ErroSintatico(self.tok)
+        elif tipo in CONSTANTES:
+            self._avancar()
+            return ('const', tipo.lower(), tok.value)
+        elif tipo == 'LPAREN':
+            self._avancar()
+            expr = self.expression()
+            self._esperar('RPAREN')
+            return expr
+        elif tipo == 'LBRACKET':
+            self._avancar()
+            elementos = self.expression_list()
+            self._esperar('RBRACKET')
+            return ('set_lit', elementos)
+        elif tipo == 'NOT':
+            self._avancar()
+            return ('not', self.expression(NIVEL_NOT))
+        else:
+            raise _ErroSintatico(tok)
+        # ID '(' expression_list ')' ou TIPO '(' expression_list ')'
+        self._avancar()
+        args = self.expression_list()
+        self._esperar('RPAREN')
+        return ('call', tok.value, args)
+
+
+def _analisar(lexer, diagnosticos):
+    erros = []
+    try:
+        arvore = ParserDescendente(lexer).program()
+    except _ErroSintatico as e:
+        erros.append(Diagnostico(e.token))
+        print(erros[0].mensagem)
+        arvore = None
+    return (arvore, erros) if diagnosticos else arvore
+
+
+# Funções de interface, com os mesmos argumentos que as de ana_sin.py
+def parse_descendente(data, modo_lexer='regras', otimizado=False, diagnosticos=False):
+    """
+    Analisa sintaticamente o código Pascal em 'data' com o parser descendente recursivo.
+    Retorna a mesma estrutura de programa que ana_sin.parse(), ou None se erro.
+    Ao contrário do parser LALR, pára no primeiro erro sintático: com 'diagnosticos'
+    retorna (programa ou None, lista com no máximo um Diagnostico).
+    """
+    lexer = obter_lexer(modo_lexer, otimizado)
+    lexer.input(data)
+    return _analisar(lexer, diagnosticos)
+
+
+def parse_ficheiro_descendente(caminho, modo_lexer='regras', otimizado=False, diagnosticos=False):
+    """
+    Como parse_descendente(), mas lendo os tokens em streaming de um mmap do ficheiro.
+    """
+    with StreamingLexer(caminho, obter_lexer(modo_lexer, otimizado)) as lexer:
+        return _analisar(lexer, diagnosticos)
@@ -0,0 +1,231 @@
+# Cache em disco da AST já validada semanticamente
+#
+# Compilar o mesmo ficheiro várias vezes (ex.: em CI) repete o lexer, o parser e a análise
+# semântica sobre um texto que não mudou. Este módulo guarda a AST de cada programa que
+# passou a análise semântica, indexada pelo SHA-256 do texto, para que a compilação
+# seguinte salte diretamente para o CodeGenerator.
+#
+# - Serialização: marshal (a AST de tuplos só tem tuplos, listas, strings, números e None,
+#   que o marshal escreve e lê mais depressa do que o pickle); o que o marshal não suporta
+#   usa pickle com o protocolo 5. A leitura é feita com o coletor de lixo suspenso: a AST
+#   cria centenas de milhares de tuplos de uma vez, e as recolhas que isso dispara
+#   (inúteis, porque nada é lixo) custam mais do que a própria leitura.
+# - Versão: a chave inclui um carimbo calculado a partir da assinatura da gramática em
+#   parsetab.py e do código do lexer, do parser e da análise semântica. Qualquer
+#   alteração a um destes invalida as entradas antigas (deixam de ser encontradas e acabam
+#   por ser removidas pelo LRU).
+# - Limite: quando o total de bytes em disco passa o limite, removem-se as entradas usadas
+#   há mais tempo (a data de modificação do ficheiro é atualizada a cada acerto).
+# - Estatísticas: acertos, falhas, escritas e remoções desta instância e acumuladas entre
+#   execuções (num pequeno ficheiro na diretoria da cache).
+
+import gc
+import os
+import json
+import pickle
+import marshal
+import hashlib
+import tempfile
+import parsetab
+
+_DIR_SRC = os.path.dirname(os.path.abspath(__file__))
+
+# Ficheiros cujo conteúdo determina a AST produzida e a validação semântica
+_FONTES_VERSAO = ('ana_lex.py', 'ana_sin.py', 'ana_sin_descendente.py', 'ana_sem.py', 'tipos.py', 'fluxo.py')
+
+EXTENSAO = '.ast'
+FICHEIRO_ESTATISTICAS = 'estatisticas.json'
+MAX_BYTES_OMISSAO = 64 * 1024 * 1024
+CONTADORES_CACHE = ('acertos', 'falhas', 'escritas', 'remocoes')
+
+# Primeiro byte de cada entrada: formato da serialização
+_MARSHAL = b'M'
+_PICKLE = b'P'
+
+
+def _calcular_versao():
+    h = hashlib.sha256()
+    h.update(parsetab._lr_signature.encode('utf-8'))
+    h.update(f"marshal {marshal.version} pickle 5".encode('ascii'))
+    for nome in _FONTES_VERSAO:
+        with open(os.path.join(_DIR_SRC, nome), 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+VERSAO = _calcular_versao()
+
+
+def serializar(arvore):
+    try:
+        return _MARSHAL + marshal.dumps(arvore)
+    except ValueError:
+        return _PICKLE + pickle.dumps(arvore, protocol=5)
+
+
+def desserializar(dados):
+    if dados[:1] == _MARSHAL:
+        carregar = marshal.loads
+    elif dados[:1] == _PICKLE:
+        carregar = pickle.loads
+    else:
+        raise ValueError("entrada da cache com formato desconhecido")
+    return carregar_sem_gc(carregar, memoryview(dados)[1:])
+
+
+def carregar_sem_gc(carregar, dados):
+    ativo = gc.isenabled()
+    gc.disable()
+    try:
+        return carregar(dados)
+    finally:
+        if ativo:
+            gc.enable()
+
+
+class CacheAST:
+    """
+    Cache LRU em disco de ASTs validadas, indexada pelo conteúdo do programa.
+    Uso: chave = cache.chave_texto(codigo); ast = cache.obter(chave) (None numa falha);
+    depois da análise semântica, cache.guardar(chave, ast).
+    """
+
+    def __init__(self, diretoria, max_bytes=MAX_BYTES_OMISSAO):
+        self.diretoria = diretoria
+        self.max_bytes = max_bytes
+        self.acertos = 0
+        self.falhas = 0
+        self.escritas = 0
+        self.remocoes = 0
+        os.makedirs(diretoria, exist_ok=True)
+
+    # -------- chaves --------
+
+    def chave_texto(self, codigo):
+        h = hashlib.sha256(VERSAO.encode('ascii'))
+        h.update(codigo.encode('utf-8'))
+        return h.hexdigest()
+
+    def chave_ficheiro(self, caminho):
+        # Lê o ficheiro por blocos: o modo streaming nunca tem o texto todo em memória
+        h = hashlib.sha256(VERSAO.encode('ascii'))
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1 << 16), b''):
+                h.update(bloco)
+        return h.hexdigest()
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretoria, chave + EXTENSAO)
+
+    # -------- acesso --------
+
+    def obter(self, chave):
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                arvore = desserializar(f.read())
+        except (OSError, ValueError, TypeError, EOFError, pickle.UnpicklingError):
+            # Entrada inexistente, removida por outro processo ou corrompida
+            self.falhas += 1
+            return None
+        try:
+            os.utime(caminho)
+        except OSError:
+            pass
+        self.acertos += 1
+        return arvore
+
+    def guardar(self, chave, arvore):
+        dados = serializar(arvore)
+        # Escreve num ficheiro temporário e renomeia, para que outro processo a ler a
+        # mesma entrada nunca veja um ficheiro a meio
+        fd, temporario = tempfile.mkstemp(dir=self.diretoria, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dados)
+            os.replace(temporario, self._caminho(chave))
+        except OSError:
+            try:
+                os.unlink(temporario)
+            except OSError:
+                pass
+            return
+        self.escritas += 1
+        self._limitar()
+
+    def _entradas(self):
+        entradas = []
+        with os.scandir(self.diretoria) as it:
+            for e in it:
+                if e.name.endswith(EXTENSAO):
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    entradas.append((st.st_mtime_ns, st.st_size, e.path))
+        return entradas
+
+    def _limitar(self):
+        entradas = self._entradas()
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        if total <= self.max_bytes:
+            return
+        entradas.sort()
+        for _, tamanho, caminho in entradas:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(caminho)
+            except OSError:
+                continue
+            total -= tamanho
+            self.remocoes += 1
+
+    def limpar(self):
+        for _, _, caminho in self._entradas():
+            try:
+                os.unlink(caminho)
+            except OSError:
+                pass
+
+    # -------- estatísticas --------
+
+    def _caminho_estatisticas(self):
+        return os.path.join(self.diretoria, FICHEIRO_ESTATISTICAS)
+
+    def estatisticas_acumuladas(self):
+        try:
+            with open(self._caminho_estatisticas(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return dict.fromkeys(CONTADORES_CACHE, 0)
+
+    def registar_estatisticas(self):
+        """
+        Soma os contadores desta instância aos acumulados em disco e põe-nos a zero.
+        A atualização não é atómica entre processos: em execuções concorrentes podem
+        perder-se contagens, o que só afeta o relatório.
+        """
+        acumuladas = self.estatisticas_acumuladas()
+        for nome in CONTADORES_CACHE:
+            acumuladas[nome] = acumuladas.get(nome, 0) + getattr(self, nome)
+            setattr(self, nome, 0)
+        fd, temporario = tempfile.mkstemp(dir=self.diretoria, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(acumuladas, f)
+        os.replace(temporario, self._caminho_estatisticas())
+
+    def relatorio(self):
+        acumuladas = self.estatisticas_acumuladas()
+        entradas = self._entradas()
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        pedidos = acumuladas['acertos'] + acumuladas['falhas']
+        taxa = acumuladas['acertos'] / pedidos * 100 if pedidos else 0.0
+        return "\n".join([
+            f"Cache da AST ({self.diretoria}, versão {VERSAO[:12]}):",
+            f"  Acertos : {acumuladas['acertos']:8d}",
+            f"  Falhas  : {acumuladas['falhas']:8d}   (taxa de acerto {taxa:.1f}%)",
+            f"  Escritas: {acumuladas['escritas']:8d}",
+            f"  Remoções: {acumuladas['remocoes']:8d}",
+            f"  Entradas: {len(entradas):8d}   ({total / 1024:.1f} KiB de {self.max_bytes / 1024:.0f} KiB)",
+        ])
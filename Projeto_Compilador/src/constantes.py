@@ -0,0 +1,376 @@
+# Avaliação de constantes em tempo de compilação e dobragem de expressões constantes
+#
+# AvaliadorConstantes calcula o valor das constantes nomeadas (CONST N = expressão) e de
+# qualquer expressão feita só de literais e constantes: aritmética (+ - * / div mod),
+# relacionais, and/or/not, inteiros, reais, booleanos, chars e textos. Cada constante é
+# avaliada uma só vez (o valor fica memorizado) e uma definição circular (A = B + 1,
+# B = A) é detetada e reportada com o ciclo, em vez de recursão infinita.
+#
+# DobragemConstantes é uma passagem pela AST, antes da geração de código, que substitui
+# no corpo do programa principal:
+# - cada referência a uma constante nomeada pela sua expressão, já dobrada;
+# - cada operação cujos operandos são literais pelo literal do resultado, para que
+#   'N * 2 + 1' gere um só PUSHI em vez de PUSHI, PUSHI, MUL, PUSHI, ADD.
+# Só se dobram as operações em que o valor calculado aqui é o que a VM calcularia com o
+# código do gerador: operandos inteiros, booleanos ou chars (os reais e '/' ficam como
+# estão), div/mod com operandos não negativos e resultados inteiros de 32 bits. As
+# sub-rotinas (onde os nomes podem estar redefinidos) e o 'with' não são alterados.
+
+# Limites dos inteiros que se dobram
+MIN_INTEIRO = -2 ** 31
+MAX_INTEIRO = 2 ** 31 - 1
+
+# Tipos cujos literais resultam de uma dobragem
+TIPOS_DOBRAVEIS = ('integer', 'boolean', 'char')
+
+RELACIONAIS = ('=', '<>', '<', '<=', '>', '>=')
+
+
+class ErroConstante(Exception):
+    """Expressão que não é constante, ou constante que não se consegue avaliar."""
+    pass
+
+
+def _literal(tipo, valor):
+    # Valor Python do literal ('const', tipo, valor) ou ('const_expr', tipo, valor)
+    if tipo == 'integer':
+        return int(valor)
+    if tipo == 'real':
+        return float(valor)
+    if tipo == 'boolean':
+        return valor.lower() == 'true' if isinstance(valor, str) else bool(valor)
+    if tipo in ('char', 'texto'):
+        return valor
+    raise ErroConstante(f"Tipo constante não suportado: {tipo}")
+
+
+def _divisao_inteira(a, b):
+    # div do Pascal: trunca em direção a zero
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def aplicar(op, tipo_esq, esq, tipo_dir, dir_):
+    """Aplica o operador binário 'op' a dois valores constantes; devolve (tipo, valor)."""
+    if op in ('+', '-', '*', '/'):
+        if tipo_esq not in ('integer', 'real') or tipo_dir not in ('integer', 'real'):
+            raise ErroConstante(f"Operador '{op}' só pode ser aplicado a tipos numéricos")
+        if op == '/':
+            if dir_ == 0:
+                raise ErroConstante("Divisão por zero numa expressão constante")
+            return 'real', esq / dir_
+        tipo = 'real' if 'real' in (tipo_esq, tipo_dir) else 'integer'
+        if op == '+':
+            return tipo, esq + dir_
+        if op == '-':
+            return tipo, esq - dir_
+        return tipo, esq * dir_
+    if op in ('div', 'mod'):
+        if tipo_esq != 'integer' or tipo_dir != 'integer':
+            raise ErroConstante(f"Operador '{op}' requer dois inteiros")
+        if dir_ == 0:
+            raise ErroConstante("Divisão por zero numa expressão constante")
+        q = _divisao_inteira(esq, dir_)
+        return 'integer', q if op == 'div' else esq - q * dir_
+    if op in ('and', 'or'):
+        if tipo_esq != 'boolean' or tipo_dir != 'boolean':
+            raise ErroConstante(f"Operador lógico '{op}' requer dois boolean")
+        return 'boolean', (esq and dir_) if op == 'and' else (esq or dir_)
+    if op in RELACIONAIS:
+        numericos = tipo_esq in ('integer', 'real') and tipo_dir in ('integer', 'real')
+        if not numericos and tipo_esq != tipo_dir:
+            raise ErroConstante(f"Comparação '{op}' requer operandos compatíveis")
+        if op == '=':
+            return 'boolean', esq == dir_
+        if op == '<>':
+            return 'boolean', esq != dir_
+        if tipo_esq == 'boolean':
+            raise ErroConstante(f"Operador relacional '{op}' não suportado para boolean")
+        if op == '<':
+            return 'boolean', esq < dir_
+        if op == '<=':
+            return 'boolean', esq <= dir_
+        if op == '>':
+            return 'boolean', esq > dir_
+        return 'boolean', esq >= dir_
+    raise ErroConstante(f"Operador constante não suportado: {op}")
+
+
+class AvaliadorConstantes:
+    """
+    Avalia constantes nomeadas e expressões constantes. Uso:
+        av = AvaliadorConstantes(consts)    # consts: nome -> nó da expressão
+        av.valor('N')                       # (tipo, valor) da constante N
+        av.avaliar(no)                      # (tipo, valor) de uma expressão constante
+    'consts' pode crescer depois de criado o avaliador (o CodeGenerator regista as
+    constantes declaração a declaração); os nomes comparam-se como no gerador, com a
+    capitalização exata. Os valores são tipos Python: int, float, bool ou str.
+    """
+
+    def __init__(self, consts=None):
+        self.consts = {} if consts is None else consts
+        # nome -> (tipo, valor), de cada constante já avaliada
+        self.valores = {}
+        # Constantes em avaliação, pela ordem (para detetar e mostrar ciclos)
+        self._pendentes = []
+
+    @classmethod
+    def do_programa(cls, ast):
+        """Avaliador com as constantes declaradas no bloco principal de 'ast'."""
+        consts = {}
+        for d in ast[2][1] or ():
+            if d and d[0] == 'consts':
+                for nome, expr in d[1]:
+                    consts[nome] = expr
+        return cls(consts)
+
+    def valor(self, nome):
+        """(tipo, valor) da constante 'nome'; avaliada na primeira vez que é pedida."""
+        resultado = self.valores.get(nome)
+        if resultado is not None:
+            return resultado
+        if nome not in self.consts:
+            raise ErroConstante(f"Constante não definida: {nome}")
+        if nome in self._pendentes:
+            ciclo = self._pendentes[self._pendentes.index(nome):] + [nome]
+            raise ErroConstante(f"Constante '{nome}' definida em ciclo: {' -> '.join(ciclo)}")
+        self._pendentes.append(nome)
+        try:
+            resultado = self.avaliar(self.consts[nome])
+        finally:
+            self._pendentes.pop()
+        self.valores[nome] = resultado
+        return resultado
+
+    def avaliar(self, no):
+        """(tipo, valor) da expressão constante 'no'; ErroConstante se não for constante."""
+        tag = no[0]
+        if tag == 'const':
+            return no[1], _literal(no[1], no[2])
+        if tag == 'const_expr':
+            # Limites de arrays e subranges: literais ou o nome de uma constante
+            if no[1] == 'id':
+                return self.valor(no[2])
+            return no[1], _literal(no[1], no[2])
+        if tag == 'var':
+            return self.valor(no[1])
+        if tag == 'not':
+            tipo, valor = self.avaliar(no[1])
+            if tipo != 'boolean':
+                raise ErroConstante(f"Operador 'not' espera uma expressão boolean, não {tipo}")
+            return 'boolean', not valor
+        if tag == 'binop':
+            _, op, esq, dir_ = no
+            tipo_esq, valor_esq = self.avaliar(esq)
+            tipo_dir, valor_dir = self.avaliar(dir_)
+            return aplicar(op.lower(), tipo_esq, valor_esq, tipo_dir, valor_dir)
+        raise ErroConstante(f"Expressão não constante: {tag}")
+
+    def inteiro(self, no):
+        """Valor de uma expressão constante inteira (ex.: o limite de um array)."""
+        tipo, valor = self.avaliar(no)
+        if tipo == 'char':
+            return ord(valor)
+        if tipo == 'boolean':
+            return int(valor)
+        if tipo != 'integer':
+            raise ErroConstante(f"Esperava uma constante inteira, não {tipo}")
+        return valor
+
+
+def _no_literal(tipo, valor):
+    # Nó ('const', ...) do valor, com a representação que o parser daria ao literal
+    if tipo == 'boolean':
+        return ('const', 'boolean', 'true' if valor else 'false')
+    return ('const', tipo, valor)
+
+
+def _dobravel(no):
+    # Literal que pode ser operando de uma dobragem: (tipo, valor), ou None
+    if type(no) is tuple and no[0] == 'const' and no[1] in TIPOS_DOBRAVEIS:
+        return no[1], _literal(no[1], no[2])
+    return None
+
+
+class DobragemConstantes:
+    """
+    Dobragem das expressões constantes do corpo do programa principal. Uso:
+        dob = DobragemConstantes()
+        nova = dob.dobrar(ast)      # nova AST (a original não é alterada)
+    Depois de dobrar:
+        substituicoes: id(nó original) -> nó que o substitui (as referências a constantes
+            e as expressões dobradas, as maiores de cada ramo)
+        reconstruidos: id(nó original) -> nó novo, de todos os nós que mudaram
+        dobradas: número de operações (binop/not) substituídas por um literal
+        referencias: número de referências a constantes substituídas
+    """
+
+    def __init__(self):
+        self.substituicoes = {}
+        self.reconstruidos = {}
+        self.dobradas = 0
+        self.referencias = 0
+        self.avaliador = None
+        # nome da constante -> expressão dobrada (ou None se não se consegue dobrar)
+        self._expressoes = {}
+        self._pendentes = set()
+
+    def dobrar(self, ast):
+        if ast is None:
+            return None
+        self.avaliador = AvaliadorConstantes.do_programa(ast)
+        _, nome, bloco = ast
+        _, decls, comp = bloco
+        novo = self._instrucao(comp)
+        if novo is comp:
+            return ast
+        return ('program', nome, ('block', decls, novo))
+
+    def _mudou(self, no, novo):
+        # Regista o nó reconstruído e devolve-o
+        if novo is not no:
+            self.reconstruidos[id(no)] = novo
+        return novo
+
+    def _substituir(self, no, novo):
+        self.substituicoes[id(no)] = novo
+        return self._mudou(no, novo)
+
+    # -------- instruções --------
+
+    def _instrucao(self, no):
+        if type(no) is list:
+            # Lista de instruções (o corpo de um bloco)
+            stmts = [self._instrucao(s) for s in no]
+            return no if all(a is b for a, b in zip(stmts, no)) else stmts
+        if type(no) is not tuple:
+            return no
+        tag = no[0]
+        if tag == 'compound':
+            stmts = self._instrucao(no[1])
+            if stmts is no[1]:
+                return no
+            return self._mudou(no, ('compound', stmts))
+        if tag == 'assign':
+            _, lhs, expr = no
+            novo = ('assign', self._alvo(lhs), self._expressao(expr))
+        elif tag == 'if':
+            _, cond, entao, senao = no
+            novo = ('if', self._expressao(cond), self._instrucao(entao), self._instrucao(senao))
+        elif tag == 'while':
+            _, cond, corpo = no
+            novo = ('while', self._expressao(cond), self._instrucao(corpo))
+        elif tag == 'for':
+            _, var, inicio, fim, direcao, corpo = no
+            novo = ('for', var, self._expressao(inicio), self._expressao(fim), direcao, self._instrucao(corpo))
+        elif tag == 'call':
+            return self._chamada(no)
+        else:
+            # repeat, case, with, goto, ...: ficam como estão
+            return no
+        if all(a is b for a, b in zip(novo, no)):
+            return no
+        return self._mudou(no, novo)
+
+    def _alvo(self, no):
+        # Destino de uma atribuição ou de um read: só o índice de um array é expressão
+        if type(no) is tuple and no[0] == 'array':
+            indice = self._expressao(no[2])
+            if indice is not no[2]:
+                return self._mudou(no, ('array', no[1], indice))
+        return no
+
+    def _chamada(self, no):
+        _, nome, args = no
+        if not args:
+            return no
+        if nome.lower() in ('read', 'readln'):
+            novos = [self._alvo(a) for a in args]
+        else:
+            novos = [self._expressao(a) for a in args]
+        if all(a is b for a, b in zip(novos, args)):
+            return no
+        return self._mudou(no, ('call', nome, novos))
+
+    # -------- expressões --------
+
+    def _expressao(self, no):
+        if type(no) is not tuple:
+            return no
+        tag = no[0]
+        if tag == 'var':
+            expr = self._constante(no[1])
+            if expr is None:
+                return no
+            self.referencias += 1
+            return self._substituir(no, expr)
+        if tag == 'binop':
+            _, op, esq, dir_ = no
+            nesq = self._expressao(esq)
+            ndir = self._expressao(dir_)
+            literal = self._operacao(op.lower(), nesq, ndir)
+            if literal is not None:
+                self.dobradas += 1
+                return self._substituir(no, literal)
+            if nesq is esq and ndir is dir_:
+                return no
+            return self._mudou(no, ('binop', op, nesq, ndir))
+        if tag == 'not':
+            expr = self._expressao(no[1])
+            operando = _dobravel(expr)
+            if operando is not None and operando[0] == 'boolean':
+                self.dobradas += 1
+                return self._substituir(no, _no_literal('boolean', not operando[1]))
+            if expr is no[1]:
+                return no
+            return self._mudou(no, ('not', expr))
+        if tag == 'array':
+            return self._alvo(no)
+        if tag == 'call':
+            return self._chamada(no)
+        return no
+
+    def _operacao(self, op, esq, dir_):
+        # Literal do resultado de 'esq op dir_', se os operandos são literais dobráveis
+        a = _dobravel(esq)
+        b = _dobravel(dir_)
+        if a is None or b is None or op == '/':
+            return None
+        (tipo_esq, valor_esq), (tipo_dir, valor_dir) = a, b
+        if op in ('div', 'mod') and not (tipo_esq == tipo_dir == 'integer' and valor_esq >= 0 and valor_dir > 0):
+            return None
+        try:
+            tipo, valor = aplicar(op, tipo_esq, valor_esq, tipo_dir, valor_dir)
+        except ErroConstante:
+            return None
+        if tipo == 'integer' and not MIN_INTEIRO <= valor <= MAX_INTEIRO:
+            return None
+        if tipo not in TIPOS_DOBRAVEIS:
+            return None
+        return _no_literal(tipo, valor)
+
+    def _constante(self, nome):
+        # Expressão dobrada da constante 'nome' (None se não é constante ou está em ciclo)
+        if nome in self._expressoes:
+            return self._expressoes[nome]
+        expr = self.avaliador.consts.get(nome)
+        if expr is None or nome in self._pendentes:
+            return None
+        self._pendentes.add(nome)
+        try:
+            # A expressão de uma constante dobra-se como as do corpo, mas sem contar nem
+            # registar os seus nós (não estão no corpo do programa)
+            dobragem = DobragemConstantes()
+            dobragem.avaliador = self.avaliador
+            dobragem._expressoes = self._expressoes
+            dobragem._pendentes = self._pendentes
+            dobrada = dobragem._expressao(expr)
+        finally:
+            self._pendentes.discard(nome)
+        self._expressoes[nome] = dobrada
+        return dobrada
+
+
+def dobrar_constantes(ast):
+    """Devolve a AST com as expressões constantes do corpo do programa dobradas."""
+    return DobragemConstantes().dobrar(ast)
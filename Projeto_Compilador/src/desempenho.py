@@ -0,0 +1,1266 @@
+import io
+import os
+import sys
+import glob
+import contextlib
+import random
+import time
+import tempfile
+import tracemalloc
+import ana_sem
+from ana_lex import build_lexer, StreamingLexer, CompactTokenStream, relex_incremental
+from ana_sin import parse
+from ana_sin_descendente import parse_descendente
+
+
+# Gera um programa Pascal sintaticamente válido com 'n' instruções no bloco principal.
+# Mistura palavras-reservadas, identificadores, literais e comentários para que o
+# texto se aproxime de código real.
+def gerar_programa(n):
+    linhas = [
+        "program Gerado;",
+        "const",
+        "  N = 10;",
+        "var",
+        "  i, j, soma: integer;",
+        "  x: real;",
+        "  ok: boolean;",
+        "  v: array[1..10] of integer;",
+        "begin",
+        "  soma := 0;",
+        "  j := 0;",
+        "  x := 0.0;",
+        "  ok := true;",
+    ]
+    modelos = (
+        "  soma := soma + {k} * 2 - j div 3;",
+        "  if (soma mod 7 = {k}) and ok then j := j + 1 else j := j - 1;",
+        "  for i := 1 to N do v[i] := i + {k};",
+        "  while j > {k} do j := j - 1;",
+        "  {{ comentario {k} }} x := x + 1.5;",
+        "  ok := not ok or (j <= {k});",
+        "  if j < {k} then begin j := j + 2; soma := soma - 1 end;",
+        "  writeln('valor: ', soma, ' ', j);",
+    )
+    for k in range(n):
+        linhas.append(modelos[k % len(modelos)].format(k=k))
+    linhas.append("  writeln(soma)")
+    linhas.append("end.")
+    return "\n".join(linhas) + "\n"
+
+
+# Mede o tempo de uma função, devolvendo o melhor de 'repeticoes' execuções
+def cronometrar(fn, repeticoes=3):
+    melhor = None
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = fn()
+        duracao = time.perf_counter() - inicio
+        if melhor is None or duracao < melhor:
+            melhor = duracao
+    return melhor, resultado
+
+
+# Compara o débito (tokens/s) do lexer com uma regra por palavra-reservada ('regras')
+# com o lexer de regra única + tabela de palavras-reservadas ('tabela')
+def bench_lexer(tamanhos=(1000, 10000, 50000)):
+    print(f"{'instruções':>10} {'tokens':>9} {'regras tok/s':>14} {'tabela tok/s':>14} {'ganho':>7}")
+    for n in tamanhos:
+        codigo = gerar_programa(n)
+        debitos = {}
+        contagem = 0
+        for modo in ('regras', 'tabela'):
+            lexer = build_lexer(modo)
+
+            def lexar():
+                lexer.input(codigo)
+                lexer.lineno = 1
+                total = 0
+                for _ in lexer:
+                    total += 1
+                return total
+
+            duracao, contagem = cronometrar(lexar)
+            debitos[modo] = contagem / duracao
+        print(f"{n:>10} {contagem:>9} {debitos['regras']:>14.0f} {debitos['tabela']:>14.0f} "
+              f"{debitos['tabela'] / debitos['regras']:>6.2f}x")
+
+
+# Mede o pico de memória (tracemalloc) de uma função, devolvendo (pico_bytes, resultado)
+def pico_memoria(fn):
+    tracemalloc.start()
+    try:
+        resultado = fn()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico, resultado
+
+
+# Compara o pico de memória ao lexar um ficheiro grande lido por inteiro (f.read())
+# com o lexer em streaming sobre um mmap do ficheiro
+def bench_streaming(tamanhos=(20000, 100000)):
+    print(f"{'instruções':>10} {'ficheiro':>10} {'read() pico':>12} {'mmap pico':>12}")
+    for n in tamanhos:
+        with tempfile.NamedTemporaryFile('w', suffix='.pas', delete=False, encoding='utf-8') as f:
+            f.write(gerar_programa(n))
+            caminho = f.name
+        try:
+            def lexar_completo():
+                with open(caminho, 'r', encoding='utf-8') as fich:
+                    lexer = build_lexer('tabela')
+                    lexer.input(fich.read())
+                return sum(1 for _ in lexer)
+
+            def lexar_streaming():
+                return sum(1 for _ in StreamingLexer(caminho, build_lexer('tabela')))
+
+            pico_completo, total_a = pico_memoria(lexar_completo)
+            pico_streaming, total_b = pico_memoria(lexar_streaming)
+            assert total_a == total_b
+            tamanho = os.path.getsize(caminho)
+            print(f"{n:>10} {tamanho / 1e6:>8.1f}MB {pico_completo / 1e6:>10.2f}MB {pico_streaming / 1e6:>10.2f}MB")
+        finally:
+            os.remove(caminho)
+
+
+# Compara a memória retida por uma lista de LexToken com a de um CompactTokenStream
+# (colunas array('i')), bem como o tempo de construção de cada um
+def bench_tokens(tamanhos=(10000, 100000)):
+    print(f"{'instruções':>10} {'tokens':>9} {'LexToken':>10} {'compacto':>10} {'B/token':>14} "
+          f"{'t LexToken':>11} {'t compacto':>11}")
+    for n in tamanhos:
+        codigo = gerar_programa(n)
+
+        def lista_lextokens():
+            lexer = build_lexer('tabela')
+            lexer.input(codigo)
+            return list(lexer)
+
+        def fluxo_compacto():
+            return CompactTokenStream(codigo, build_lexer('tabela'))
+
+        medidas = {}
+        for nome, fn in (('lista', lista_lextokens), ('compacto', fluxo_compacto)):
+            tracemalloc.start()
+            resultado = fn()
+            retido, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            duracao, _ = cronometrar(fn, repeticoes=1)
+            medidas[nome] = (retido, duracao, len(resultado))
+            del resultado
+        total = medidas['lista'][2]
+        print(f"{n:>10} {total:>9} {medidas['lista'][0] / 1e6:>8.1f}MB {medidas['compacto'][0] / 1e6:>8.1f}MB "
+              f"{medidas['lista'][0] / total:>6.0f} vs {medidas['compacto'][0] / total:>3.0f} "
+              f"{medidas['lista'][1]:>10.2f}s {medidas['compacto'][1]:>10.2f}s")
+
+
+# Simula edições num editor (inserções/remoções pequenas em posições aleatórias, incluindo
+# aberturas e fechos de comentários e strings) e compara o relex incremental com lexar o
+# texto todo. Cada resultado incremental é verificado contra o relex completo.
+def bench_incremental(n=5000, edicoes=100, semente=0):
+    aleatorio = random.Random(semente)
+    pedacos = ("x", "1", " ", "\n", ";", "begin", "end", ":=", "3.14e") * 4 + ("{", "}", "(*", "*)", "'", "{ a\nb }")
+    lexer = build_lexer('tabela')
+    fluxo = CompactTokenStream(gerar_programa(n), lexer)
+    # Os erros léxicos introduzidos pelas edições não interessam aqui
+    with contextlib.redirect_stdout(io.StringIO()):
+        fluxo, t_completo, t_incremental = _editar(aleatorio, pedacos, lexer, fluxo, edicoes)
+    print(f"{edicoes} edições num programa de {n} instruções ({len(fluxo)} tokens), todas iguais ao relex completo")
+    print(f"  relex completo   : {t_completo / edicoes * 1000:8.2f} ms/edição")
+    print(f"  relex incremental: {t_incremental / edicoes * 1000:8.2f} ms/edição "
+          f"({t_completo / t_incremental:.1f}x)")
+
+
+def _editar(aleatorio, pedacos, lexer, fluxo, edicoes):
+    t_completo = t_incremental = 0.0
+    for _ in range(edicoes):
+        offset = aleatorio.randint(0, len(fluxo.texto))
+        apagados = aleatorio.randint(0, min(3, len(fluxo.texto) - offset))
+        inseridos = "".join(aleatorio.choice(pedacos) for _ in range(aleatorio.randint(0, 2)))
+        inicio = time.perf_counter()
+        fluxo = relex_incremental(fluxo, offset, apagados, inseridos, lexer)
+        t_incremental += time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        completo = CompactTokenStream(fluxo.texto, lexer)
+        t_completo += time.perf_counter() - inicio
+        for coluna in ('tipos', 'inicios', 'fins', 'linhas', 'instaveis'):
+            if getattr(fluxo, coluna) != getattr(completo, coluna):
+                raise AssertionError(f"relex incremental difere do completo em '{coluna}' "
+                                     f"(offset={offset}, apagados={apagados}, inseridos={inseridos!r})")
+    return fluxo, t_completo, t_incremental
+
+
+# Tempo de análise sintática em função do número de instruções do bloco principal.
+# Com listas construídas por append, o tempo por instrução deve manter-se constante.
+def bench_parser(tamanhos=(1000, 10000, 50000, 200000)):
+    print(f"{'instruções':>10} {'tempo':>9} {'µs/instrução':>13}")
+    for n in tamanhos:
+        codigo = gerar_programa(n)
+        duracao, _ = cronometrar(lambda: parse(codigo, modo_lexer='tabela', otimizado=True), repeticoes=1)
+        print(f"{n:>10} {duracao:>8.2f}s {duracao / n * 1e6:>13.1f}")
+
+
+# Teste diferencial: o parser descendente tem de produzir a mesma AST que o LALR
+# em todos os tests/*.pas e num programa gerado
+def _verificar_descendente():
+    pasta = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tests')
+    ficheiros = sorted(glob.glob(os.path.join(pasta, '*.pas')))
+    programas = [(os.path.basename(f), open(f, encoding='utf-8').read()) for f in ficheiros]
+    programas.append(('gerado', gerar_programa(1000)))
+    for nome, codigo in programas:
+        esperado = parse(codigo)
+        if esperado is None:
+            raise AssertionError(f"{nome}: o parser LALR não aceita o programa")
+        if parse_descendente(codigo) != esperado:
+            raise AssertionError(f"{nome}: AST do parser descendente difere da do LALR")
+    return len(programas)
+
+
+# Compara o débito (instruções/s) do parser LALR do PLY com o do parser descendente
+# recursivo, depois de verificar que ambos produzem a mesma AST. A coluna 'lexer'
+# é o tempo de só lexar, comum aos dois.
+def bench_descendente(tamanhos=(1000, 10000, 50000)):
+    print(f"AST igual à do LALR em {_verificar_descendente()} programas (tests/*.pas e gerado)")
+    print(f"{'instruções':>10} {'lexer':>8} {'LALR':>8} {'descendente':>12} {'LALR inst/s':>12} "
+          f"{'desc. inst/s':>13} {'ganho':>7}")
+    for n in tamanhos:
+        codigo = gerar_programa(n)
+        lexer = build_lexer('tabela')
+
+        def lexar():
+            lexer.input(codigo)
+            lexer.lineno = 1
+            for _ in lexer:
+                pass
+
+        t_lexer, _ = cronometrar(lexar, repeticoes=1)
+        t_lalr, _ = cronometrar(lambda: parse(codigo, modo_lexer='tabela', otimizado=True), repeticoes=1)
+        t_desc, _ = cronometrar(lambda: parse_descendente(codigo, modo_lexer='tabela', otimizado=True), repeticoes=1)
+        print(f"{n:>10} {t_lexer:>7.2f}s {t_lalr:>7.2f}s {t_desc:>11.2f}s {n / t_lalr:>12.0f} "
+              f"{n / t_desc:>13.0f} {t_lalr / t_desc:>6.2f}x")
+
+
+# Programa gerado com 'k' erros sintáticos, um por instrução, espalhados pelo bloco
+# principal (em instruções com ':=' acrescenta-se um segundo ':=').
+# Devolve o texto e as linhas dos erros, por ordem.
+def _programa_com_erros(n, k):
+    linhas = gerar_programa(n).split("\n")
+    candidatas = [i for i, linha in enumerate(linhas) if i > 12 and ":=" in linha]
+    passo = len(candidatas) // k
+    escolhidas = candidatas[::passo][:k]
+    for i in escolhidas:
+        linhas[i] = linhas[i].replace(":=", ":= :=", 1)
+    return "\n".join(linhas), [i + 1 for i in escolhidas]
+
+
+# Um programa com vários erros sintáticos: com a recuperação em modo pânico todos são
+# reportados numa só passagem. Compara com o ciclo antigo de "corrigir o primeiro erro e
+# recompilar" (uma compilação por erro, cada uma a pagar o arranque e o lexer).
+def bench_diagnosticos(n=5000, erros=(1, 10, 50)):
+    print(f"{'instruções':>10} {'erros':>6} {'reportados':>11} {'1 passagem':>11} {'1 por erro':>11}")
+    for k in erros:
+        codigo, linhas = _programa_com_erros(n, k)
+        with contextlib.redirect_stdout(io.StringIO()):
+            duracao, (_, diagnosticos) = cronometrar(
+                lambda: parse(codigo, modo_lexer='tabela', otimizado=True, diagnosticos=True), repeticoes=1)
+        if [d.lineno for d in diagnosticos] != linhas:
+            raise AssertionError(f"erros reportados nas linhas {[d.lineno for d in diagnosticos]}, esperado {linhas}")
+        # Uma compilação por erro: em cada passagem o primeiro erro restante já foi corrigido
+        total = 0.0
+        texto = codigo.split("\n")
+        for linha in linhas:
+            atual = "\n".join(texto)
+            with contextlib.redirect_stdout(io.StringIO()):
+                t, _ = cronometrar(lambda: parse(atual, modo_lexer='tabela', otimizado=True), repeticoes=1)
+            total += t
+            texto[linha - 1] = texto[linha - 1].replace(":= :=", ":=", 1)
+        print(f"{n:>10} {k:>6} {len(diagnosticos):>11} {duracao:>10.2f}s {total:>10.2f}s")
+
+
+# Compilação completa (main.compilar) sem cache, com a cache vazia (falha + escrita) e com
+# a cache preenchida (o acerto salta parse e análise semântica); mostra também o tamanho
+# de cada entrada e o tempo de leitura com marshal vs. pickle protocolo 5 (com e sem o
+# coletor de lixo ativo)
+def bench_cache(tamanhos=(1000, 10000, 50000)):
+    import pickle
+    import marshal
+    import main
+    from cache_ast import CacheAST, carregar_sem_gc
+    print(f"{'instruções':>10} {'sem cache':>10} {'falha':>10} {'acerto':>10} {'ganho':>7} "
+          f"{'entrada':>10} {'marshal':>9} {'pickle 5':>9} {'marshal s/gc':>13} {'pickle s/gc':>12}")
+    for n in tamanhos:
+        codigo = gerar_programa(n)
+        main.compilar(codigo, 'tabela', True)
+        with tempfile.TemporaryDirectory() as diretoria:
+            cache = CacheAST(diretoria)
+            t_sem, esperado = cronometrar(lambda: main.compilar(codigo, 'tabela', True))
+            t_falha, _ = cronometrar(lambda: (cache.limpar(), main.compilar(codigo, 'tabela', True, cache=cache)))
+            t_acerto, gen = cronometrar(lambda: main.compilar(codigo, 'tabela', True, cache=cache))
+            if gen.code != esperado.code:
+                raise AssertionError("o código gerado a partir da cache difere do da compilação completa")
+            entrada = sum(os.path.getsize(c) for c in glob.glob(os.path.join(diretoria, '*.ast')))
+        arvore = parse(codigo, modo_lexer='tabela', otimizado=True)
+        dados_m, dados_p = marshal.dumps(arvore), pickle.dumps(arvore, protocol=5)
+        t_m, _ = cronometrar(lambda: marshal.loads(dados_m))
+        t_p, _ = cronometrar(lambda: pickle.loads(dados_p))
+        t_m_gc, _ = cronometrar(lambda: carregar_sem_gc(marshal.loads, dados_m))
+        t_p_gc, _ = cronometrar(lambda: carregar_sem_gc(pickle.loads, dados_p))
+        print(f"{n:>10} {t_sem * 1000:>7.1f} ms {t_falha * 1000:>7.1f} ms {t_acerto * 1000:>7.1f} ms "
+              f"{t_sem / t_acerto:>6.2f}x {entrada / 1024:>6.0f} KiB {t_m * 1000:>6.1f} ms {t_p * 1000:>6.1f} ms "
+              f"{t_m_gc * 1000:>10.1f} ms {t_p_gc * 1000:>9.1f} ms")
+
+
+# Compilação de muitos ficheiros pequenos: um processo 'python main.py' por ficheiro (o
+# que era preciso antes do modo --lote) vs. lote.compilar_lote num só processo e num
+# conjunto de trabalhadores (um por CPU, pelo menos 2 para passar pelo ProcessPoolExecutor),
+# em ficheiros/s
+def bench_lote(ficheiros=200, instrucoes=50, lancados=20):
+    import subprocess
+    import lote
+    trabalhadores = max(2, os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory() as diretoria:
+        caminhos = []
+        for k in range(ficheiros):
+            caminho = os.path.join(diretoria, f"prog{k}.pas")
+            with open(caminho, 'w', encoding='utf-8') as f:
+                f.write(gerar_programa(instrucoes + k % 10))
+            caminhos.append(caminho)
+
+        # main.py procura o ficheiro em ../tests/, daí o caminho relativo; só para os
+        # primeiros 'lancados' ficheiros (cada lançamento custa dezenas de ms)
+        inicio = time.perf_counter()
+        for caminho in caminhos[:lancados]:
+            subprocess.run([sys.executable, 'main.py', os.path.relpath(caminho, os.path.join('..', 'tests'))],
+                           capture_output=True, check=True)
+        t_processos = (time.perf_counter() - inicio) / lancados
+
+        inicio = time.perf_counter()
+        serie = lote.compilar_lote(caminhos, 'tabela', True, trabalhadores=1)
+        t_serie = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        paralelo = lote.compilar_lote(caminhos, 'tabela', True, trabalhadores=trabalhadores)
+        t_paralelo = time.perf_counter() - inicio
+        if any(r.estado != lote.SUCESSO for r in serie + paralelo):
+            raise AssertionError("o programa gerado deveria compilar sem erros")
+
+    print(f"{ficheiros} ficheiros de ~{instrucoes} instruções, {os.cpu_count()} CPU(s):")
+    print(f"  {'um processo por ficheiro':<26}: {1 / t_processos:8.1f} ficheiros/s (medido em {lancados})")
+    print(f"  {'lote, 1 processo':<26}: {ficheiros / t_serie:8.1f} ficheiros/s")
+    print(f"  {f'lote, {trabalhadores} trabalhadores':<26}: {ficheiros / t_paralelo:8.1f} ficheiros/s")
+
+
+# Programa com expressões longas (cadeias de 'termos' operações por atribuição), onde o
+# custo do despacho por nó domina a análise semântica e a geração de código
+def _programa_expressoes(n, termos=30):
+    linhas = ["program Expressoes;", "var a, b, c: integer;", "begin", "  a := 1;", "  b := 2;", "  c := 0;"]
+    operadores = ('+', '-', '*', '+')
+    for k in range(n):
+        operandos = (f"{'ab'[(k + t) % 2]} {operadores[t % 4]} {t + k % 7}" for t in range(termos))
+        linhas.append(f"  c := {' + '.join(operandos)} + c;")
+    linhas.append("  writeln(c)")
+    linhas.append("end.")
+    return "\n".join(linhas) + "\n"
+
+
+# Despacho anterior de SemanticAnalyzer.visit / CodeGenerator.gen (string + getattr por nó)
+def _classes_getattr():
+    from ana_sem import SemanticAnalyzer
+    from gerador_codigo import CodeGenerator
+
+    class AnalisadorGetattr(SemanticAnalyzer):
+        def visit(self, node):
+            if isinstance(node, tuple):
+                return getattr(self, f"visit_{node[0]}", self.generic_visit)(node)
+            elif isinstance(node, list):
+                for item in node:
+                    self.visit(item)
+
+    class GeradorGetattr(CodeGenerator):
+        def gen(self, node):
+            fn = getattr(self, f"gen_{node[0]}", None)
+            if not fn:
+                raise NotImplementedError(f"gen_{node[0]} não implementado")
+            return fn(node)
+
+    return AnalisadorGetattr, GeradorGetattr
+
+
+# Número de chamadas a visit/gen num percurso completo da AST
+def _contar_visitas(arvore):
+    from ana_sem import SemanticAnalyzer
+    from gerador_codigo import CodeGenerator
+
+    class Analisador(SemanticAnalyzer):
+        visitas = 0
+
+        def visit(self, node):
+            self.visitas += 1
+            return super().visit(node)
+
+    class Gerador(CodeGenerator):
+        visitas = 0
+
+        def gen(self, node):
+            self.visitas += 1
+            return super().gen(node)
+
+    analisador, gerador = Analisador(), Gerador()
+    analisador.analyze(arvore)
+    gerador.build_symtab(arvore)
+    gerador.gen(arvore)
+    return analisador.visitas, gerador.visitas
+
+
+# Melhor tempo de cada uma de duas funções, executadas alternadamente e sem o coletor de
+# lixo (as variações da máquina afetam as duas por igual)
+def _alternar(fa, fb, repeticoes=9):
+    import gc
+    melhor_a = melhor_b = float('inf')
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeticoes):
+            melhor_a = min(melhor_a, cronometrar(fa, repeticoes=1)[0])
+            melhor_b = min(melhor_b, cronometrar(fb, repeticoes=1)[0])
+    finally:
+        gc.enable()
+    return melhor_a, melhor_b
+
+
+# Visitas por segundo da análise semântica e da geração de código com o despacho por
+# getattr(self, f"visit_{tag}") (antes) e pela tabela tag -> método ligado (visitante.py)
+def bench_despacho(tamanhos=(2000, 10000)):
+    from ana_sem import SemanticAnalyzer
+    from gerador_codigo import CodeGenerator
+    AnalisadorGetattr, GeradorGetattr = _classes_getattr()
+
+    def analisar(classe, arvore):
+        classe().analyze(arvore)
+
+    def gerar_codigo(classe, arvore):
+        gen = classe()
+        gen.build_symtab(arvore)
+        gen.gen(arvore)
+        return gen
+
+    print(f"{'programa':>22} {'visitas':>9} {'semântica antes':>16} {'depois':>12} "
+          f"{'geração antes':>14} {'depois':>12}")
+    for n in tamanhos:
+        for nome, codigo in ((f"instruções {n}", gerar_programa(n)),
+                             (f"expressões {n // 10}", _programa_expressoes(n // 10))):
+            arvore = parse(codigo, modo_lexer='tabela', otimizado=True)
+            v_sem, v_gen = _contar_visitas(arvore)
+            if gerar_codigo(GeradorGetattr, arvore).code != gerar_codigo(CodeGenerator, arvore).code:
+                raise AssertionError("o despacho por tabela gerou código diferente")
+            t_sem_antes, t_sem = _alternar(lambda: analisar(AnalisadorGetattr, arvore),
+                                           lambda: analisar(SemanticAnalyzer, arvore))
+            t_gen_antes, t_gen = _alternar(lambda: gerar_codigo(GeradorGetattr, arvore),
+                                           lambda: gerar_codigo(CodeGenerator, arvore))
+            print(f"{nome:>22} {v_sem + v_gen:>9} {v_sem / t_sem_antes / 1e6:>11.2f} M/s {v_sem / t_sem / 1e6:>7.2f} M/s "
+                  f"{v_gen / t_gen_antes / 1e6:>9.2f} M/s {v_gen / t_gen / 1e6:>7.2f} M/s")
+
+
+# Programa com 'prof' procedimentos aninhados e 'prof' with encaixados; o corpo mais
+# interno de cada um tem 'n' atribuições a variáveis globais, que a resolução recursiva
+# só encontra depois de subir todos os scopes
+def _programa_aninhado(prof, n):
+    linhas = ["program Aninhado;",
+              "type TReg = record x: integer; y: integer; end;",
+              "var g0, g1, g2: integer;",
+              "    r: TReg;"]
+    for d in range(prof):
+        linhas.append(f"procedure P{d}(a{d}: integer);")
+        linhas.append(f"var l{d}: integer;")
+    fundo = prof - 1
+    linhas.append("begin")
+    linhas.append(f"  l{fundo} := a{fundo}; g0 := l{fundo}; g1 := l{fundo}; g2 := l{fundo};")
+    for k in range(n):
+        linhas.append(f"  g{k % 3} := g{(k + 1) % 3} + l{fundo} + {k};")
+    linhas.append("end;")
+    for d in range(prof - 2, -1, -1):
+        linhas.append(f"begin l{d} := a{d}; P{d + 1}(l{d}) end;")
+    linhas.append("begin")
+    linhas.append("  g0 := 1; g1 := 2; g2 := 3;")
+    linhas.append("  " + "with r do " * prof + "begin")
+    linhas.append("    x := 0; y := 0;")
+    for k in range(n):
+        linhas.append(f"    x := g{k % 3} + y + {k};")
+    linhas.append("  end;")
+    linhas.append("  P0(g0)")
+    linhas.append("end.")
+    return "\n".join(linhas) + "\n"
+
+
+# Tabela de símbolos anterior: cada scope com o seu dicionário e resolve a subir pelos pais
+class _ScopeRecursivo(ana_sem.Scope):
+    __slots__ = ('pai',)
+
+    def __init__(self, pai):
+        super().__init__(depth=0)
+        self.pai = pai
+
+    @property
+    def parent(self):
+        return self.pai
+
+    def bind(self, name, sym):
+        self.symbols[name] = sym
+
+    def resolve(self, name):
+        if name in self.symbols:
+            return self.symbols[name]
+        elif self.pai:
+            return self.pai.resolve(name)
+        else:
+            raise ana_sem.SemanticError(f"Variável '{name}' usada mas não declarada.")
+
+
+class _TabelaRecursiva:
+    def __init__(self):
+        self.atual = None
+
+    def push_scope(self):
+        self.atual = _ScopeRecursivo(self.atual)
+        return self.atual
+
+    def pop_scope(self):
+        self.atual = self.atual.pai
+        return self.atual
+
+
+# Análise semântica de programas com procedimentos/with cada vez mais aninhados, com a
+# tabela de símbolos achatada (ana_sem.SymbolTable) e com a resolução recursiva anterior
+def bench_simbolos(profundidades=(1, 10, 50, 100), n=5000):
+    print(f"{'profundidade':>12} {'recursiva':>11} {'achatada':>11} {'ganho':>7}")
+    for prof in profundidades:
+        arvore = parse(_programa_aninhado(prof, n), modo_lexer='tabela', otimizado=True)
+        analisar = lambda: ana_sem.SemanticAnalyzer().analyze(arvore)
+        tabela = ana_sem.SymbolTable
+        ana_sem.SymbolTable = _TabelaRecursiva
+        try:
+            t_recursiva, _ = cronometrar(analisar)
+        finally:
+            ana_sem.SymbolTable = tabela
+        t_achatada, _ = cronometrar(analisar)
+        print(f"{prof:>12} {t_recursiva * 1000:>8.1f} ms {t_achatada * 1000:>8.1f} ms {t_recursiva / t_achatada:>6.2f}x")
+
+
+# Programa com muitas declarações de tipos (arrays, records, subranges, enum, set), usados
+# em parâmetros e variáveis de 'n' procedimentos, e expressões que comparam esses tipos
+def _programa_tipos(n, registos=20):
+    linhas = ["program Tipos;",
+              "const Max = 10;",
+              "type",
+              "  Vetor = array[1..Max] of integer;",
+              "  Matriz = array[1..Max] of array[1..Max] of real;",
+              "  Dia = (Seg, Ter, Qua, Qui, Sex);",
+              "  Dias = set of Dia;",
+              "  Indice = 1..Max;"]
+    for k in range(registos):
+        linhas.append(f"  Reg{k} = record a: integer; b: real; c: boolean; d: array[1..Max] of char; end;")
+    linhas.append("var")
+    linhas.append("  i, j, soma: integer;")
+    linhas.append("  x, y: real;")
+    linhas.append("  ok: boolean;")
+    linhas.append("  c: char;")
+    linhas.append("  v, w: Vetor;")
+    linhas.append("  m: Matriz;")
+    linhas.append("  dd: Dias;")
+    for k in range(registos):
+        linhas.append(f"  r{k}, s{k}: Reg{k};")
+    for k in range(n):
+        linhas.append(f"procedure P{k}(a: Vetor; b: Reg{k % registos}; n, p: integer; q: real; l: Indice);")
+        linhas.append("var t: array[1..Max] of integer; u: array[1..Max] of real; z: real; e: boolean;")
+        linhas.append("begin")
+        linhas.append("  t[1] := n + p * 2 - l; u[2] := q * 1.5 + n;")
+        linhas.append("  z := q / 2.0 + n * p; e := (z > 1.0) and (n <> p) or (q <= z);")
+        linhas.append("  if e and (l >= 3) then z := z - 1.0 else z := z + q")
+        linhas.append("end;")
+    linhas.append("begin")
+    linhas.append("  i := 1; j := 2; soma := 0; x := 0.5; y := 1.5; ok := true; c := 'a';")
+    for k in range(n):
+        linhas.append(f"  soma := soma + i * {k} - j div 2; x := x * y + soma / 3.0;")
+        linhas.append(f"  ok := (x < y) and (c <> 'b') or not ok; r{k % registos}.a := soma;")
+    linhas.append("  writeln(soma)")
+    linhas.append("end.")
+    return "\n".join(linhas) + "\n"
+
+
+# Análise semântica de programas com muitos tipos (test9_no_code.pas e _programa_tipos):
+# quantos tipos são normalizados, quantos objetos de tipo distintos resultam (com tipos
+# canónicos, um por tipo) e o tempo da análise
+def bench_tipos(tamanhos=(200, 1000)):
+    with open(os.path.join('..', 'tests', 'test9_no_code.pas'), encoding='utf-8') as f:
+        programas = [('test9_no_code.pas', f.read())]
+    programas += [(f"tipos {n}", _programa_tipos(n)) for n in tamanhos]
+    print(f"{'programa':>18} {'normalizações':>14} {'objetos':>8} {'análise':>10}")
+    for nome, codigo in programas:
+        arvore = parse(codigo, modo_lexer='tabela', otimizado=True)
+        analisador = ana_sem.SemanticAnalyzer()
+        tipos = []
+        normalizar = analisador._normalize_type
+
+        def registar(tipo_node):
+            tipo = normalizar(tipo_node)
+            tipos.append(tipo)
+            return tipo
+        analisador._normalize_type = registar
+        analisador.analyze(arvore)
+        objetos = len({id(t) for t in tipos})
+
+        tempo = cronometrar(lambda: ana_sem.SemanticAnalyzer().analyze(arvore), repeticoes=15)[0]
+        print(f"{nome:>18} {len(tipos):>14} {objetos:>8} {tempo * 1000:>7.2f} ms")
+
+
+# Programa com 'variaveis' globais e 'n' grupos de if/while/repeat que leem as variáveis
+# da primeira metade (inicializadas no início) e escrevem em todas
+def _programa_fluxo(variaveis, n):
+    metade = max(1, variaveis // 2)
+    nomes = [f"v{k}" for k in range(variaveis)]
+    linhas = ["program Fluxo;", "var"]
+    for k in range(0, variaveis, 10):
+        linhas.append("  " + ", ".join(nomes[k:k + 10]) + ": integer;")
+    linhas.append("begin")
+    for k in range(metade):
+        linhas.append(f"  v{k} := {k};")
+    rnd = random.Random(variaveis * 31 + n)
+    for k in range(n):
+        a, b, c = (rnd.randrange(metade) for _ in range(3))
+        d = rnd.randrange(variaveis)
+        linhas.append(f"  if v{a} > {k} then begin v{d} := v{b} + 1; v{c} := v{a} end else v{d} := {k};")
+        linhas.append(f"  while v{a} < {k} do begin v{a} := v{a} + 1; v{d} := v{b} end;")
+        linhas.append(f"  repeat v{b} := v{b} - 1 until v{b} < {k};")
+    linhas.append("  writeln(v0)")
+    linhas.append("end.")
+    return "\n".join(linhas) + "\n"
+
+
+# A mesma iteração de GrafoFluxo.resolver com conjuntos de nomes em vez de bits, para
+# comparar o custo das duas representações sobre o mesmo grafo
+def _resolver_conjuntos(grafo, gen, usos, inicial):
+    n = len(grafo.blocos)
+    entradas = [None] * n
+    saidas = [None] * n
+    ordem = grafo._pos_ordem_inversa()
+    mudou = True
+    while mudou:
+        mudou = False
+        for bloco in ordem:
+            valor = inicial if bloco is grafo.entrada else None
+            for p in bloco.predecessores:
+                saida_p = saidas[p.indice]
+                if saida_p is not None:
+                    valor = saida_p if valor is None else valor & saida_p
+            i = bloco.indice
+            entradas[i] = valor
+            saida = gen[i] if valor is None else valor | gen[i]
+            if saida != saidas[i]:
+                saidas[i] = saida
+                mudou = True
+    # None representa "todas as variáveis" (bloco ainda não alcançado)
+    return [i for i in range(n) if entradas[i] is not None and usos[i] - entradas[i]]
+
+
+# Análise de inicialização (fluxo.py): tamanho do grafo do programa principal, tempo da
+# análise semântica completa e tempo de resolver o grafo com inteiros como vetores de
+# bits e com conjuntos de nomes
+def bench_fluxo(tamanhos=((100, 200), (1000, 1000), (5000, 1000))):
+    class Analisador(ana_sem.SemanticAnalyzer):
+        def _fechar_fluxo(self):
+            self.grafo = self.fluxo
+            return super()._fechar_fluxo()
+
+    print(f"{'variáveis':>9} {'grupos':>7} {'blocos':>7} {'análise':>10} {'bits':>10} {'conjuntos':>10} {'ganho':>7}")
+    for variaveis, n in tamanhos:
+        arvore = parse(_programa_fluxo(variaveis, n), modo_lexer='tabela', otimizado=True)
+        analisador = Analisador()
+        analisador.analyze(arvore)
+        grafo = analisador.grafo
+        t_analise, _ = cronometrar(lambda: ana_sem.SemanticAnalyzer().analyze(arvore))
+
+        def nomes(bits):
+            return frozenset(sym.name for sym, bit in grafo.bits.items() if bit & bits)
+        gen = [nomes(b.gen) for b in grafo.blocos]
+        usos = [nomes(b.usos) for b in grafo.blocos]
+        inicial = nomes(grafo.inicial)
+
+        def com_bits():
+            grafo.resolver()
+            return [b.indice for b in grafo.blocos if b.usos & ~grafo.entradas[b.indice]]
+        assert com_bits() == _resolver_conjuntos(grafo, gen, usos, inicial) == []
+        t_bits, t_conj = _alternar(com_bits, lambda: _resolver_conjuntos(grafo, gen, usos, inicial))
+        print(f"{variaveis:>9} {n:>7} {len(grafo.blocos):>7} {t_analise * 1000:>7.1f} ms "
+              f"{t_bits * 1000:>7.2f} ms {t_conj * 1000:>7.2f} ms {t_conj / t_bits:>6.1f}x")
+
+
+
+
+# Programa com 'rotinas' procedimentos e funções de 'instrucoes' instruções cada, que usam
+# as variáveis globais e chamam a rotina anterior, e um corpo que as chama a todas
+def _programa_rotinas(rotinas, instrucoes=20):
+    linhas = ["program Rotinas;",
+              "const Max = 10;",
+              "var g0, g1, g2, total, marca: integer;",
+              "    x: real;"]
+    for k in range(rotinas):
+        funcao = k % 4 == 3
+        if funcao:
+            linhas.append(f"function F{k}(a: integer): integer;")
+        else:
+            linhas.append(f"procedure P{k}(a: integer);")
+        linhas.append("var l, m: integer;")
+        linhas.append("begin")
+        linhas.append("  l := a; m := l + Max;")
+        for i in range(instrucoes):
+            linhas.append(f"  g{i % 3} := g{(i + 1) % 3} + l * {i} - m; x := x + {i}.5;")
+        anterior = k - 1
+        if anterior >= 0 and anterior % 4 != 3:
+            linhas.append(f"  P{anterior}(m);")
+        elif anterior >= 0:
+            linhas.append(f"  m := F{anterior}(l);")
+        linhas.append("  if l > m then total := l else total := m" + (";" if funcao else ""))
+        if funcao:
+            linhas.append(f"  F{k} := total")
+        linhas.append("end;")
+    linhas.append("begin")
+    linhas.append("  g0 := 0; g1 := 1; g2 := 2; total := 0; marca := 0; x := 0.5;")
+    for k in range(rotinas):
+        if k % 4 == 3:
+            linhas.append(f"  total := F{k}({k});")
+        else:
+            linhas.append(f"  P{k}({k});")
+    linhas.append("  writeln(total)")
+    linhas.append("end.")
+    return "\n".join(linhas) + "\n"
+
+
+
+# Latência de uma edição num programa com muitas rotinas: análise semântica completa vs.
+# AnaliseIncremental (reanalisa só as unidades alteradas e as dependentes), com a AST nova
+# vinda de um parse completo (as unidades comparam-se por igualdade) ou com substituir()
+# (só o nó da rotina muda). Edições numa rotina do meio: uma constante no corpo, e uma
+# atribuição a uma global que mais nenhuma rotina atribui (muda o efeito da rotina e, em
+# cascata, o de todas as que a chamam direta ou indiretamente)
+def bench_reanalise(tamanhos=(100, 500, 2000), instrucoes=20):
+    from reanalise import AnaliseIncremental
+
+    def alternar(versoes, analisar):
+        estado = [0]
+
+        def editar():
+            estado[0] = 1 - estado[0]
+            analisar(versoes[estado[0]])
+        return editar
+
+    print(f"{'rotinas':>7} {'edição':>8} {'parse':>9} {'completa':>10} {'incr. (AST)':>12} "
+          f"{'incr. (rotina)':>15} {'unidades':>9} {'ganho':>7}")
+    for n in tamanhos:
+        codigo = _programa_rotinas(n, instrucoes)
+        k = n // 2
+        nome = f"F{k}" if k % 4 == 3 else f"P{k}"
+        inicio = codigo.index(f" {nome}(")
+        fim = codigo.index("end;", inicio)
+        rotina = codigo[inicio:fim]
+        edicoes = [('corpo', rotina.replace("l * 0", "l * 7", 1)),
+                   ('efeito', rotina.replace("begin\n", "begin\n  marca := 1;\n", 1))]
+        t_parse, original = cronometrar(lambda: parse(codigo, modo_lexer='tabela', otimizado=True))
+        for edicao, nova in edicoes:
+            editado = parse(codigo[:inicio] + nova + codigo[fim:], modo_lexer='tabela', otimizado=True)
+            versoes = (original, editado)
+            decls = [next(d for d in v[2][1] if d[1] == nome) for v in versoes]
+
+            # O resultado incremental é o da análise completa, nas duas direções
+            inc = AnaliseIncremental()
+            for versao in versoes + versoes:
+                inc.analisar(versao)
+                completa = ana_sem.SemanticAnalyzer()
+                completa.analyze(versao)
+                assert inc.relatorio_fluxo() == completa.relatorio_fluxo()
+            unidades = len(inc.reanalisadas)
+
+            # Cada chamada medida analisa a versão que não foi analisada na chamada anterior
+            inc.analisar(original)
+            t_completa, _ = cronometrar(alternar(versoes, lambda v: ana_sem.SemanticAnalyzer().analyze(v)), 6)
+            t_ast, _ = cronometrar(alternar(versoes, inc.analisar), 6)
+            inc.analisar(original)
+            t_rotina, _ = cronometrar(alternar(decls, lambda d: inc.substituir(nome, d)), 6)
+            print(f"{n:>7} {edicao:>8} {t_parse * 1000:>6.1f} ms {t_completa * 1000:>7.2f} ms "
+                  f"{t_ast * 1000:>9.2f} ms {t_rotina * 1000:>12.2f} ms {unidades:>4}/{n + 5:<4} "
+                  f"{t_completa / t_rotina:>6.1f}x")
+
+
+# Os programas de ../tests que passam a análise semântica e a geração de código (sem
+# dobragem): lista de (nome do ficheiro, AST)
+def _testes_validos():
+    from gerador_codigo import CodeGenerator
+    validos = []
+    for f in sorted(glob.glob(os.path.join(os.path.dirname(__file__), '..', 'tests', '*.pas'))):
+        with contextlib.redirect_stdout(io.StringIO()):
+            arvore = parse(open(f, encoding='utf-8').read(), modo_lexer='tabela', otimizado=True)
+        try:
+            ana_sem.SemanticAnalyzer().analyze(arvore)
+            gen = CodeGenerator()
+            gen.build_symtab(arvore)
+            gen.gen(arvore)
+        except Exception:
+            continue
+        validos.append((os.path.basename(f), arvore))
+    return validos
+
+
+# Programa com constantes que dependem umas das outras e, no corpo, 'n' instruções com
+# expressões feitas de literais e constantes (misturadas com variáveis)
+def _programa_constantes(n):
+    linhas = ["program Constantes;", "const", "  N = 10;", "  M = N * 2 + 1;", "  LIMITE = M * M - N;",
+              "  ATIVO = true;", "var", "  x: integer;", "  f: boolean;", "  v: array[1..M] of integer;",
+              "begin", "  x := 0;"]
+    for k in range(n):
+        caso = k % 4
+        if caso == 0:
+            linhas.append(f"  x := x + (N * 2 + {k});")
+        elif caso == 1:
+            linhas.append(f"  v[{k % 21} + 1] := x * M + LIMITE div 4;")
+        elif caso == 2:
+            linhas.append(f"  if (x > LIMITE - {k % 100}) and ATIVO then x := x mod M;")
+        else:
+            linhas.append(f"  f := not ATIVO or (x <> N * {k % 100});")
+    linhas += ["  writeln(x)", "end."]
+    return "\n".join(linhas)
+
+
+# Dobragem de constantes (constantes.py): instruções geradas sem e com dobragem, para os
+# programas de teste e para programas com expressões constantes, e o tempo da passagem
+def bench_constantes(tamanhos=(1000, 10000)):
+    import main
+    from constantes import DobragemConstantes
+
+    print(f"{'programa':>16} {'sem dobr.':>10} {'com dobr.':>10} {'redução':>8} {'dobradas':>9} "
+          f"{'consts':>7} {'passagem':>10}")
+    programas = _testes_validos()
+    programas += [(f"constantes {n}", parse(_programa_constantes(n), modo_lexer='tabela', otimizado=True))
+                  for n in tamanhos]
+    programas += [(f"gerado {n}", parse(gerar_programa(n), modo_lexer='tabela', otimizado=True))
+                  for n in tamanhos]
+    total_sem = total_com = 0
+    for nome, arvore in programas:
+        ana_sem.SemanticAnalyzer().analyze(arvore)
+        sem = len(main.gerar_codigo(arvore, main.OpcoesGeracao(dobrar=False)).code)
+        com = len(main.gerar_codigo(arvore).code)
+        dobragem = DobragemConstantes()
+        t_passagem, _ = cronometrar(lambda: DobragemConstantes().dobrar(arvore))
+        dobragem.dobrar(arvore)
+        if nome.endswith('.pas'):
+            total_sem += sem
+            total_com += com
+        print(f"{nome:>16} {sem:>10} {com:>10} {(sem - com) / sem:>7.1%} {dobragem.dobradas:>9} "
+              f"{dobragem.referencias:>7} {t_passagem * 1000:>7.2f} ms")
+    print(f"{'testes (total)':>16} {total_sem:>10} {total_com:>10} {(total_sem - total_com) / total_sem:>7.1%}")
+
+
+# Otimização peephole (peephole.py): instruções antes e depois para cada programa de
+# teste (o .vm escrito por main.py) e para programas gerados, as aplicações de cada regra,
+# as passagens até ao ponto fixo e o tempo do otimizador
+def bench_peephole(tamanhos=(1000, 10000)):
+    import main
+    from peephole import OtimizadorPeephole, NOMES_REGRAS
+
+    print(f"{'programa':>16} {'antes':>8} {'depois':>8} {'redução':>8} {'passag.':>8} {'tempo':>10}")
+    programas = [(nome.replace('.pas', '.vm'), arvore) for nome, arvore in _testes_validos()]
+    programas += [(f"constantes {n}", parse(_programa_constantes(n), modo_lexer='tabela', otimizado=True))
+                  for n in tamanhos]
+    programas += [(f"gerado {n}", parse(gerar_programa(n), modo_lexer='tabela', otimizado=True))
+                  for n in tamanhos]
+    contadores = {}
+    total_antes = total_depois = 0
+    for nome, arvore in programas:
+        ana_sem.SemanticAnalyzer().analyze(arvore)
+        codigo = main.gerar_codigo(arvore, main.OpcoesGeracao(peephole=False)).code
+        t_opt, depois = cronometrar(lambda: OtimizadorPeephole().otimizar(codigo))
+        opt = OtimizadorPeephole()
+        opt.otimizar(codigo)
+        for regra, n in opt.contadores.items():
+            contadores.setdefault(nome.endswith('.vm'), {}).setdefault(regra, 0)
+            contadores[nome.endswith('.vm')][regra] += n
+        if nome.endswith('.vm'):
+            total_antes += len(codigo)
+            total_depois += len(depois)
+        print(f"{nome:>16} {len(codigo):>8} {len(depois):>8} {(len(codigo) - len(depois)) / len(codigo):>7.1%} "
+              f"{opt.passagens:>8} {t_opt * 1000:>7.2f} ms")
+    print(f"{'testes (total)':>16} {total_antes:>8} {total_depois:>8} "
+          f"{(total_antes - total_depois) / total_antes:>7.1%}")
+    print(f"{'regra':>28} {'testes':>8} {'gerados':>8}")
+    for regra in NOMES_REGRAS:
+        print(f"{regra:>28} {contadores.get(True, {}).get(regra, 0):>8} {contadores.get(False, {}).get(regra, 0):>8}")
+
+
+# Programa com ciclos 'for' sobre arrays: em n blocos, índices que a análise de
+# intervalos prova estarem dentro dos limites e, no último ciclo, um limite lido do
+# teclado (o CHECK fica)
+def _programa_arrays(n):
+    linhas = ["program Arrays;", "const", "  N = 100;", "var", "  i, j, k, s: integer;",
+              "  v: array[1..N] of integer;", "  w: array[0..N] of integer;", "begin", "  s := 0;",
+              "  readln(k);"]
+    for _ in range(n):
+        linhas += ["  for i := 1 to N do v[i] := i * 2;",
+                   "  for i := 2 to N do v[i] := v[i - 1] + v[i];",
+                   "  for i := 0 to N - 1 do w[i] := v[i + 1] mod 7;",
+                   "  for i := 1 to N div 2 do",
+                   "    for j := 1 to i do w[i + j] := w[i + j] + v[2 * j];",
+                   "  for i := N downto 1 do s := s + v[i] - w[i mod N];",
+                   "  for i := 1 to k do s := s + v[i];"]
+    linhas += ["  writeln(s)", "end."]
+    return "\n".join(linhas)
+
+
+# Análise de intervalos (intervalos.py): verificações de índices (CHECK) eliminadas e
+# instruções geradas sem e com a análise, para os testes e para programas com ciclos
+# sobre arrays
+def bench_intervalos(tamanhos=(10, 100)):
+    import main
+    from instrucoes import CHECK
+
+    print(f"{'programa':>16} {'CHECK antes':>12} {'eliminados':>11} {'sem interv.':>12} "
+          f"{'com interv.':>12} {'redução':>8}")
+    programas = [(nome.replace('.pas', '.vm'), arvore) for nome, arvore in _testes_validos()]
+    programas += [(f"arrays {n}", parse(_programa_arrays(n), modo_lexer='tabela', otimizado=True))
+                  for n in tamanhos]
+    programas += [(f"gerado {n}", parse(gerar_programa(n), modo_lexer='tabela', otimizado=True))
+                  for n in (1000,)]
+    for nome, arvore in programas:
+        ana_sem.SemanticAnalyzer().analyze(arvore)
+        sem = main.gerar_codigo(arvore, main.OpcoesGeracao(intervalos=False)).code
+        gen = main.gerar_codigo(arvore)
+        checks = sem.ops.count(CHECK)
+        if not checks and nome.endswith('.vm'):
+            continue
+        print(f"{nome:>16} {checks:>12} {gen.checks_eliminados:>11} {len(sem):>12} {len(gen.code):>12} "
+              f"{(len(sem) - len(gen.code)) / len(sem):>7.1%}")
+
+
+# Executa o código da VM gerado (um Codigo, ou uma lista de linhas do .vm, com o
+# subconjunto de instruções que o CodeGenerator emite) e conta as instruções executadas;
+# 'entradas' são as linhas lidas por READ, em ciclo. Devolve (instruções executadas, texto
+# escrito), ou None se passar de 'limite'
+def contar_instrucoes(codigo, entradas=('10',), limite=10 ** 7):
+    from instrucoes import (Codigo, NOMES, ROTULO, START, STOP, NOP, PUSHI, PUSHF, PUSHS, PUSHG, STOREG, DUP,
+                            POP, ADD, SUB, MUL, DIV, MOD, FADD, FSUB, FMUL, FDIV, EQUAL, INF, INFEQ, SUP,
+                            SUPEQ, FINF, FINFEQ, FSUP, FSUPEQ, AND, OR, NOT, ITOF, FTOI, JUMP, JZ, ALLOCN,
+                            LOADN, STOREN, CHECK, READ, ATOI, CHARAT, WRITEI, WRITEF, WRITES, WRITELN)
+    if not isinstance(codigo, Codigo):
+        codigo = Codigo.de_texto(codigo)
+    rotulos = {}
+    programa = []
+    for op, arg in codigo.instrucoes():
+        if op == ROTULO:
+            rotulos[arg] = len(programa)
+        else:
+            programa.append((op, arg))
+    binarios = {
+        ADD: lambda a, b: a + b, SUB: lambda a, b: a - b, MUL: lambda a, b: a * b,
+        DIV: lambda a, b: int(a / b), MOD: lambda a, b: a - int(a / b) * b,
+        FADD: lambda a, b: a + b, FSUB: lambda a, b: a - b, FMUL: lambda a, b: a * b,
+        FDIV: lambda a, b: a / b, EQUAL: lambda a, b: int(a == b),
+        INF: lambda a, b: int(a < b), INFEQ: lambda a, b: int(a <= b),
+        SUP: lambda a, b: int(a > b), SUPEQ: lambda a, b: int(a >= b),
+        FINF: lambda a, b: int(a < b), FINFEQ: lambda a, b: int(a <= b),
+        FSUP: lambda a, b: int(a > b), FSUPEQ: lambda a, b: int(a >= b),
+        AND: lambda a, b: int(bool(a and b)), OR: lambda a, b: int(bool(a or b)),
+    }
+    escritas = (WRITEI, WRITEF, WRITES)
+    pilha, gp, heap, saida = [], {}, [], []
+    pc = executadas = lidas = 0
+    while pc < len(programa):
+        op, arg = programa[pc]
+        pc += 1
+        executadas += 1
+        if executadas > limite:
+            return None
+        if op in binarios:
+            b = pilha.pop()
+            pilha.append(binarios[op](pilha.pop(), b))
+        elif op == PUSHI:
+            pilha.append(arg)
+        elif op == PUSHF:
+            pilha.append(float(arg))
+        elif op == PUSHS:
+            pilha.append(arg)
+        elif op == PUSHG:
+            pilha.append(gp.get(arg, 0))
+        elif op == STOREG:
+            gp[arg] = pilha.pop()
+        elif op == DUP:
+            pilha.extend(pilha[-arg:])
+        elif op == POP:
+            del pilha[len(pilha) - arg:]
+        elif op == NOT:
+            pilha.append(int(pilha.pop() == 0))
+        elif op == ITOF:
+            pilha.append(float(pilha.pop()))
+        elif op == FTOI:
+            pilha.append(int(pilha.pop()))
+        elif op == JUMP:
+            pc = rotulos[arg]
+        elif op == JZ:
+            if pilha.pop() == 0:
+                pc = rotulos[arg]
+        elif op == ALLOCN:
+            heap.append([0] * pilha.pop())
+            pilha.append(len(heap) - 1)
+        elif op == LOADN:
+            i = pilha.pop()
+            pilha.append(heap[pilha.pop()][i])
+        elif op == STOREN:
+            v, i = pilha.pop(), pilha.pop()
+            heap[pilha.pop()][i] = v
+        elif op == CHECK:
+            if not arg[0] <= pilha[-1] <= arg[1]:
+                raise IndexError(f"CHECK {arg[0]},{arg[1]}: {pilha[-1]}")
+        elif op == READ:
+            pilha.append(entradas[lidas % len(entradas)])
+            lidas += 1
+        elif op == ATOI:
+            pilha.append(int(pilha.pop()))
+        elif op == CHARAT:
+            pilha.append(ord(pilha.pop()[0]))
+        elif op in escritas:
+            saida.append(str(pilha.pop()))
+        elif op == WRITELN:
+            saida.append('\n')
+        elif op == STOP:
+            break
+        elif op not in (START, NOP):
+            raise NotImplementedError(f"Instrução não suportada: {NOMES[op]}")
+    return executadas, ''.join(saida)
+
+
+# Programa com ciclos cujos limites e parte do corpo não dependem do ciclo
+def _programa_ciclos(n):
+    linhas = ["program Ciclos;", "const", "  K = 3;", "var", "  i, j, m, s, t: integer;", "begin",
+              "  readln(m);", "  s := 0;", "  t := 0;"]
+    for _ in range(n):
+        linhas += ["  for i := 1 to m * 2 do",
+                   "  begin",
+                   "    s := s + i * (m + K);",
+                   "    for j := 1 to m div 2 do t := t + (m * K - 1) * j;",
+                   "  end;",
+                   "  i := 0;",
+                   "  while i < m * m - K do i := i + (K + 1) * 2;"]
+    linhas += ["  writeln(s, t, i)", "end."]
+    return "\n".join(linhas)
+
+
+# Movimento de código invariante (invariantes.py): expressões calculadas antes dos ciclos
+# e instruções geradas e executadas sem e com o movimento, para os testes (com a entrada
+# 'entrada' em todas as leituras) e para programas com ciclos
+def bench_invariantes(tamanhos=(1, 10), entrada='100'):
+    import main
+
+    print(f"{'programa':>16} {'calculadas':>11} {'geradas':>16} {'executadas':>22} {'redução':>8}")
+    programas = [(nome.replace('.pas', '.vm'), arvore) for nome, arvore in _testes_validos()]
+    programas += [(f"ciclos {n}", parse(_programa_ciclos(n), modo_lexer='tabela', otimizado=True))
+                  for n in tamanhos]
+    for nome, arvore in programas:
+        ana_sem.SemanticAnalyzer().analyze(arvore)
+        sem = main.gerar_codigo(arvore, main.OpcoesGeracao(invariantes=False)).code
+        gen = main.gerar_codigo(arvore)
+        antes = contar_instrucoes(sem, (entrada,))
+        depois = contar_instrucoes(gen.code, (entrada,))
+        if antes is None or depois is None:
+            executadas, reducao = f"{'(sem fim)':>22}", ''
+        else:
+            assert antes[1] == depois[1], nome
+            executadas = f"{antes[0]:>10} -> {depois[0]:>8}"
+            reducao = f"{(antes[0] - depois[0]) / antes[0]:>7.1%}"
+        print(f"{nome:>16} {gen.invariantes_calculados:>11} {len(sem):>6} -> {len(gen.code):>6} {executadas} "
+              f"{reducao:>8}")
+
+
+# Representação das instruções (instrucoes.py): tempo de geração do Codigo, memória que
+# ocupa comparada com a das mesmas instruções como lista de strings (a representação
+# anterior), e tempo de produzir o texto e de o escrever no ficheiro
+def bench_instrucoes(tamanhos=(10000, 100000)):
+    from gerador_codigo import CodeGenerator
+
+    def gerar(arvore):
+        gen = CodeGenerator(intervalos=False, invariantes=False)
+        gen.build_symtab(arvore)
+        gen.gen(arvore)
+        return gen.code
+
+    print(f"{'instruções':>10} {'geradas':>9} {'geração':>10} {'Codigo':>9} {'strings':>9} {'texto':>10} "
+          f"{'escrita':>10}")
+    for n in tamanhos:
+        arvore = parse(gerar_programa(n), modo_lexer='tabela', otimizado=True)
+        ana_sem.SemanticAnalyzer().analyze(arvore)
+        t_gen, codigo = cronometrar(lambda: gerar(arvore))
+        mem_codigo, _ = pico_memoria(lambda: gerar(arvore))
+        mem_linhas, _ = pico_memoria(codigo.linhas)
+        t_texto, _ = cronometrar(codigo.texto)
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'programa.vm')
+
+            def escrever():
+                with open(caminho, 'w') as f:
+                    codigo.escrever(f)
+            t_escrita, _ = cronometrar(escrever)
+        print(f"{n:>10} {len(codigo):>9} {t_gen * 1000:>7.1f} ms {mem_codigo / 2**20:>6.1f} MB "
+              f"{mem_linhas / 2**20:>6.1f} MB {t_texto * 1000:>7.1f} ms {t_escrita * 1000:>7.1f} ms")
+
+
+# Compara gerar o código todo e escrevê-lo no fim (gen.write) com a escrita contínua
+# (saida.py), que otimiza e escreve cada instrução de topo assim que é gerada: pico de
+# memória e tempo da geração + peephole + escrita, a partir da AST já validada
+def bench_escrita(tamanhos=(10000, 100000)):
+    import main
+
+    print(f"{'instruções':>10} {'normal':>10} {'pico':>9} {'contínua':>10} {'pico':>9} {'iguais':>7}")
+    for n in tamanhos:
+        arvore = parse(gerar_programa(n), modo_lexer='tabela', otimizado=True)
+        ana_sem.SemanticAnalyzer().analyze(arvore)
+        with tempfile.TemporaryDirectory() as pasta:
+            normal = os.path.join(pasta, 'normal.vm')
+            continua = os.path.join(pasta, 'continua.vm')
+            escrever_normal = lambda: main.gerar_codigo(arvore, main.OpcoesGeracao(dobrar=False)).write(normal)
+            escrever_continua = lambda: main.gerar_codigo(arvore, main.OpcoesGeracao(dobrar=False), destino=continua)
+            t_normal, _ = cronometrar(escrever_normal)
+            t_continua, _ = cronometrar(escrever_continua)
+            mem_normal, _ = pico_memoria(escrever_normal)
+            mem_continua, _ = pico_memoria(escrever_continua)
+            with open(normal) as a, open(continua) as b:
+                iguais = a.read() == b.read()
+        print(f"{n:>10} {t_normal * 1000:>7.1f} ms {mem_normal / 2**20:>6.1f} MB "
+              f"{t_continua * 1000:>7.1f} ms {mem_continua / 2**20:>6.1f} MB {'sim' if iguais else 'NÃO':>7}")
+
+
+def _programa_mortos(n):
+    # n variáveis globais e n // 10 arrays, dos quais o programa só usa um em cada dez
+    linhas = ["program Mortos;", "var"]
+    linhas += [f"  g{k}: integer;" for k in range(n)]
+    linhas += [f"  t{k}: array[1..100] of integer;" for k in range(n // 10)]
+    linhas += ["begin", "  g0 := 0;"]
+    for k in range(10, n, 10):
+        linhas.append(f"  g{k} := g{k - 10} + {k};")
+    for k in range(0, n // 10, 10):
+        linhas.append(f"  t{k}[1] := g0;")
+    linhas += [f"  writeln(g{(n - 1) // 10 * 10})", "end."]
+    return "\n".join(linhas)
+
+
+# Eliminação das sub-rotinas e globais mortas (alcance.py): posições do gp, células
+# alocadas (ALLOCN) e instruções executadas sem e com a eliminação
+def bench_mortos(tamanhos=(100, 1000, 10000)):
+    import main
+    from instrucoes import PUSHI, ALLOCN
+
+    def celulas(codigo):
+        return sum(codigo.args[k - 1] for k, op in enumerate(codigo.ops) if op == ALLOCN and
+                   codigo.ops[k - 1] == PUSHI)
+
+    print(f"{'globais':>8} {'removidas':>10} {'posições gp':>16} {'células':>18} {'executadas':>20} "
+          f"{'geração':>20}")
+    for n in tamanhos:
+        arvore = parse(_programa_mortos(n), modo_lexer='tabela', otimizado=True)
+        ana_sem.SemanticAnalyzer().analyze(arvore)
+        t_sem, sem = cronometrar(lambda: main.gerar_codigo(arvore, main.OpcoesGeracao(eliminar=False)))
+        t_com, com = cronometrar(lambda: main.gerar_codigo(arvore))
+        antes, saida_antes = contar_instrucoes(sem.code)
+        depois, saida_depois = contar_instrucoes(com.code)
+        assert saida_antes == saida_depois
+        print(f"{n + n // 10:>8} {len(com.globais_removidas):>10} {sem.offset:>7} -> {com.offset:>5} "
+              f"{celulas(sem.code):>8} -> {celulas(com.code):>6} {antes:>9} -> {depois:>7} "
+              f"{t_sem * 1000:>7.1f} -> {t_com * 1000:>5.1f} ms")
+
+
+def _programa_binarios(n, manual=False):
+    # Como o test7_with_functions.pas: converte os números 1..n para binário (num array) e
+    # de volta para inteiro com BinToInt, dentro de um ciclo; com 'manual', as chamadas
+    # são escritas à mão no lugar de cada chamada
+    linhas = ["program Binarios;", "type", "  bits = array[1..16] of integer;"]
+    if not manual:
+        linhas += ["function Bit(x: integer): integer;", "begin", "  Bit := x mod 2", "end;",
+                   "function BinToInt(bin: bits; len: integer): integer;", "var",
+                   "  i, valor, potencia: integer;", "begin", "  valor := 0;", "  potencia := 1;",
+                   "  for i := len downto 1 do", "  begin", "    if bin[i] = 1 then",
+                   "      valor := valor + potencia;", "    potencia := potencia * 2", "  end;",
+                   "  BinToInt := valor", "end;",
+                   "procedure Acumular(var total: integer; valor: integer);", "begin",
+                   "  total := total + valor", "end;"]
+    linhas += ["var", "  bin: bits;", "  k, n, m, total, i, valor, potencia: integer;", "begin",
+               "  total := 0;", f"  for k := 1 to {n} do", "  begin", "    m := k;",
+               "    for n := 16 downto 1 do", "    begin",
+               "      bin[n] := m mod 2;" if manual else "      bin[n] := Bit(m);",
+               "      m := m div 2", "    end;"]
+    if manual:
+        linhas += ["    valor := 0;", "    potencia := 1;", "    for i := 16 downto 1 do", "    begin",
+                   "      if bin[i] = 1 then", "        valor := valor + potencia;",
+                   "      potencia := potencia * 2", "    end;", "    total := total + valor"]
+    else:
+        linhas += ["    Acumular(total, BinToInt(bin, 16))"]
+    linhas += ["  end;", "  writeln(total)", "end."]
+    return "\n".join(linhas)
+
+
+# Expansão em linha (expansao.py) em programas como o test7_with_functions.pas: sem ela
+# nem compilam (o gerador não gera sub-rotinas), por isso a comparação é com o mesmo
+# programa com os corpos escritos à mão no lugar das chamadas
+def bench_expansao(tamanhos=(100, 1000)):
+    import main
+
+    print(f"{'programa':>14} {'expandidas':>11} {'chamadas':>9} {'geradas (mão/exp.)':>19} "
+          f"{'executadas (mão/exp.)':>24} {'diferença':>10}")
+    for n in tamanhos:
+        arvores = []
+        for manual in (True, False):
+            arvore = parse(_programa_binarios(n, manual), modo_lexer='tabela', otimizado=True)
+            ana_sem.SemanticAnalyzer().analyze(arvore)
+            arvores.append(arvore)
+        mao = main.gerar_codigo(arvores[0]).code
+        gen = main.gerar_codigo(arvores[1])
+        antes, saida_antes = contar_instrucoes(mao)
+        depois, saida_depois = contar_instrucoes(gen.code)
+        assert saida_antes == saida_depois == f"{n * (n + 1) // 2}\n"
+        expandidas = sum(d.expandida for d in gen.plano_expansao.decisoes)
+        print(f"{f'binarios {n}':>14} {expandidas:>11} {gen.chamadas_expandidas:>9} {len(mao):>8} -> {len(gen.code):>6} "
+              f"{antes:>11} -> {depois:>9} {(depois - antes) / antes:>+10.1%}")
+
+
+BENCHMARKS = {
+    'lexer': bench_lexer,
+    'streaming': bench_streaming,
+    'tokens': bench_tokens,
+    'incremental': bench_incremental,
+    'parser': bench_parser,
+    'descendente': bench_descendente,
+    'diagnosticos': bench_diagnosticos,
+    'cache': bench_cache,
+    'lote': bench_lote,
+    'despacho': bench_despacho,
+    'simbolos': bench_simbolos,
+    'tipos': bench_tipos,
+    'fluxo': bench_fluxo,
+    'reanalise': bench_reanalise,
+    'constantes': bench_constantes,
+    'peephole': bench_peephole,
+    'intervalos': bench_intervalos,
+    'invariantes': bench_invariantes,
+    'instrucoes': bench_instrucoes,
+    'escrita': bench_escrita,
+    'mortos': bench_mortos,
+    'expansao': bench_expansao,
+}
+
+
+def main():
+    nomes = sys.argv[1:] or list(BENCHMARKS)
+    for nome in nomes:
+        if nome not in BENCHMARKS:
+            print(f"Benchmark desconhecido: '{nome}'. Disponíveis: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        print(f"== {nome}")
+        BENCHMARKS[nome]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+# Expansão em linha (inlining) de sub-rotinas pequenas
+#
+# Cada chamada de uma sub-rotina custa o PUSHI 0 do valor de retorno, os argumentos, o
+# PUSHA do rótulo e o CALL/RETURN, o que pesa nas sub-rotinas pequenas chamadas dentro de
+# ciclos. planear_expansoes() decide, a partir do grafo de chamadas, que sub-rotinas do
+# programa são expandidas: o gerador (CodeGenerator.expandir_chamada) gera o corpo de uma
+# sub-rotina expandida no lugar de cada chamada, com os parâmetros e as variáveis locais
+# em posições escondidas do gp, e a sub-rotina deixa de ser gerada (ver alcance.py).
+#
+# Uma sub-rotina do programa é expandida se:
+# - não é recursiva (não se alcança a si própria no grafo de chamadas; ler o nome de uma
+#   function fora de uma atribuição é uma chamada);
+# - só declara variáveis simples (sem arrays, constantes, tipos, rótulos ou sub-rotinas
+#   locais) e o corpo não tem with/goto;
+# - o corpo, já com as chamadas a outras sub-rotinas expandidas substituídas pelos corpos
+#   delas, tem no máximo 'orcamento' nós da AST;
+# - nenhum parâmetro ou variável local tem o nome de uma constante global;
+# - em todas as chamadas, os argumentos dos parâmetros var e dos parâmetros array são
+#   variáveis (o corpo usa-as diretamente) e, se recebe arrays por valor, o corpo não
+#   escreve em arrays nem chama outras rotinas do utilizador que o pudessem fazer.
+# Todas as chamadas de uma sub-rotina expandida são expandidas. Os nomes são comparados em
+# minúsculas.
+#
+# O plano também guarda o efeito de cada sub-rotina expandida (as variáveis que pode
+# alterar, ver intervalos.atribuidas): um ciclo que a chama continua a ter os seus CHECK
+# analisados e as suas expressões invariantes calculadas antes dele.
+
+from intervalos import atribuidas
+
+# Nós da AST que o corpo de uma sub-rotina expandida pode ter (contando os corpos das
+# sub-rotinas que nele são expandidas)
+ORCAMENTO = 64
+
+# Tags das declarações de sub-rotinas
+_ROTINAS = ('function', 'procedure')
+# Instruções que impedem a expansão
+_PROIBIDAS = frozenset(('with', 'goto', 'label_stmt'))
+
+
+class Decisao:
+    """
+    Decisão de planear_expansoes() sobre uma sub-rotina.
+    Atributos:
+        nome (str): Nome declarado da sub-rotina.
+        expandida (bool): Se as chamadas são expandidas em linha.
+        motivo (str): Porque não é expandida (None se é).
+        chamadas (int): Chamadas encontradas no programa.
+        tamanho (int): Nós da AST do corpo depois das expansões nele (ou None).
+    """
+    __slots__ = ('nome', 'expandida', 'motivo', 'chamadas', 'tamanho')
+
+    def __init__(self, nome, expandida, motivo, chamadas, tamanho):
+        self.nome = nome
+        self.expandida = expandida
+        self.motivo = motivo
+        self.chamadas = chamadas
+        self.tamanho = tamanho
+
+    def __repr__(self):
+        return f"Decisao({self.nome}, {'expandida' if self.expandida else self.motivo})"
+
+
+class PlanoExpansao:
+    """
+    Resultado de planear_expansoes(programa).
+    Atributos:
+        expandidas (dict): Nome (em minúsculas) -> declaração de cada sub-rotina expandida.
+        decisoes (list): Decisao de cada sub-rotina do programa, pela ordem da declaração.
+        efeitos (dict): Nome (em minúsculas) -> (nomes que pode alterar, índices dos
+            parâmetros var) das sub-rotinas expandidas que só chamam sub-rotinas expandidas.
+    """
+    __slots__ = ('expandidas', 'decisoes', 'efeitos')
+
+    def __init__(self, expandidas, decisoes, efeitos):
+        self.expandidas = expandidas
+        self.decisoes = decisoes
+        self.efeitos = efeitos
+
+    def __repr__(self):
+        return f"PlanoExpansao({len(self.expandidas)} de {len(self.decisoes)} sub-rotinas)"
+
+
+def parametros(decl):
+    """Triplos (modo, nome, tipo) dos parâmetros de 'decl', pela ordem dos argumentos."""
+    return [(param[0], nome, param[2]) for param in decl[2] or () for nome in param[1]]
+
+
+def tipo_array(tp, tipos):
+    """Se o tipo 'tp' é um array ('tipos': alias em minúsculas -> tipo)."""
+    if type(tp) is tuple and tp and tp[0] == 'id_type':
+        tp = tipos.get(tp[1].lower(), tp)
+    return type(tp) is tuple and bool(tp) and tp[0] == 'array_type'
+
+
+def resultado_final(decl):
+    """
+    A expressão da última instrução da function 'decl', se essa instrução é a única
+    atribuição ao resultado (ou None).
+    """
+    instrucoes = [stmt for stmt in decl[-1][2] if stmt and stmt[0] != 'empty']
+    if decl[0] != 'function' or not instrucoes:
+        return None
+    ultima = instrucoes[-1]
+    nome = decl[1].lower()
+    if ultima[0] != 'assign' or ultima[1][0] != 'var' or ultima[1][1].lower() != nome:
+        return None
+    pilha = [instrucoes[:-1], ultima[2]]
+    while pilha:
+        atual = pilha.pop()
+        if type(atual) is list:
+            pilha.extend(atual)
+        elif type(atual) is tuple and atual and atual[0] != 'const':
+            if atual[0] == 'assign' and atual[1][0] == 'var' and atual[1][1].lower() == nome:
+                return None
+            pilha.extend(atual[1:])
+    return ultima[2]
+
+
+def _tamanho(no):
+    # Nós (tuplos) da subárvore 'no'
+    total = 0
+    pilha = [no]
+    while pilha:
+        atual = pilha.pop()
+        if type(atual) is list:
+            pilha.extend(atual)
+        elif type(atual) is tuple and atual:
+            total += 1
+            if atual[0] != 'const':
+                pilha.extend(atual[1:])
+    return total
+
+
+def _locais(decl):
+    # Nomes (em minúsculas) dos parâmetros e das declarações locais da sub-rotina 'decl'
+    nomes = {nome.lower() for _, nome, _ in parametros(decl)}
+    for d in decl[-1][1] or ():
+        if type(d) is not tuple or not d:
+            continue
+        if d[0] in _ROTINAS:
+            nomes.add(d[1].lower())
+        elif d[0] == 'var_decl':
+            for item in d[1]:
+                nomes.update(nome.lower() for nome in item[1])
+        elif d[0] in ('consts', 'types'):
+            nomes.update(nome.lower() for nome, _ in d[1])
+    return nomes
+
+
+def _chamadas(no, ocultos, rotinas, sitios):
+    # Acrescenta a 'sitios' os pares (nome em minúsculas, argumentos) das chamadas da
+    # subárvore 'no' às 'rotinas' (argumentos None: function lida sem parêntesis). O alvo
+    # de uma atribuição e a variável de um 'for' não são chamadas
+    pilha = [no]
+    while pilha:
+        atual = pilha.pop()
+        if type(atual) is list:
+            pilha.extend(atual)
+            continue
+        if type(atual) is not tuple or not atual:
+            continue
+        tag = atual[0]
+        if tag == 'call':
+            nome = atual[1].lower()
+            if nome in rotinas and nome not in ocultos:
+                sitios.append((nome, atual[2] or []))
+            pilha.extend(atual[2] or ())
+        elif tag == 'var':
+            nome = atual[1].lower()
+            if nome in rotinas and nome not in ocultos:
+                sitios.append((nome, None))
+        elif tag == 'assign':
+            if atual[1][0] != 'var':
+                pilha.append(atual[1])
+            pilha.append(atual[2])
+        elif tag == 'for':
+            pilha.extend(atual[2:])
+        elif tag != 'const':
+            pilha.extend(atual[1:])
+
+
+def _chamadas_rotina(decl, ocultos, rotinas, sitios):
+    # _chamadas do corpo de 'decl' e das sub-rotinas nela declaradas
+    bloco = decl[-1]
+    if type(bloco) is not tuple or len(bloco) < 3:
+        return
+    locais = ocultos | _locais(decl)
+    _chamadas(bloco[2], locais, rotinas, sitios)
+    for d in bloco[1] or ():
+        if type(d) is tuple and d and d[0] in _ROTINAS:
+            _chamadas_rotina(d, locais, rotinas, sitios)
+
+
+def _contem(no, tags):
+    # Se a subárvore 'no' tem algum nó com uma tag de 'tags'
+    pilha = [no]
+    while pilha:
+        atual = pilha.pop()
+        if type(atual) is list:
+            pilha.extend(atual)
+        elif type(atual) is tuple and atual:
+            if atual[0] in tags:
+                return True
+            if atual[0] != 'const':
+                pilha.extend(atual[1:])
+    return False
+
+
+def _escreve_array(corpo):
+    # Se o corpo escreve num elemento de um array (atribuição ou read): o array pode ser
+    # o recebido por valor, ou o do argumento com o nome global
+    pilha = [corpo]
+    while pilha:
+        atual = pilha.pop()
+        if type(atual) is list:
+            pilha.extend(atual)
+            continue
+        if type(atual) is not tuple or not atual or atual[0] == 'const':
+            continue
+        if atual[0] == 'assign':
+            destinos = [atual[1]]
+        elif atual[0] == 'call' and atual[1].lower() in ('read', 'readln'):
+            destinos = atual[2] or []
+        else:
+            destinos = ()
+        for destino in destinos:
+            if destino[0] == 'array':
+                return True
+        pilha.extend(atual[1:])
+    return False
+
+
+def _impedimento(decl, tipos, constantes):
+    # Porque é que a sub-rotina não pode ser expandida, sem olhar às chamadas (ou None).
+    # 'constantes' são os nomes das constantes globais: a análise de intervalos do
+    # gerador avalia-as pelo nome, mesmo dentro do corpo expandido
+    bloco = decl[-1]
+    for d in bloco[1] or ():
+        if type(d) is not tuple or not d:
+            continue
+        if d[0] != 'var_decl' or any(tipo_array(item[2], tipos) for item in d[1]):
+            return "declarações locais além de variáveis simples"
+    if _contem(bloco[2], _PROIBIDAS):
+        return "with/goto no corpo"
+    if _locais(decl) & constantes:
+        return "parâmetro ou variável local com o nome de uma constante global"
+    por_valor = any(modo != 'param_var' and tipo_array(tp, tipos) for modo, _, tp in parametros(decl))
+    if por_valor and (atribuidas(bloco[2]) is None or _escreve_array(bloco[2])):
+        return "array recebido por valor pode ser alterado"
+    return None
+
+
+def _argumentos_invalidos(decl, args, tipos):
+    # Porque é que uma chamada de 'decl' com 'args' não pode ser expandida (ou None)
+    params = parametros(decl)
+    if len(args) != len(params):
+        return "número de argumentos diferente do de parâmetros"
+    for (modo, _, tp), arg in zip(params, args):
+        if (modo == 'param_var' or tipo_array(tp, tipos)) and (type(arg) is not tuple or arg[0] != 'var'):
+            return "argumento de parâmetro var/array que não é uma variável"
+    return None
+
+
+def planear_expansoes(programa, orcamento=ORCAMENTO):
+    """PlanoExpansao das sub-rotinas do nó 'program' 'programa'."""
+    bloco = programa[2]
+    rotinas = {}
+    tipos = {}
+    constantes = set()
+    for d in bloco[1] or ():
+        if type(d) is not tuple or not d:
+            continue
+        if d[0] in _ROTINAS:
+            rotinas.setdefault(d[1].lower(), d)
+        elif d[0] == 'types':
+            for nome, tp in d[1]:
+                tipos[nome.lower()] = tp
+        elif d[0] == 'consts':
+            constantes.update(nome.lower() for nome, _ in d[1])
+
+    # Chamadas feitas por cada sub-rotina (grafo de chamadas) e todas as do programa
+    sitios_de = {}
+    todos = []
+    _chamadas(bloco[2], frozenset(), rotinas, todos)
+    for nome, decl in rotinas.items():
+        sitios = sitios_de[nome] = []
+        _chamadas_rotina(decl, frozenset(), rotinas, sitios)
+        todos.extend(sitios)
+
+    # Recursiva: alcança-se a si própria no grafo de chamadas
+    recursivas = set()
+    for nome in rotinas:
+        vistas = set()
+        pilha = [chamada for chamada, _ in sitios_de[nome]]
+        while pilha:
+            atual = pilha.pop()
+            if atual == nome:
+                recursivas.add(nome)
+                break
+            if atual not in vistas:
+                vistas.add(atual)
+                pilha.extend(chamada for chamada, _ in sitios_de[atual])
+
+    motivos = {}
+    contagem = {nome: 0 for nome in rotinas}
+    for nome, args in todos:
+        contagem[nome] += 1
+        if nome not in motivos and nome not in recursivas:
+            motivo = _argumentos_invalidos(rotinas[nome], args or [], tipos)
+            if motivo is not None:
+                motivos[nome] = motivo
+
+    # Os tamanhos são calculados depois dos das sub-rotinas chamadas (sem recursão, as
+    # chamadas entre sub-rotinas não recursivas não têm ciclos)
+    tamanhos = {}
+    expandidas = {}
+    efeitos = {}
+
+    def decidir(nome):
+        if nome in tamanhos:
+            return
+        tamanhos[nome] = None
+        decl = rotinas[nome]
+        if nome in recursivas:
+            motivos[nome] = "recursiva"
+            return
+        for chamada, _ in sitios_de[nome]:
+            decidir(chamada)
+        if nome not in motivos:
+            motivo = _impedimento(decl, tipos, constantes)
+            if motivo is not None:
+                motivos[nome] = motivo
+                return
+        tamanho = _tamanho(decl[-1][2])
+        for chamada, _ in sitios_de[nome]:
+            if chamada in expandidas:
+                tamanho += tamanhos[chamada] - 1
+        tamanhos[nome] = tamanho
+        if nome in motivos:
+            return
+        if not contagem[nome]:
+            motivos[nome] = "nunca chamada"
+        elif tamanho > orcamento:
+            motivos[nome] = f"{tamanho} nós (orçamento: {orcamento})"
+        else:
+            expandidas[nome] = decl
+            alteradas = atribuidas(decl[-1][2], efeitos)
+            chamadas = [efeitos.get(chamada) for chamada, _ in sitios_de[nome]]
+            if alteradas is not None and None not in chamadas:
+                # Os parâmetros e as variáveis locais não são vistos de fora (os parâmetros
+                # var contam pelos índices), mas as globais com o mesmo nome que as
+                # sub-rotinas chamadas alteram sim
+                alteradas -= _locais(decl) | {nome}
+                for efeito in chamadas:
+                    alteradas |= efeito[0]
+                indices = tuple(i for i, (modo, _, _) in enumerate(parametros(decl)) if modo == 'param_var')
+                efeitos[nome] = (frozenset(alteradas), indices)
+
+    decisoes = []
+    for nome, decl in rotinas.items():
+        decidir(nome)
+        decisoes.append(Decisao(decl[1], nome in expandidas, motivos.get(nome), contagem[nome], tamanhos[nome]))
+    return PlanoExpansao(expandidas, decisoes, efeitos)
+
+
+def relatorio(plano, chamadas_expandidas):
+    """
+    Texto com as decisões do 'plano' (um PlanoExpansao) e o número de chamadas que o
+    gerador expandiu.
+    """
+    sim = [d for d in plano.decisoes if d.expandida]
+    nao = [d for d in plano.decisoes if not d.expandida]
+    linhas = [
+        f"Sub-rotinas expandidas em linha ({len(sim)}): "
+        + (', '.join(f"{d.nome} ({d.chamadas} chamada(s), {d.tamanho} nós)" for d in sim) or '-'),
+        f"Sub-rotinas não expandidas ({len(nao)}): "
+        + (', '.join(f"{d.nome} ({d.motivo})" for d in nao) or '-'),
+        f"Chamadas expandidas pelo gerador: {chamadas_expandidas}",
+    ]
+    return '\n'.join(linhas)
@@ -0,0 +1,276 @@
+# Análise de fluxo de dados: inicialização definida de variáveis
+#
+# O SemanticAnalyzer guardava num único conjunto global os nomes (em minúsculas) das
+# variáveis já atribuídas, pela ordem do texto: ignorava os ramos, os ciclos e os scopes
+# (duas variáveis com o mesmo nome em rotinas diferentes partilhavam o estado).
+#
+# Aqui, cada rotina (e o programa principal) tem um grafo de fluxo de controlo, construído
+# pelo analisador enquanto visita o corpo: blocos básicos com os usos e as definições de
+# variáveis, pela ordem em que ocorrem, e as arestas de if/while/repeat/for/case/goto.
+# Cada variável que a rotina declara ou atribui recebe um índice denso no seu grafo (os
+# inteiros ficam com tantos bits quantas as variáveis da rotina, não as do programa) e os
+# conjuntos são inteiros Python usados como vetores de bits:
+# - gen[b]: variáveis atribuídas no bloco b;
+# - usos[b]: variáveis lidas em b antes de qualquer atribuição em b (usos expostos).
+# Não há kill: uma atribuição nunca "desinicializa" uma variável. A análise é de "todos
+# os caminhos" (must): entrada[b] = AND das saídas dos predecessores, saída[b] =
+# entrada[b] | gen[b], iterada até ao ponto fixo a partir de "tudo inicializado" nos
+# blocos que não são a entrada. Um uso está errado se usos[b] & ~entrada[b] != 0: uma
+# operação sobre inteiros por bloco, em vez de operações sobre conjuntos de strings.
+#
+# Apenas são verificados os usos das variáveis da própria rotina: as variáveis de scopes
+# exteriores (globais, ou locais da rotina que a contém) podem ter sido atribuídas por
+# quem a chamou. Em contrapartida, cada rotina exporta um resumo — as variáveis exteriores
+# que atribui em todos os caminhos — que é aplicado como definição em cada chamada.
+
+# Conjunto com todos os bits a 1 (x & TODOS == x para qualquer inteiro x)
+TODOS = -1
+
+
+class Bloco:
+    """
+    Bloco básico do grafo de fluxo.
+    Atributos:
+        indice (int): Posição no grafo (ordem de criação, próxima da ordem do texto).
+        gen (int): Bits das variáveis atribuídas no bloco.
+        usos (int): Bits das variáveis lidas antes de serem atribuídas no bloco.
+        expostos (list | None): (ordem, bit, nome) do primeiro uso exposto de cada
+            variável de 'usos'; é o que basta para dizer qual o primeiro uso inválido do
+            bloco. None enquanto não houver nenhum.
+        sucessores, predecessores (list): Blocos ligados por arestas.
+    """
+    __slots__ = ('indice', 'gen', 'usos', 'expostos', 'sucessores', 'predecessores')
+
+    def __init__(self, indice):
+        self.indice = indice
+        self.expostos = None
+        self.gen = 0
+        self.usos = 0
+        self.sucessores = []
+        self.predecessores = []
+
+    def __repr__(self):
+        return f"<Bloco {self.indice} gen={self.gen:#x} usos={self.usos:#x}>"
+
+
+class GrafoFluxo:
+    """
+    Grafo de fluxo de controlo de uma rotina, construído durante a análise semântica.
+    O analisador regista usos e atribuições no bloco 'atual' (usar, definir) e cria os
+    blocos e as arestas das instruções de controlo (novo_bloco, ligar, seguir). No fim do
+    corpo, resolver() calcula as entradas de cada bloco e primeira_falha() devolve o nome
+    da primeira variável lida sem estar inicializada em todos os caminhos.
+    """
+
+    def __init__(self, nome, pai=None):
+        self.nome = nome
+        # Grafo da rotina que contém esta (None no programa principal)
+        self.pai = pai
+        self.blocos = []
+        # Symbol -> bit, e os símbolos pela ordem dos bits
+        self.bits = {}
+        self.simbolos = []
+        # Bits das variáveis declaradas nesta rotina (parâmetros incluídos)
+        self.locais = 0
+        # Bits inicializados à entrada (os parâmetros)
+        self.inicial = 0
+        # Blocos das labels, criados no primeiro goto ou na própria label
+        self.rotulos = {}
+        self.arestas = 0
+        self.ordem = 0
+        self.entrada = self.novo_bloco()
+        self.atual = self.entrada
+        self.saida = None
+        self.entradas = None
+        self.iteracoes = 0
+
+    # -------- construção --------
+
+    def bit(self, sym):
+        """Bit da variável 'sym' neste grafo (uma variável exterior recebe-o na primeira
+        atribuição)."""
+        bit = self.bits.get(sym)
+        if bit is None:
+            bit = self.bits[sym] = 1 << len(self.simbolos)
+            self.simbolos.append(sym)
+        return bit
+
+    def declarar(self, sym, inicializada=False):
+        bit = self.bit(sym)
+        self.locais |= bit
+        if inicializada:
+            self.inicial |= bit
+
+    def novo_bloco(self):
+        bloco = Bloco(len(self.blocos))
+        self.blocos.append(bloco)
+        return bloco
+
+    def ligar(self, origem, destino):
+        origem.sucessores.append(destino)
+        destino.predecessores.append(origem)
+        self.arestas += 1
+
+    def seguir(self, bloco):
+        """Liga o bloco atual a 'bloco' e continua a construção nele."""
+        self.ligar(self.atual, bloco)
+        self.atual = bloco
+        return bloco
+
+    def rotulo(self, chave):
+        bloco = self.rotulos.get(chave)
+        if bloco is None:
+            bloco = self.rotulos[chave] = self.novo_bloco()
+        return bloco
+
+    def usar(self, sym, nome):
+        # Só os usos das variáveis desta rotina são verificados; dentro do bloco, só o
+        # primeiro uso antes de uma atribuição interessa
+        bit = self.bits.get(sym)
+        if bit is not None and bit & self.locais:
+            bloco = self.atual
+            if not (bloco.gen | bloco.usos) & bit:
+                bloco.usos |= bit
+                self.ordem += 1
+                if bloco.expostos is None:
+                    bloco.expostos = [(self.ordem, bit, nome)]
+                else:
+                    bloco.expostos.append((self.ordem, bit, nome))
+
+    def definir(self, sym):
+        self.atual.gen |= self.bit(sym)
+
+    # -------- resolução --------
+
+    def _pos_ordem_inversa(self):
+        visitados = set()
+        ordem = []
+        pilha = [(self.entrada, iter(self.entrada.sucessores))]
+        visitados.add(self.entrada.indice)
+        while pilha:
+            bloco, filhos = pilha[-1]
+            for filho in filhos:
+                if filho.indice not in visitados:
+                    visitados.add(filho.indice)
+                    pilha.append((filho, iter(filho.sucessores)))
+                    break
+            else:
+                pilha.pop()
+                ordem.append(bloco)
+        ordem.reverse()
+        return ordem
+
+    def resolver(self):
+        """
+        Calcula a entrada de cada bloco até ao ponto fixo. Os blocos inalcançáveis (ex.:
+        depois de um goto) ficam com TODOS e nunca dão erro. Devolve as iterações.
+        """
+        self.saida = self.atual
+        entradas = [TODOS] * len(self.blocos)
+        saidas = [TODOS] * len(self.blocos)
+        ordem = self._pos_ordem_inversa()
+        # Sem arestas para trás (ciclos), uma passagem em pós-ordem inversa já vê todos os
+        # predecessores de cada bloco calculados: não é preciso confirmar o ponto fixo
+        posicao = {bloco.indice: k for k, bloco in enumerate(ordem)}
+        ciclos = any(posicao.get(p.indice, -1) >= k
+                     for k, bloco in enumerate(ordem) for p in bloco.predecessores)
+        inicial = self.inicial
+        entrada = self.entrada
+        iteracoes = 0
+        mudou = True
+        while mudou:
+            mudou = False
+            iteracoes += 1
+            for bloco in ordem:
+                valor = inicial if bloco is entrada else TODOS
+                for p in bloco.predecessores:
+                    valor &= saidas[p.indice]
+                i = bloco.indice
+                entradas[i] = valor
+                saida = valor | bloco.gen
+                if saida != saidas[i]:
+                    saidas[i] = saida
+                    mudou = ciclos
+        self.entradas = entradas
+        self.iteracoes = iteracoes
+        return iteracoes
+
+    def primeira_falha(self):
+        """Nome da primeira variável (pela ordem do texto) lida sem estar definitivamente
+        inicializada, ou None."""
+        primeira = None
+        entradas = self.entradas
+        for bloco in self.blocos:
+            falta = bloco.usos & ~entradas[bloco.indice]
+            if falta:
+                for exposto in bloco.expostos:
+                    if exposto[1] & falta:
+                        if primeira is None or exposto < primeira:
+                            primeira = exposto
+                        break
+        return primeira[2] if primeira else None
+
+    def definidas_saida(self):
+        """Bits inicializados em todos os caminhos até ao fim da rotina."""
+        valor = self.entradas[self.saida.indice]
+        return valor | self.saida.gen if valor != TODOS else TODOS
+
+    def resumo(self):
+        return ResumoFluxo(self)
+
+
+class ResumoFluxo:
+    """
+    Resultado da análise de uma rotina: número de blocos, arestas, variáveis e
+    iterações, os nomes das variáveis locais inicializadas (ou não) à saída e os
+    símbolos das variáveis exteriores que a rotina atribui em todos os caminhos (o efeito
+    de uma chamada).
+    """
+    __slots__ = ('nome', 'blocos', 'arestas', 'iteracoes', 'simbolos', 'locais', 'saida',
+                 'exteriores')
+
+    def __init__(self, grafo):
+        saida = grafo.definidas_saida()
+        self.nome = grafo.nome
+        self.blocos = len(grafo.blocos)
+        self.arestas = grafo.arestas
+        self.iteracoes = grafo.iteracoes
+        self.simbolos = grafo.simbolos
+        self.locais = grafo.locais
+        self.saida = saida
+        # Uma rotina que nunca termina (saída inalcançável) não conta como atribuindo nada
+        exteriores = saida & ~grafo.locais if saida != TODOS else 0
+        self.exteriores = tuple(sym for k, sym in enumerate(grafo.simbolos)
+                                if exteriores >> k & 1) if exteriores else ()
+
+    def _locais(self, inicializadas):
+        return [sym.name for k, sym in enumerate(self.simbolos)
+                if self.locais >> k & 1 and bool(self.saida >> k & 1) == inicializadas]
+
+    @property
+    def variaveis(self):
+        return bin(self.locais).count('1')
+
+    @property
+    def inicializadas(self):
+        return self._locais(True)
+
+    @property
+    def por_inicializar(self):
+        return self._locais(False)
+
+    def __repr__(self):
+        return f"ResumoFluxo({self.nome!r}, blocos={self.blocos}, variaveis={self.variaveis})"
+
+
+def relatorio(resumos):
+    """Texto com uma secção por rotina."""
+    linhas = []
+    for r in resumos:
+        linhas.append(f"{r.nome}: {r.blocos} blocos, {r.arestas} arestas, {r.variaveis} variáveis, "
+                      f"{r.iteracoes} iteração(ões)")
+        linhas.append(f"  inicializadas à saída : {', '.join(r.inicializadas) or '-'}")
+        linhas.append(f"  por inicializar       : {', '.join(r.por_inicializar) or '-'}")
+        if r.exteriores:
+            linhas.append(f"  exteriores atribuídas: {', '.join(sym.name for sym in r.exteriores)}")
+    return "\n".join(linhas)
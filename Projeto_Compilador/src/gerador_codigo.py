@@ -1,186 +1,321 @@
-# Extrai o valor de nós do tipo 'const', tipo ou valor, ou de constantes nomeadas
-def extrair_valor_constante(ast, consts):
-    # Se o nó for um inteiro, devolve-o diretamente
-    if isinstance(ast, int):
-        return ast
-    # Se for um float, devolve-o diretamente
-    elif isinstance(ast, float):
-        return ast
-    # Se for um tuplo, trata-o conforme o tipo de nó (const_expr, var, binop, etc.)
-    elif isinstance(ast, tuple):
-        tag = ast[0]
-        # Caso seja uma expressão constante ('const_expr', tipo, valor)
-        if tag == 'const_expr':
-            tipo = ast[1]
-            valor = ast[2]
-            # Converte o valor para o tipo correspondente
-            if tipo == 'integer':
-                return int(valor)
-            elif tipo == 'real':
-                return float(valor)
-            elif tipo == 'boolean':
-                return valor.lower() == 'true'
-            elif tipo == 'char':
-                return valor  # Assume que já é um char simples
-            else:
-                # Se o tipo não for suportado, lança uma exceção
-                raise Exception(f"Tipo constante não suportado: {tipo}")
-        # Caso seja uma constante nomeada ('var', nome)
-        elif tag == 'var':
-            nome = ast[1]
-            if nome not in consts:
-                # Se a constante não estiver definida, lança uma exceção
-                raise Exception(f"Constante não definida: {nome}")
-            # Chama recursivamente para extrair o valor da constante referenciada
-            return extrair_valor_constante(consts[nome], consts)
-        # Caso de operação binária de constantes: ('binop', op, left, right)
-        elif tag == 'binop':
-            _, op, left, right = ast
-            # Extrai recursivamente os valores das subexpressões
-            lval = extrair_valor_constante(left, consts)
-            rval = extrair_valor_constante(right, consts)
-            # Se o operador for aritmético, executa-o em lval e rval
-            if op in ('+', '-', '*', '/', 'div', 'mod'):
-                if op == '+': return lval + rval
-                if op == '-': return lval - rval
-                if op == '*': return lval * rval
-                if op == '/': return lval / rval
-                if op == 'div': return lval // rval
-                if op == 'mod': return lval % rval
-            else:
-                # Operador binário constante não suportado
-                raise Exception(f"Operador constante não suportado: {op}")
-        else:
-            # Nó inesperado
-            raise Exception(f"Nó constante inesperado: {ast}")
-    else:
-        # Tipo de nó fora do esperado (nem inteiro, nem float, nem tuplo)
-        raise Exception(f"Tipo de nó inesperado: {ast}")
-
-
-
-class CodeGenerator:
-    def __init__(self):
+from visitante import Visitante
+from constantes import AvaliadorConstantes
+from intervalos import intervalo, intervalo_for, atribuidas
+from invariantes import invariantes, substituir
+from alcance import alcancaveis
+from expansao import planear_expansoes, parametros, tipo_array, resultado_final
+from instrucoes import (Codigo, ROTULO, START, STOP, PUSHI, PUSHF, PUSHS, PUSHG, STOREG, PUSHL, STOREL,
+                        PUSHA, ADD, SUB, MUL, DIV, MOD, FADD, FSUB, FMUL, FDIV, EQUAL, INF, INFEQ, SUP,
+                        SUPEQ, FINF, FINFEQ, FSUP, FSUPEQ, NE, AND, OR, NOT, ITOF, FTOI, JUMP, JZ, CALL,
+                        ALLOCN, LOADN, STOREN, CHECK, READ, ATOI, CHARAT, WRITEI, WRITES, WRITELN)
+
+
+class CodeGenerator(Visitante):
+    PREFIXO = 'gen_'
+
+    def __init__(self, *, intervalos=True, invariantes=True, eliminar=True, expandir=True, saida=None):
+        # Tabela tag -> gen_<tag> ligado a esta instância (ver visitante.py)
+        self.despacho = self.tabela_despacho(self._nao_implementado)
         # Tabela de símbolos: associa nome a informações de cada identificador
         self.symtab = {}
         # Constantes nomeadas extraídas da AST
         self.consts = {}
+        # Valores das constantes (limites dos arrays), avaliados uma vez cada
+        self.constantes = AvaliadorConstantes(self.consts)
         # Sub-rotinas (functions/procedures): nome -> (etiqueta, número_de_parâmetros)
         self.subroutines = {}
+        # Declaração de cada sub-rotina (nome -> nó), para gerar_subrotinas
+        self.declaracoes = {}
         # Aliases de tipos
         self.types = {}
-        # Lista de instruções de código máquina geradas
-        self.code = []
+        # Instruções de código máquina geradas (ver instrucoes.py)
+        self.code = Codigo()
+        # Modo contínuo (ver saida.py): destino que recebe cada bloco de instruções completo
+        self.saida = saida
         # Próximo offset livre do gp (variáveis globais)
         self.offset = 0
         # Contador para criar labels únicas (L0, L1, etc.)
         self.label_counter = 0
-
-
-    # Insere uma instrução na lista de código gerado
-    def emit(self, instr):
-        self.code.append(instr)
-
-
-    # Grava as instruções num ficheiro, uma por linha
+        # Análise de intervalos (ver intervalos.py): omite os CHECK que nunca falham
+        self.intervalos = intervalos
+        # Variável de controlo de cada 'for' em geração (minúsculas) -> intervalo
+        self.ambiente = {}
+        self.checks_eliminados = 0
+        # Movimento de código invariante (ver invariantes.py): expressões calculadas uma vez
+        # antes dos ciclos, em variáveis globais escondidas
+        self.invariantes = invariantes
+        self.invariantes_calculados = 0
+        # Eliminação das sub-rotinas e globais mortas (ver alcance.py): o Alcance do
+        # programa e o que ficou por registar (nomes; pares (nome, tamanho do array ou None))
+        self.eliminar = eliminar
+        self.alcance = None
+        self.subrotinas_removidas = []
+        self.globais_removidas = []
+        # Expansão em linha das sub-rotinas pequenas (ver expansao.py): o PlanoExpansao, as
+        # declarações das sub-rotinas expandidas (nome -> nó), os seus efeitos (ver
+        # intervalos.atribuidas) e as chamadas expandidas
+        self.expandir = expandir
+        self.plano_expansao = None
+        self.expansoes = {}
+        self.efeitos = {}
+        self.chamadas_expandidas = 0
+        # Expansão em geração: (entradas que pôs na symtab, entradas que elas substituíram)
+        self._expansao = None
+
+
+    # Insere uma instrução (opcode de instrucoes.py e argumento) no código gerado
+    def emit(self, op, arg=None):
+        code = self.code
+        code.ops.append(op)
+        code.args.append(arg)
+
+
+    # No modo contínuo, entrega ao destino as instruções geradas (um bloco completo, sem
+    # saltos para fora dele) se já forem pelo menos saida.bloco_minimo (ou, com 'tudo',
+    # sempre) e recomeça com um Codigo vazio
+    def despejar(self, tudo=False):
+        if self.saida is not None and self.code.ops and (tudo or len(self.code) >= self.saida.bloco_minimo):
+            self.saida.receber(self.code)
+            self.code = Codigo()
+
+
+    # Emite o START; no modo contínuo, os rótulos das sub-rotinas ficam reservados no
+    # destino, porque podem ser chamadas a partir de blocos que ainda não foram gerados
+    def emitir_start(self):
+        if self.saida is not None:
+            self.saida.reservar(label for label, _ in self.subroutines.values())
+        self.emit(START)
+
+
+    # Grava as instruções num ficheiro, uma por linha (o texto é produzido de uma vez)
     def write(self, filename):
         with open(filename, 'w') as f:
-            for instr in self.code:
-                f.write(instr + '\n')
+            self.code.escrever(f)
 
 
     # Emite a instrução de verificação de índice de array: CHECK 0,size-1
     def emit_check(self, size):
-        self.emit(f"CHECK 0,{size-1}")
+        self.emit(CHECK, (0, size - 1))
+
+
+    # Verificação do índice 'idx' de um array com limite inferior 'low': omitida se o
+    # intervalo do índice cabe no array
+    def emitir_verificacao(self, idx, low, size):
+        if self.intervalos:
+            limites = intervalo(idx, self.ambiente, self.constantes)
+            if limites is not None and low <= limites[0] and limites[1] <= low + size - 1:
+                self.checks_eliminados += 1
+                return
+        self.emit_check(size)
+
+
+    # Intervalo da variável de controlo do 'for' enquanto o corpo executa (ou None)
+    def intervalo_for(self, name, start_expr, end_expr, direction, body):
+        if not self.intervalos:
+            return None
+        return intervalo_for(name, start_expr, end_expr, direction, body, self.ambiente, self.constantes,
+                             self.alteradas)
+
+
+    # Nomes (em minúsculas) das variáveis que 'no' pode alterar (ver atribuidas), com o
+    # efeito das chamadas às sub-rotinas expandidas. Dentro de uma expansão, dois nomes
+    # podem ter a mesma posição do gp (um parâmetro e a variável do argumento): entram
+    # todos os nomes das posições alteradas, vistas daqui e de fora da expansão
+    def alteradas(self, no):
+        nomes = atribuidas(no, self.efeitos)
+        if nomes is None or self._expansao is None:
+            return nomes
+        posicoes = self._posicoes_globais(nomes)
+        visiveis = [(nome.lower(), entrada[1]) for nome, entrada in self.symtab.items() if entrada[0] == 'global']
+        posicoes.update(posicao for nome, posicao in visiveis if nome in nomes)
+        nomes.update(nome for nome, posicao in visiveis if posicao in posicoes)
+        return nomes
+
+
+    # Se 'nome' é uma variável global simples ou uma constante que não é texto
+    def _escalar(self, nome):
+        entrada = self.symtab.get(nome)
+        if entrada is None or nome.lower() in self.subroutines:
+            return False
+        if entrada[0] == 'const':
+            try:
+                return self.constantes.avaliar(entrada[1])[0] != 'texto'
+            except Exception:
+                return False
+        return entrada[0] == 'global'
+
+
+    # Calcula antes de um ciclo as suas expressões invariantes (ver invariantes.py), cada
+    # uma para uma variável global escondida; devolve id(expressão) -> ('var', escondida).
+    # 'variavel' é a variável de controlo de um 'for'; 'mapa' tem as expressões já
+    # trocadas pelos ciclos exteriores, quando as partes não foram reconstruídas
+    def calcular_invariantes(self, partes, variavel=None, mapa=None):
+        if not self.invariantes:
+            return {}
+        alteradas = self.alteradas(partes)
+        if alteradas is None:
+            return {}
+        if variavel is not None:
+            alteradas.add(variavel.lower())
+        ocultas = {}
+        for expr in invariantes(partes, alteradas, self._escalar, self.constantes, mapa):
+            nome = f"#inv{self.offset}"
+            self.gen(substituir(expr, mapa))
+            self.emit(STOREG, self.offset)
+            self.symtab[nome] = ('global', self.offset)
+            self.offset += 1
+            if self.intervalos:
+                limites = intervalo(expr, self.ambiente, self.constantes)
+                if limites is not None:
+                    self.ambiente[nome] = limites
+            ocultas[id(expr)] = ('var', nome)
+        self.invariantes_calculados += len(ocultas)
+        return ocultas
+
+
+    # Depois do ciclo, liberta as variáveis escondidas de calcular_invariantes
+    def libertar_invariantes(self, ocultas):
+        for _, nome in ocultas.values():
+            del self.symtab[nome]
+            self.ambiente.pop(nome, None)
+            self.offset -= 1
+
+
+    # Decide que sub-rotinas são expandidas em linha e calcula as sub-rotinas alcançáveis e
+    # as globais vivas do programa, que são as únicas que registar_subrotina e
+    # registar_variaveis registam
+    def planear(self, ast):
+        if self.expandir:
+            self.plano_expansao = planear_expansoes(ast)
+            self.expansoes = self.plano_expansao.expandidas
+            self.efeitos = self.plano_expansao.efeitos
+        if self.eliminar:
+            self.alcance = alcancaveis(ast, self.expansoes)
 
 
     # Constrói a tabela de símbolos a partir do nó raiz da AST
     def build_symtab(self, ast):
         _, _, block = ast  # node = ('program', nome, block)
+        self.planear(ast)
         decls, _ = block[1], block[2]  # decls contém todas as declarações (types, consts, var_decl, etc.)
 
         # Processar declarações de tipos (aliases): armazena em self.types
         for d in decls:
             if d and d[0] == 'types':
-                for name, tp in d[1]:
-                    self.types[name.lower()] = tp
+                self.registar_tipos(d)
 
         # Processar declarações de constantes: armazena em self.consts e em symtab como ('const', expr)
         for d in decls:
             if d and d[0] == 'consts':
-                for name, expr in d[1]:
-                    self.consts[name] = expr
-                    self.symtab[name] = ('const', expr)
+                self.registar_constantes(d)
 
-        # Processar declarações de sub-rotinas (functions e procedures): para cada uma, é registado o rótulo (upper case) e número de parâmetros
+        # Processar declarações de sub-rotinas (functions e procedures)
         for d in decls:
             if d and d[0] in ('function', 'procedure'):
-                name = d[1].lower()
-                params = d[2] or []
-                nargs = len(params)
-                label = name.upper()
-                self.subroutines[name] = (label, nargs)
+                self.registar_subrotina(d)
 
         # Processar declarações de variáveis globais e arrays
         for d in decls:
             if d and d[0] == 'var_decl':
-                for _, id_list, raw_tp in d[1]:
-                    # raw_tp pode ser um tipo básico ou um id_type para um alias
-                    tp = raw_tp
-                    # Se for um alias de tipo, é usado para o tipo concreto
-                    if isinstance(tp, tuple) and tp[0] == 'id_type':
-                        alias = tp[1].lower()
-                        if alias in self.types:
-                            tp = self.types[alias]
-
-                    for name in id_list:
-                        # Se o tipo for array, é usado ALLOCN para alocar espaço na heap
-                        if isinstance(tp, tuple) and tp[0] == 'array_type':
-                            low_ast, high_ast = tp[1]  # limites inferior e superior
-                            low  = extrair_valor_constante(low_ast, self.consts)
-                            high = extrair_valor_constante(high_ast, self.consts)
-                            size = high - low + 1
-                            self.emit(f"PUSHI {size}")  # faz PUSH do tamanho
-                            self.emit("ALLOCN")  # faz ALLOC de um bloco de tamanho 'size'
-                            self.emit(f"STOREG {self.offset}")  # guarda o endereço em gp[offset]
-                            # Regista a variável do array na tabela: (nome -> ('array', gp_offset, low, size, tipo_elem))
-                            elem_tp = tp[2]  # tipo dos elementos
-                            self.symtab[name] = ('array', self.offset, low, size, elem_tp)
-                            self.offset += 1
-                        else:
-                            # Variável global simples: regista apenas ('global', offset)
-                            self.symtab[name] = ('global', self.offset)
-                            self.offset += 1
+                self.registar_variaveis(d)
+
+
+    # Regista os aliases de tipos de uma declaração 'types'
+    def registar_tipos(self, d):
+        for name, tp in d[1]:
+            self.types[name.lower()] = tp
+
+
+    # Regista as constantes de uma declaração 'consts'
+    def registar_constantes(self, d):
+        for name, expr in d[1]:
+            self.consts[name] = expr
+            self.symtab[name] = ('const', expr)
+
+
+    # Regista uma function/procedure: rótulo (upper case) e número de parâmetros
+    def registar_subrotina(self, d):
+        name = d[1].lower()
+        # As sub-rotinas expandidas em linha em todas as chamadas não são geradas
+        if name in self.expansoes:
+            return
+        if self.alcance is not None and name not in self.alcance.subrotinas:
+            self.subrotinas_removidas.append(d[1])
+            return
+        params = d[2] or []
+        nargs = len(params)
+        label = name.upper()
+        self.subroutines[name] = (label, nargs)
+        self.declaracoes.setdefault(name, d)
+
+
+    # Regista as variáveis globais de uma declaração 'var_decl' (e aloca os arrays)
+    def registar_variaveis(self, d):
+        for _, id_list, raw_tp in d[1]:
+            # raw_tp pode ser um tipo básico ou um id_type para um alias
+            tp = raw_tp
+            # Se for um alias de tipo, é usado para o tipo concreto
+            if isinstance(tp, tuple) and tp[0] == 'id_type':
+                alias = tp[1].lower()
+                if alias in self.types:
+                    tp = self.types[alias]
+
+            for name in id_list:
+                # Se o tipo for array, é usado ALLOCN para alocar espaço na heap
+                if isinstance(tp, tuple) and tp[0] == 'array_type':
+                    low_ast, high_ast = tp[1]  # limites inferior e superior
+                    low  = self.constantes.inteiro(low_ast)
+                    high = self.constantes.inteiro(high_ast)
+                    size = high - low + 1
+                    if self.alcance is not None and name.lower() not in self.alcance.globais:
+                        # Array morto: sem posição no gp nem ALLOCN
+                        self.globais_removidas.append((name, size))
+                        continue
+                    self.emit(PUSHI, size)  # faz PUSH do tamanho
+                    self.emit(ALLOCN)  # faz ALLOC de um bloco de tamanho 'size'
+                    self.emit(STOREG, self.offset)  # guarda o endereço em gp[offset]
+                    # Regista a variável do array na tabela: (nome -> ('array', gp_offset, low, size, tipo_elem))
+                    elem_tp = tp[2]  # tipo dos elementos
+                    self.symtab[name] = ('array', self.offset, low, size, elem_tp)
+                    self.offset += 1
+                elif self.alcance is not None and name.lower() not in self.alcance.globais:
+                    self.globais_removidas.append((name, None))
+                else:
+                    # Variável global simples: regista apenas ('global', offset)
+                    self.symtab[name] = ('global', self.offset)
+                    self.offset += 1
 
 
     # Escolhe qual 'gen' chamar conforme node[0]
     def gen(self, node):
-        fn = getattr(self, f"gen_{node[0]}", None)
-        if not fn:
-            # Se não existir o método gen_<tipo>, lança exceção
-            raise NotImplementedError(f"gen_{node[0]} não implementado")
-        return fn(node)
+        return self.despacho[node[0]](node)
+
+
+    # Se não existir o método gen_<tipo>, lança exceção
+    def _nao_implementado(self, node):
+        raise NotImplementedError(f"gen_{node[0]} não implementado")
 
 
     # Gera o código para o nó 'program'
     def gen_program(self, node):
         _, _, block = node
         # Início da execução principal: emitir START
-        self.emit("START")
+        self.emitir_start()
         # Geração do bloco principal
         self.gen(block)
         # Fim do programa: emitir STOP
-        self.emit("STOP")
-
-        # Depois de gerar o bloco principal, emite o código das sub-rotinas
-        for name, (label, _) in self.subroutines.items():
-            # Percorre as declarações para encontrar a definição da sub-rotina
-            for d in block[1]:
-                if d and d[1].lower() == name:
-                    if d[0] == 'function':
-                        self.gen_function(d)
-                    else:
-                        self.gen_procedure(d)
+        self.emit(STOP)
+        self.despejar()
+        self.gerar_subrotinas()
+
+
+    # Depois de gerar o bloco principal, emite o código das sub-rotinas registadas (a
+    # declaração de cada uma vem do índice de registar_subrotina). O gerador ainda não
+    # gera sub-rotinas fora de linha: só as expandidas nas chamadas (ver expansao.py)
+    def gerar_subrotinas(self):
+        for d in self.declaracoes.values():
+            raise Exception(f"Geração de sub-rotinas não suportada: {d[1]}")
+        self.despejar(tudo=True)
 
 
     # Gera o código para 'block' (lista de statements)
@@ -189,6 +324,7 @@ class CodeGenerator:
         for stmt in stmts:
             if stmt:
                 self.gen(stmt)
+                self.despejar()
 
 
     # Gera o código para 'compound' (lista de statements dentro de begin..end)
@@ -214,13 +350,13 @@ class CodeGenerator:
             if len(args) != 1:
                 raise Exception("real() espera 1 argumento")
             self.gen(args[0])
-            self.emit("ITOF")  # inteiro para real
+            self.emit(ITOF)  # inteiro para real
             return
         if nl == 'integer':
             if len(args) != 1:
                 raise Exception("integer() espera 1 argumento")
             self.gen(args[0])
-            self.emit("FTOI")  # real para inteiro
+            self.emit(FTOI)  # real para inteiro
             return
 
         # write / writeln: imprime texto ou inteiro
@@ -229,12 +365,12 @@ class CodeGenerator:
                 # Se for um literal de texto ('const', 'texto', valor)
                 if isinstance(arg, tuple) and arg[0] == 'const' and arg[1].lower() == 'texto':
                     self.gen(arg)
-                    self.emit('WRITES')  # imprime string
+                    self.emit(WRITES)  # imprime string
                 else:
                     self.gen(arg)
-                    self.emit('WRITEI')  # imprime inteiro
+                    self.emit(WRITEI)  # imprime inteiro
             if nl == 'writeln':
-                self.emit('WRITELN')  # nova linha
+                self.emit(WRITELN)  # nova linha
             return
 
         # read / readln: lê a string do teclado e converte para char ou inteiro
@@ -247,17 +383,17 @@ class CodeGenerator:
                     kind, *info = self.symtab.get(var_name, (None,))
                     if kind not in ('global', 'local'):
                         raise Exception(f"Variável não encontrada: {var_name}")
-                    store = 'STOREG' if kind == 'global' else 'STOREL'
+                    store = STOREG if kind == 'global' else STOREL
                     # Lê a string completa e empilha o endereço
-                    self.emit("READ")
+                    self.emit(READ)
                     # Se a variável for char, faz CHARAT para extrair 1º carácter
                     if self.symtab[var_name][0] == 'global' and isinstance(self.symtab[var_name][-1], tuple) and self.symtab[var_name][-1][0]=='char':
-                        self.emit("CHARAT")
+                        self.emit(CHARAT)
                     else:
                         # Caso contrário, converte a string lida para inteiro
-                        self.emit("ATOI")
+                        self.emit(ATOI)
                     # Armazena no registo apropriado (global ou local)
-                    self.emit(f"{store} {info[0]}")
+                    self.emit(store, info[0])
 
                 # Caso de atribuição a um elemento de array: arr[idx] := read(...)
                 elif tag == 'array':
@@ -269,27 +405,32 @@ class CodeGenerator:
                         raise Exception(f"Uso incorreto: {var_name} não é array")
                     _, off, low, size, elem_tp = entry
                     # Empilha o endereço base do array
-                    self.emit(f"PUSHG {off}")
+                    self.emit(PUSHG, off)
                     # Gera o código do índice
                     self.gen(idx)
                     if low != 0:
                         # Ajusta pelo limite inferior se não começar em 0
-                        self.emit(f"PUSHI {low}")
-                        self.emit("SUB")
+                        self.emit(PUSHI, low)
+                        self.emit(SUB)
                     # Lê string completa do teclado
-                    self.emit("READ")
+                    self.emit(READ)
                     # Se for array de char, extrai o 1º carácter; senão, converte p/ inteiro
                     if isinstance(elem_tp, tuple) and elem_tp[0] == 'char':
-                        self.emit("CHARAT")
+                        self.emit(CHARAT)
                     else:
-                        self.emit("ATOI")
+                        self.emit(ATOI)
                     # Armazena no array (STOREN espera valor, índice, endereço)
-                    self.emit("STOREN")
+                    self.emit(STOREN)
 
                 else:
                     raise Exception(f"{nl} requer variáveis ou arrays: {arg}")
             return
 
+        # Sub-rotina expandida em linha
+        if nl in self.expansoes:
+            self.expandir_chamada(self.expansoes[nl], args)
+            return
+
         # Chamada de sub-rotina definida pelo utilizador
         if nl not in self.subroutines:
             raise Exception(f"Chamada não declarada: {name}")
@@ -297,35 +438,175 @@ class CodeGenerator:
         if len(args) != nargs:
             raise Exception(f"{name} espera {nargs} args, recebeu {len(args)}")
         # Empilha espaço para o valor de retorno
-        self.emit("PUSHI 0")
+        self.emit(PUSHI, 0)
         # Avalia e empilha os argumentos
         for arg in args:
             self.gen(arg)
         # Empilha o endereço da sub-rotina e chama
-        self.emit(f"PUSHA {label}")
-        self.emit("CALL")
+        self.emit(PUSHA, label)
+        self.emit(CALL)
+
+
+    # Gera no lugar de uma chamada o corpo da sub-rotina expandida 'decl' (ver expansao.py),
+    # com os parâmetros, as variáveis locais e o resultado de uma function em posições
+    # escondidas do gp, libertadas no fim. Um parâmetro var ou array usa a variável do
+    # argumento; um parâmetro por valor que o corpo não altera usa a constante ou a
+    # variável do argumento, se nem o corpo nem os outros argumentos (que podem chamar
+    # rotinas) a alteram. Os restantes argumentos são avaliados pela ordem e copiados
+    def expandir_chamada(self, decl, args):
+        bloco = decl[-1]
+        params = parametros(decl)
+        if len(args) != len(params):
+            raise Exception(f"{decl[1]} espera {len(params)} args, recebeu {len(args)}")
+        alteradas = atribuidas(bloco[2], self.efeitos)
+        # Posições do gp que o corpo pode alterar (as das globais com o nome de uma
+        # variável local também, porque pode ser o de uma global que uma chamada altera)
+        alteradas_gp = set()
+        if alteradas is not None:
+            alteradas_gp = self._posicoes_globais(alteradas)
+
+        entradas = {}
+        copias = []
+        # Intervalo de cada parâmetro que o corpo não altera (ver intervalos.py)
+        ambiente = {}
+        for (modo, nome, tp), arg in zip(params, args):
+            if modo == 'param_var' or tipo_array(tp, self.types):
+                entrada = self.symtab.get(arg[1])
+                if entrada is None:
+                    raise Exception(f"Variável ou uso incorreto: {arg[1]}")
+                entradas[nome] = entrada
+                if entrada[0] == 'global':
+                    alteradas_gp.add(entrada[1])
+            else:
+                copias.append((nome, arg))
+        copiados = []
+        chamadas = not self._sem_chamadas(args)
+        for nome, arg in copias:
+            fixo = alteradas is not None and nome.lower() not in alteradas
+            if fixo and self.intervalos:
+                limites = intervalo(arg, self.ambiente, self.constantes)
+                if limites is not None:
+                    ambiente[nome.lower()] = limites
+            entrada = self.symtab.get(arg[1]) if arg[0] == 'var' else None
+            if fixo and arg[0] == 'const':
+                entradas[nome] = ('const', arg)
+            elif fixo and entrada is not None and (entrada[0] == 'const' or entrada[0] == 'global'
+                                                   and not chamadas and entrada[1] not in alteradas_gp):
+                entradas[nome] = entrada
+            else:
+                self.gen(arg)
+                copiados.append(nome)
+
+        # Posições escondidas: cópias dos argumentos, variáveis locais e resultado
+        base = self.offset
+        for nome in copiados:
+            entradas[nome] = ('global', self.offset)
+            self.offset += 1
+        for nome in reversed(copiados):
+            self.emit(STOREG, entradas[nome][1])
+        for d in bloco[1] or ():
+            for _, id_list, _ in d[1]:
+                for nome in id_list:
+                    entradas[nome] = ('global', self.offset)
+                    self.offset += 1
+        # Se o resultado só é atribuído na última instrução, o valor fica na pilha
+        final = resultado_final(decl)
+        instrucoes = bloco[2]
+        if final is not None:
+            instrucoes = [stmt for stmt in instrucoes if stmt and stmt[0] != 'empty'][:-1]
+        elif decl[0] == 'function':
+            resultado = self.offset
+            entradas[decl[1]] = ('global', resultado)
+            self.offset += 1
+
+        # O corpo vê as globais e as suas entradas, não as da expansão que o chama
+        exterior = self._expansao
+        if exterior is not None:
+            self._repor(exterior[1])
+        self._expansao = (entradas, self._sobrepor(entradas))
+        ambiente, self.ambiente = self.ambiente, ambiente
+        try:
+            for stmt in instrucoes:
+                if stmt:
+                    self.gen(stmt)
+            if final is not None:
+                self.gen(final)
+        finally:
+            self.ambiente = ambiente
+            self._repor(self._expansao[1])
+            self._expansao = None if exterior is None else (exterior[0], self._sobrepor(exterior[0]))
+        if final is None and decl[0] == 'function':
+            self.emit(PUSHG, resultado)
+        self.offset = base
+        self.chamadas_expandidas += 1
+
+
+    # Se avaliar as expressões 'exprs' não chama rotinas do utilizador (uma variável que
+    # não está na symtab é uma function sem parâmetros)
+    def _sem_chamadas(self, exprs):
+        if atribuidas(exprs) is None:
+            return False
+        pilha = list(exprs)
+        while pilha:
+            atual = pilha.pop()
+            if type(atual) is list:
+                pilha.extend(atual)
+            elif type(atual) is tuple and atual and atual[0] != 'const':
+                if atual[0] == 'var' and atual[1] not in self.symtab:
+                    return False
+                pilha.extend(atual[1:])
+        return True
+
+
+    # Põe as 'entradas' na symtab; devolve as entradas que estavam nesses nomes (ou None)
+    def _sobrepor(self, entradas):
+        anteriores = {nome: self.symtab.get(nome) for nome in entradas}
+        self.symtab.update(entradas)
+        return anteriores
+
+
+    # Desfaz um _sobrepor, com as entradas que ele devolveu
+    def _repor(self, anteriores):
+        for nome, entrada in anteriores.items():
+            if entrada is None:
+                del self.symtab[nome]
+            else:
+                self.symtab[nome] = entrada
+
+
+    # Posições do gp das variáveis globais simples com os nomes 'nomes' (em minúsculas),
+    # vistas de fora de qualquer expansão
+    def _posicoes_globais(self, nomes):
+        anteriores = self._expansao[1] if self._expansao is not None else {}
+        posicoes = set()
+        for nome, entrada in self.symtab.items():
+            if nome in anteriores:
+                entrada = anteriores[nome]
+            if entrada is not None and entrada[0] == 'global' and nome.lower() in nomes:
+                posicoes.add(entrada[1])
+        return posicoes
+
 
     # Gera o código para constantes literais
     def gen_const(self, node):
         _, tp, val = node
         t = tp.lower()
         if t == 'integer':
-            self.emit(f"PUSHI {val}")
+            self.emit(PUSHI, val)
         elif t == 'real':
-            self.emit(f"PUSHF {val}")
+            self.emit(PUSHF, val)
         elif t == 'boolean':
             if isinstance(val, str):
                 v = 1 if val.lower() == 'true' else 0
             else:
                 v = 1 if val else 0
-            self.emit(f"PUSHI {v}")
+            self.emit(PUSHI, v)
         elif t == 'char':
             # Usa o código ASCII do carácter
-            self.emit(f"PUSHI {ord(val)}")
+            self.emit(PUSHI, ord(val))
         else:
-            # Literal de texto: duplicar aspas e usar PUSHS
-            s = val.replace('"', '""')
-            self.emit(f'PUSHS "{s}"')
+            # Literal de texto: PUSHS (as aspas são duplicadas ao escrever o .vm)
+            self.emit(PUSHS, val)
 
 
     # Gera o código para variáveis (push do valor armazenado)
@@ -333,12 +614,15 @@ class CodeGenerator:
         _, name = node
         kind, *info = self.symtab.get(name, (None,))
         if kind == 'global':
-            self.emit(f"PUSHG {info[0]}")
+            self.emit(PUSHG, info[0])
         elif kind == 'const':
             # Se for umaconstante nomeada, avalia a expressão constante
             self.gen(info[0])
         elif kind == 'local':
-            self.emit(f"PUSHL {info[0]}")
+            self.emit(PUSHL, info[0])
+        elif name.lower() in self.expansoes:
+            # Function sem parâmetros expandida em linha
+            self.expandir_chamada(self.expansoes[name.lower()], [])
         else:
             raise Exception(f"Variável ou uso incorreto: {name}")
 
@@ -349,17 +633,17 @@ class CodeGenerator:
         _, name = base
         _, off, low, size, *_ = self.symtab[name]
         # Empilha endereço base
-        self.emit(f"PUSHG {off}")
+        self.emit(PUSHG, off)
         # Gera o código para o índice
         self.gen(idxs)
         if low != 0:
             # Ajusta pelo limite inferior
-            self.emit(f"PUSHI {low}")
-            self.emit("SUB")
+            self.emit(PUSHI, low)
+            self.emit(SUB)
         # Verifica o índice (CHECK 0, size-1)
-        self.emit_check(size)
+        self.emitir_verificacao(idxs, low, size)
         # Carrega o valor do array: LOADN
-        self.emit("LOADN")
+        self.emit(LOADN)
 
 
     # Gera o código para atribuição: lhs := expr
@@ -380,17 +664,17 @@ class CodeGenerator:
             size   = entry[3]
 
             # Empilha o endereço base
-            self.emit(f"PUSHG {off}")
+            self.emit(PUSHG, off)
             # Gera o código do índice
             self.gen(idxs)
             if low != 0:
-                self.emit(f"PUSHI {low}")
-                self.emit("SUB")
+                self.emit(PUSHI, low)
+                self.emit(SUB)
             # CHECK de índice
-            self.emit_check(size)
+            self.emitir_verificacao(idxs, low, size)
             # Gera o código da expressão e armazena no array
             self.gen(expr)
-            self.emit("STOREN")
+            self.emit(STOREN)
         else:  # Caso seja uma variável simples
             _, name = lhs
             kind, *info = self.symtab.get(name, (None,))
@@ -399,10 +683,10 @@ class CodeGenerator:
                 self.gen(expr)
             elif kind == 'global':
                 self.gen(expr)
-                self.emit(f"STOREG {info[0]}")
+                self.emit(STOREG, info[0])
             elif kind == 'local':
                 self.gen(expr)
-                self.emit(f"STOREL {info[0]}")
+                self.emit(STOREL, info[0])
             else:
                 raise Exception(f"Atribuição inválida: {name}")
 
@@ -414,26 +698,35 @@ class CodeGenerator:
         if op == '<>':
             self.gen(l)
             self.gen(r)
-            self.emit('EQUAL')
-            self.emit('NOT')
+            self.emit(EQUAL)
+            self.emit(NOT)
             return
 
         # Caso geral: gera código recursivamente para operandos
         self.gen(l)
         self.gen(r)
+        self.emitir_operador(op, l, r)
+
+
+    # Emite a instrução do operador binário 'op', com os operandos já na pilha
+    def emitir_operador(self, op, l, r):
+        if op == '<>':
+            self.emit(EQUAL)
+            self.emit(NOT)
+            return
         # Mapas de operadores para instruções da VM
         int_ops = {
-            '+': 'ADD', '-': 'SUB', '*': 'MUL', '/': 'DIV',
-            'div': 'DIV', 'mod': 'MOD',
-            '=': 'EQUAL', '<': 'INF', '<=': 'INFEQ',
-            '>': 'SUP', '>=': 'SUPEQ'
+            '+': ADD, '-': SUB, '*': MUL, '/': DIV,
+            'div': DIV, 'mod': MOD,
+            '=': EQUAL, '<': INF, '<=': INFEQ,
+            '>': SUP, '>=': SUPEQ
         }
         float_ops = {
-            '+': 'FADD', '-': 'FSUB', '*': 'FMUL', '/': 'FDIV',
-            '<': 'FINF', '<=': 'FINFEQ',
-            '>': 'FSUP', '>=': 'FSUPEQ'
+            '+': FADD, '-': FSUB, '*': FMUL, '/': FDIV,
+            '<': FINF, '<=': FINFEQ,
+            '>': FSUP, '>=': FSUPEQ
         }
-        bool_ops = {'and': 'AND', 'or': 'OR', '=': 'EQUAL', '<>': 'NE'}
+        bool_ops = {'and': AND, 'or': OR, '=': EQUAL, '<>': NE}
         key = op.lower()
 
         # Se algum operando for literal real, usa mapeamento float
@@ -460,7 +753,7 @@ class CodeGenerator:
     def gen_not(self, node):
         _, expr = node
         self.gen(expr)
-        self.emit('NOT')
+        self.emit(NOT)
 
 
     # Gera o código para instrução if-then-else
@@ -473,16 +766,16 @@ class CodeGenerator:
 
         # Gera a condição e, se zero, salta para lbl_else
         self.gen(cond)
-        self.emit(f"JZ {lbl_else}")
+        self.emit(JZ, lbl_else)
         # Bloco then
         self.gen(then_block)
-        self.emit(f"JUMP {lbl_end}")
+        self.emit(JUMP, lbl_end)
         # Else
-        self.emit(f"{lbl_else}:")
+        self.emit(ROTULO, lbl_else)
         if else_block:
             self.gen(else_block)
         # End-if
-        self.emit(f"{lbl_end}:")
+        self.emit(ROTULO, lbl_end)
 
 
     # Gera o código para ciclo while
@@ -493,15 +786,21 @@ class CodeGenerator:
         lbl_start = f"L{i}WHILE"
         lbl_end = f"L{i}ENDWHILE"
 
-        self.emit(f"{lbl_start}:")
+        # As expressões invariantes são calculadas antes do ciclo
+        ocultas = self.calcular_invariantes([cond, body])
+        if ocultas:
+            cond, body = substituir([cond, body], ocultas)
+
+        self.emit(ROTULO, lbl_start)
         # Se a condição for falsa (0), salta para lbl_end
         self.gen(cond)
-        self.emit(f"JZ {lbl_end}")
+        self.emit(JZ, lbl_end)
         # Corpo do while
         self.gen(body)
         # Loop de regresso ao início
-        self.emit(f"JUMP {lbl_start}")
-        self.emit(f"{lbl_end}:")
+        self.emit(JUMP, lbl_start)
+        self.emit(ROTULO, lbl_end)
+        self.libertar_invariantes(ocultas)
 
 
     # Gera o código para ciclo for
@@ -520,55 +819,40 @@ class CodeGenerator:
 
         # Inicializa a variável do for
         self.gen(start_expr)
-        self.emit(f"STOREG {off}")
+        self.emit(STOREG, off)
+
+        # O limite final e as outras expressões invariantes são calculados antes do ciclo,
+        # depois do valor inicial (que pode chamar sub-rotinas que alteram as variáveis)
+        ocultas = self.calcular_invariantes([end_expr, body], name)
+        if ocultas:
+            end_expr, body = substituir([end_expr, body], ocultas)
 
-        self.emit(f"{lbl_start}:")
+        self.emit(ROTULO, lbl_start)
         # Carrega a variável e compara com end_expr
-        self.emit(f"PUSHG {off}")
+        self.emit(PUSHG, off)
         self.gen(end_expr)
-        self.emit("INFEQ" if direction == 'to' else "SUPEQ")
-        self.emit(f"JZ {lbl_end}")
+        self.emit(INFEQ if direction == 'to' else SUPEQ)
+        self.emit(JZ, lbl_end)
 
-        # Corpo do for
-        self.gen(body)
+        # Corpo do for, com o intervalo da variável de controlo (se conhecido)
+        limites = self.intervalo_for(name, start_expr, end_expr, direction, body)
+        if limites is None:
+            self.gen(body)
+        else:
+            anterior = self.ambiente.get(name.lower())
+            self.ambiente[name.lower()] = limites
+            self.gen(body)
+            if anterior is None:
+                del self.ambiente[name.lower()]
+            else:
+                self.ambiente[name.lower()] = anterior
 
         # Incrementa ou decrementa a variável
-        self.emit(f"PUSHG {off}")
-        self.emit("PUSHI 1")
-        self.emit("ADD" if direction == 'to' else "SUB")
-        self.emit(f"STOREG {off}")
+        self.emit(PUSHG, off)
+        self.emit(PUSHI, 1)
+        self.emit(ADD if direction == 'to' else SUB)
+        self.emit(STOREG, off)
         # Regressa ao início do loop
-        self.emit(f"JUMP {lbl_start}")
-        self.emit(f"{lbl_end}:")
-
-
-
-# def gen_procedure(self, node):
-#     _, name, params, block = node
-#     label, _ = self.subroutines[name.lower()]
-#     self.emit(f"{label}:")
-#     old_sym = self.symtab.copy()
-#     for idx, param in enumerate(params):
-#         _, ids, _ = param
-#         for id in ids:
-#             self.symtab[id] = ('local', idx)
-#     self.gen(block)
-#     self.emit("RETURN")
-#     self.symtab = old_sym
-
-
-# def gen_function(self, node):
-#     _, name, params, _, block = node
-#     label, _ = self.subroutines[name.lower()]
-#     self.emit(f"{label}:")
-#     nargs = len(params)
-#     old_symtab = self.symtab.copy()
-#     for idx, param in enumerate(params):
-#         _, ids, _ = param
-#         for id in ids:
-#             self.symtab[id] = ('local', idx)
-#     self.symtab[name] = ('local', nargs)
-#     self.gen(block)
-#     self.emit(f"PUSHL {nargs}")
-#     self.emit("RETURN")
-#     self.symtab = old_symtab
\ No newline at end of file
+        self.emit(JUMP, lbl_start)
+        self.emit(ROTULO, lbl_end)
+        self.libertar_invariantes(ocultas)
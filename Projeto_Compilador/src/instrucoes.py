@@ -0,0 +1,166 @@
+# Representação intermédia das instruções da VM
+#
+# O CodeGenerator guardava cada instrução como a string da linha do .vm ('PUSHG 3'): o
+# peephole e as outras ferramentas tinham de voltar a partir o texto para ver o opcode e o
+# argumento, e cada instrução ocupava um objeto str. Aqui o código é um Codigo com duas
+# sequências paralelas:
+# - ops: array('B') com o número do opcode de cada instrução (ROTULO para as linhas 'L3:');
+# - args: o argumento de cada instrução, já no seu tipo (int para PUSHI/PUSHG/..., o nome
+#   do rótulo para JUMP/JZ/PUSHA e ROTULO, a string sem aspas para PUSHS, o par
+#   (inferior, superior) para CHECK), ou None.
+# O texto só é produzido no fim, por texto()/escrever(), de uma vez.
+#
+# Para o código que trata as instruções como linhas, um Codigo comporta-se como a antiga
+# lista de strings: len(), iteração, indexação e == dão as linhas do .vm.
+
+from array import array
+
+# Opcodes, pela ordem do seu número
+NOMES = (
+    'ROTULO', 'START', 'STOP', 'NOP',
+    'PUSHI', 'PUSHF', 'PUSHS', 'PUSHG', 'STOREG', 'PUSHL', 'STOREL', 'PUSHA', 'DUP', 'POP',
+    'ADD', 'SUB', 'MUL', 'DIV', 'MOD', 'FADD', 'FSUB', 'FMUL', 'FDIV',
+    'EQUAL', 'INF', 'INFEQ', 'SUP', 'SUPEQ', 'FINF', 'FINFEQ', 'FSUP', 'FSUPEQ', 'NE',
+    'AND', 'OR', 'NOT', 'ITOF', 'FTOI',
+    'JUMP', 'JZ', 'CALL', 'RETURN',
+    'ALLOCN', 'LOADN', 'STOREN', 'CHECK',
+    'READ', 'ATOI', 'CHARAT', 'WRITEI', 'WRITEF', 'WRITES', 'WRITELN',
+)
+OPCODES = {nome: numero for numero, nome in enumerate(NOMES)}
+
+(ROTULO, START, STOP, NOP,
+ PUSHI, PUSHF, PUSHS, PUSHG, STOREG, PUSHL, STOREL, PUSHA, DUP, POP,
+ ADD, SUB, MUL, DIV, MOD, FADD, FSUB, FMUL, FDIV,
+ EQUAL, INF, INFEQ, SUP, SUPEQ, FINF, FINFEQ, FSUP, FSUPEQ, NE,
+ AND, OR, NOT, ITOF, FTOI,
+ JUMP, JZ, CALL, RETURN,
+ ALLOCN, LOADN, STOREN, CHECK,
+ READ, ATOI, CHARAT, WRITEI, WRITEF, WRITES, WRITELN) = range(len(NOMES))
+
+# Instruções cujo argumento é um rótulo
+REFERENCIAS_ROTULO = (JUMP, JZ, PUSHA)
+# Instruções cujo argumento é um inteiro
+_ARG_INTEIRO = frozenset((PUSHI, PUSHG, STOREG, PUSHL, STOREL, DUP, POP))
+
+
+# Prefixo 'NOME ' de cada opcode: a linha de uma instrução com argumento é o prefixo
+# seguido de str(argumento), exceto nos opcodes de _FORMATADORES
+_PREFIXOS = tuple(nome + ' ' for nome in NOMES)
+_FORMATADORES = {
+    ROTULO: '{}:'.format,
+    CHECK: 'CHECK {0[0]},{0[1]}'.format,
+    PUSHS: lambda arg: 'PUSHS "{}"'.format(arg.replace('"', '""')),
+}
+
+
+def linha(op, arg):
+    """Linha do .vm da instrução (op, arg)."""
+    if arg is None:
+        return NOMES[op]
+    formatador = _FORMATADORES.get(op)
+    return _PREFIXOS[op] + str(arg) if formatador is None else formatador(arg)
+
+
+def decompor(texto):
+    """(op, arg) da linha do .vm 'texto' (o inverso de linha)."""
+    if texto.endswith(':') and ' ' not in texto:
+        return ROTULO, texto[:-1]
+    nome, _, arg = texto.partition(' ')
+    op = OPCODES[nome]
+    if not arg:
+        return op, None
+    if op in _ARG_INTEIRO:
+        return op, int(arg)
+    if op == CHECK:
+        inferior, _, superior = arg.partition(',')
+        return op, (int(inferior), int(superior))
+    if op == PUSHS:
+        return op, arg[1:-1].replace('""', '"')
+    return op, arg
+
+
+class Codigo:
+    """
+    Sequência de instruções da VM. Uso:
+        codigo = Codigo()
+        codigo.emitir(PUSHI, 1)
+        codigo.emitir(ROTULO, 'L0WHILE')
+        for op, arg in codigo.instrucoes(): ...
+        codigo.escrever(ficheiro)         # ou codigo.texto()
+    Atributos:
+        ops (array): Opcode de cada instrução.
+        args (list): Argumento de cada instrução (ou None).
+    """
+    __slots__ = ('ops', 'args')
+
+    def __init__(self, ops=None, args=None):
+        self.ops = array('B') if ops is None else array('B', ops)
+        self.args = [] if args is None else list(args)
+
+    @classmethod
+    def de_texto(cls, linhas):
+        """Codigo com as instruções das linhas do .vm 'linhas'."""
+        codigo = cls()
+        for texto in linhas:
+            op, arg = decompor(texto)
+            codigo.ops.append(op)
+            codigo.args.append(arg)
+        return codigo
+
+    def emitir(self, op, arg=None):
+        self.ops.append(op)
+        self.args.append(arg)
+
+    def extend(self, instrucoes):
+        """Acrescenta os pares (op, arg) de 'instrucoes' (ou as instruções de um Codigo)."""
+        if isinstance(instrucoes, Codigo):
+            self.ops.extend(instrucoes.ops)
+            self.args.extend(instrucoes.args)
+            return
+        for op, arg in instrucoes:
+            self.ops.append(op)
+            self.args.append(arg)
+
+    def instrucoes(self):
+        """Os pares (op, arg), pela ordem."""
+        return zip(self.ops, self.args)
+
+    def linhas(self):
+        """As linhas do .vm, numa lista."""
+        nomes, prefixos, formatadores = NOMES, _PREFIXOS, _FORMATADORES
+        return [nomes[op] if arg is None else
+                (formatadores[op](arg) if op in formatadores else prefixos[op] + str(arg))
+                for op, arg in zip(self.ops, self.args)]
+
+    def texto(self):
+        """O .vm inteiro (uma instrução por linha, cada uma terminada em '\\n')."""
+        if not self.ops:
+            return ''
+        return '\n'.join(self.linhas()) + '\n'
+
+    def escrever(self, ficheiro):
+        """Escreve o .vm no ficheiro aberto 'ficheiro', de uma só vez."""
+        ficheiro.write(self.texto())
+
+    # -------- vista de lista de linhas --------
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __iter__(self):
+        return iter(self.linhas())
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return Codigo(self.ops[k], self.args[k]).linhas()
+        return linha(self.ops[k], self.args[k])
+
+    def __eq__(self, outro):
+        if isinstance(outro, Codigo):
+            return self.ops == outro.ops and self.args == outro.args
+        if isinstance(outro, list):
+            return self.linhas() == outro
+        return NotImplemented
+
+    def __repr__(self):
+        return f"Codigo({len(self)} instruções)"
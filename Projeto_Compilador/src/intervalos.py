@@ -0,0 +1,141 @@
+# Análise de intervalos para eliminar verificações de índices (CHECK)
+#
+# O gerador emite 'CHECK 0,size-1' em cada acesso a um array. Dentro de um
+# 'for i := a to b', se a e b têm valores conhecidos e o corpo não altera i, i fica sempre
+# em [a, b] enquanto o corpo executa; um índice como i, i + 1 ou 2 * i - 1 tem então um
+# intervalo conhecido e, se este cabe nos limites do array, o CHECK nunca falha.
+#
+# intervalo() calcula o intervalo (mínimo, máximo) de uma expressão inteira a partir dos
+# literais, das constantes nomeadas e das variáveis de controlo dos 'for' que a envolvem
+# (ambiente: nome -> intervalo). atribuidas() diz que variáveis um corpo pode alterar;
+# uma chamada a uma rotina do utilizador pode alterar qualquer variável global, exceto
+# se o seu efeito é conhecido (as sub-rotinas expandidas em linha, ver expansao.py).
+
+# Rotinas pré-definidas que não alteram variáveis (read/readln alteram os argumentos)
+_SEM_EFEITOS = frozenset(('write', 'writeln', 'real', 'integer'))
+_LEITURAS = frozenset(('read', 'readln'))
+
+
+def intervalo(no, ambiente, constantes=None):
+    """
+    (mínimo, máximo) dos valores da expressão inteira 'no', ou None se não se sabe.
+    'ambiente' associa o nome (em minúsculas) de cada variável de controlo ao seu
+    intervalo; 'constantes' é o AvaliadorConstantes das constantes nomeadas.
+    """
+    if type(no) is not tuple:
+        return None
+    tag = no[0]
+    if tag == 'const':
+        if no[1] == 'integer':
+            return no[2], no[2]
+        if no[1] == 'char':
+            return ord(no[2]), ord(no[2])
+        return None
+    if tag == 'var':
+        nome = no[1]
+        resultado = ambiente.get(nome.lower())
+        if resultado is not None:
+            return resultado
+        if constantes is not None and nome in constantes.consts:
+            try:
+                valor = constantes.inteiro(no)
+            except Exception:
+                return None
+            return valor, valor
+        return None
+    if tag == 'binop':
+        _, op, esq, dir_ = no
+        op = op.lower()
+        if op not in ('+', '-', '*', 'div', 'mod'):
+            return None
+        a = intervalo(esq, ambiente, constantes)
+        if a is None:
+            return None
+        b = intervalo(dir_, ambiente, constantes)
+        if b is None:
+            return None
+        if op == '+':
+            return a[0] + b[0], a[1] + b[1]
+        if op == '-':
+            return a[0] - b[1], a[1] - b[0]
+        if op == '*':
+            produtos = (a[0] * b[0], a[0] * b[1], a[1] * b[0], a[1] * b[1])
+            return min(produtos), max(produtos)
+        # div e mod: só com dividendo não negativo e divisor positivo
+        if a[0] < 0 or b[0] <= 0:
+            return None
+        if op == 'div':
+            return a[0] // b[1], a[1] // b[0]
+        return 0, min(a[1], b[1] - 1)
+    return None
+
+
+def atribuidas(no, rotinas=None):
+    """
+    Nomes (em minúsculas) das variáveis que a instrução 'no' pode alterar, ou None se
+    chama uma rotina do utilizador (que pode alterar qualquer variável global).
+    'rotinas' associa o nome (em minúsculas) de uma rotina do utilizador ao seu efeito: o
+    par (nomes que pode alterar, índices dos argumentos que pode alterar).
+    """
+    nomes = set()
+    pilha = [no]
+    while pilha:
+        atual = pilha.pop()
+        if type(atual) is list:
+            pilha.extend(atual)
+            continue
+        if type(atual) is not tuple or not atual:
+            continue
+        tag = atual[0]
+        if tag == 'assign':
+            alvo = atual[1]
+            if alvo[0] == 'var':
+                nomes.add(alvo[1].lower())
+        elif tag == 'for':
+            var = atual[1]
+            nomes.add((var[1] if type(var) is tuple else var).lower())
+        elif tag == 'call':
+            nome = atual[1].lower()
+            if nome in _LEITURAS:
+                for arg in atual[2] or ():
+                    if arg[0] == 'var':
+                        nomes.add(arg[1].lower())
+            elif rotinas is not None and nome in rotinas:
+                alteradas, indices = rotinas[nome]
+                nomes.update(alteradas)
+                args = atual[2] or ()
+                for i in indices:
+                    if i < len(args) and args[i][0] == 'var':
+                        nomes.add(args[i][1].lower())
+            elif nome not in _SEM_EFEITOS:
+                return None
+        elif tag == 'var' and rotinas is not None and atual[1].lower() in rotinas:
+            # Uma function sem parâmetros lida sem parêntesis (ou uma variável com o nome)
+            nomes.update(rotinas[atual[1].lower()][0])
+        elif tag == 'with':
+            # Os nomes dentro de um 'with' podem ser campos: não se sabe o que altera
+            return None
+        pilha.extend(atual[1:])
+    return nomes
+
+
+def intervalo_for(nome, inicio, fim, direcao, corpo, ambiente, constantes=None, alteradas=atribuidas):
+    """
+    Intervalo da variável de controlo 'nome' enquanto o corpo de um 'for' executa, ou None
+    se os limites não são conhecidos ou o corpo pode alterar a variável. 'alteradas' é a
+    função que dá as variáveis que o corpo pode alterar (como atribuidas).
+    """
+    a = intervalo(inicio, ambiente, constantes)
+    if a is None:
+        return None
+    b = intervalo(fim, ambiente, constantes)
+    if b is None:
+        return None
+    alteradas = alteradas(corpo)
+    if alteradas is None or nome.lower() in alteradas:
+        return None
+    # O limite final é reavaliado em cada iteração: as variáveis de que depende também
+    # não podem ser alteradas pelo corpo (as do ambiente já não o são pelos seus 'for')
+    if direcao == 'to':
+        return a[0], b[1]
+    return b[0], a[1]
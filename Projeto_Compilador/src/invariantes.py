@@ -0,0 +1,107 @@
+# Movimento de código invariante dos ciclos (while e for)
+#
+# gen_for avalia o limite final em cada iteração e, num while, a condição e o corpo
+# recalculam em cada iteração expressões que podem não depender do ciclo. Uma expressão é
+# invariante num ciclo se só usa literais, constantes nomeadas e variáveis que o ciclo não
+# altera (a variável de controlo de um 'for' conta como alterada). Se, além disso, a sua
+# avaliação não pode falhar — sem acessos a arrays nem chamadas, e com div, mod e '/' só
+# por um divisor constante diferente de zero — pode ser calculada uma vez antes do ciclo,
+# mesmo que o ciclo não execute nenhuma vez: o gerador guarda-a numa variável global
+# escondida e o ciclo passa a ler essa variável.
+#
+# invariantes() escolhe as maiores expressões invariantes de um ciclo; substituir()
+# reconstrói uma subárvore com essas expressões trocadas pelas variáveis escondidas.
+
+from intervalos import intervalo
+
+# Operadores cuja avaliação nunca falha
+_OPERADORES = frozenset(('+', '-', '*', 'and', 'or', '=', '<>', '<', '<=', '>', '>='))
+# Operadores que falham com o divisor zero
+_DIVISOES = frozenset(('/', 'div', 'mod'))
+
+
+def _divisor_seguro(no, constantes):
+    # Se 'no' é um divisor constante diferente de zero
+    if no[0] == 'const':
+        if no[1] == 'real':
+            try:
+                return float(no[2]) != 0
+            except (TypeError, ValueError):
+                return False
+        return no[1] == 'integer' and no[2] != 0
+    if no[0] != 'var':
+        return False
+    limites = intervalo(no, {}, constantes)
+    return limites is not None and not limites[0] <= 0 <= limites[1]
+
+
+def invariantes(partes, alteradas, escalar, constantes=None, mapa=None):
+    """
+    Maiores subexpressões invariantes de 'partes' (os nós de um ciclo, ex.: [cond, corpo])
+    com pelo menos um operador, pela ordem em que o gerador as emite.
+    'alteradas' são os nomes (em minúsculas) que o ciclo pode alterar; escalar(nome) diz se
+    'nome' é uma variável simples ou uma constante; os nós de 'mapa' (id -> nó) já foram
+    trocados por variáveis escondidas e contam como variáveis invariantes.
+    """
+    encontradas = []
+    mapa = mapa or {}
+
+    def visitar(no):
+        # Se 'no' é invariante; se não for, regista os filhos invariantes com operadores
+        if type(no) is list:
+            for item in no:
+                visitar_parte(item)
+            return False
+        if type(no) is not tuple or not no:
+            return False
+        if id(no) in mapa:
+            return True
+        tag = no[0]
+        if tag == 'const':
+            return no[1] != 'texto'
+        if tag == 'var':
+            return no[1].lower() not in alteradas and escalar(no[1])
+        if tag == 'binop':
+            op = no[1].lower()
+            esq = visitar(no[2])
+            dir_ = visitar(no[3])
+            if esq and dir_ and (op in _OPERADORES or op in _DIVISOES and _divisor_seguro(no[3], constantes)):
+                return True
+            for filho, invariante in ((no[2], esq), (no[3], dir_)):
+                if invariante:
+                    registar(filho)
+            return False
+        if tag == 'not':
+            return visitar(no[1])
+        for filho in no[1:]:
+            visitar_parte(filho)
+        return False
+
+    def visitar_parte(no):
+        if visitar(no):
+            registar(no)
+
+    def registar(no):
+        # Só compensa guardar uma expressão com operadores (não uma folha)
+        if no[0] in ('binop', 'not') and id(no) not in mapa:
+            encontradas.append(no)
+
+    for parte in partes:
+        visitar_parte(parte)
+    return encontradas
+
+
+def substituir(no, mapa):
+    """Cópia de 'no' com cada nó de id em 'mapa' trocado por mapa[id] (partilha o resto)."""
+    if not mapa:
+        return no
+    novo = mapa.get(id(no))
+    if novo is not None:
+        return novo
+    if type(no) is list:
+        itens = [substituir(item, mapa) for item in no]
+        return no if all(a is b for a, b in zip(itens, no)) else itens
+    if type(no) is not tuple:
+        return no
+    filhos = tuple(substituir(filho, mapa) for filho in no)
+    return no if all(a is b for a, b in zip(filhos, no)) else filhos
@@ -0,0 +1,10 @@
+# lextab_regras.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AND', 'ARRAY', 'ASSIGN', 'BEGIN', 'BOOLEAN', 'CASE', 'CHAR', 'COLON', 'COMMA', 'CONST', 'DIV', 'DIVIDE', 'DO', 'DOT', 'DOWNTO', 'ELSE', 'END', 'EQ', 'FILE', 'FOR', 'FUNCTION', 'GE', 'GOTO', 'GT', 'ID', 'IF', 'IN', 'INTEGER', 'LABEL', 'LBRACKET', 'LE', 'LPAREN', 'LT', 'MINUS', 'MOD', 'NE', 'NOT', 'OF', 'OR', 'PACKED', 'PLUS', 'PROCEDURE', 'PROGRAM', 'RANGE', 'RBRACKET', 'REAL', 'RECORD', 'REPEAT', 'RPAREN', 'SEMI', 'SET', 'TEXTO', 'THEN', 'TIMES', 'TIPO', 'TO', 'TYPE', 'UNTIL', 'VAR', 'WHILE', 'WITH'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [("(?P<t_TIPO>\\b([iI][nN][tT][eE][gG][eE][rR]|\\b[rR][eE][aA][lL]|\\b[bB][oO][oO][lL][eE][aA][nN]|\\b[cC][hH][aA][rR])\\b)|(?P<t_BOOLEAN>\\b([tT][rR][uU][eE]|\\b[fF][aA][lL][sS][eE])\\b)|(?P<t_AND>\\b([aA][nN][dD])\\b)|(?P<t_ARRAY>\\b([aA][rR][rR][aA][yY])\\b)|(?P<t_BEGIN>\\b([bB][eE][gG][iI][nN])\\b)|(?P<t_CASE>\\b([cC][aA][sS][eE])\\b)|(?P<t_CONST>\\b([cC][oO][nN][sS][tT])\\b)|(?P<t_DIV>\\b([dD][iI][vV])\\b)|(?P<t_DOWNTO>\\b([dD][oO][wW][nN][tT][oO])\\b)|(?P<t_DO>\\b([dD][oO])\\b)|(?P<t_ELSE>\\b([eE][lL][sS][eE])\\b)|(?P<t_END>\\b([eE][nN][dD])\\b)|(?P<t_FILE>\\b([fF][iI][lL][eE])\\b)|(?P<t_FOR>\\b([fF][oO][rR])\\b)|(?P<t_FUNCTION>\\b([fF][uU][nN][cC][tT][iI][oO][nN])\\b)|(?P<t_GOTO>\\b([gG][oO][tT][oO])\\b)|(?P<t_IF>\\b([iI][fF])\\b)|(?P<t_IN>\\b([iI][nN])\\b)|(?P<t_LABEL>\\b([lL][aA][bB][eE][lL])\\b)|(?P<t_MOD>\\b([mM][oO][dD])\\b)|(?P<t_NOT>\\b([nN][oO][tT])\\b)|(?P<t_OF>\\b([oO][fF])\\b)|(?P<t_OR>\\b([oO][rR])\\b)|(?P<t_PACKED>\\b([pP][aA][cC][kK][eE][dD])\\b)|(?P<t_PROCEDURE>\\b([pP][rR][oO][cC][eE][dD][uU][rR][eE])\\b)|(?P<t_PROGRAM>\\b([pP][rR][oO][gG][rR][aA][mM])\\b)|(?P<t_RECORD>\\b([rR][eE][cC][oO][rR][dD])\\b)|(?P<t_REPEAT>\\b([rR][eE][pP][eE][aA][tT])\\b)|(?P<t_SET>\\b([sS][eE][tT])\\b)|(?P<t_THEN>\\b([tT][hH][eE][nN])\\b)|(?P<t_TO>\\b([tT][oO])\\b)|(?P<t_TYPE>\\b([tT][yY][pP][eE])\\b)|(?P<t_UNTIL>\\b([uU][nN][tT][iI][lL])\\b)|(?P<t_VAR>\\b([vV][aA][rR])\\b)|(?P<t_WHILE>\\b([wW][hH][iI][lL][eE])\\b)|(?P<t_WITH>\\b([wW][iI][tT][hH])\\b)|(?P<t_CHAR>\\'([^']|\\'\\')\\')|(?P<t_TEXTO>\\'([^']|'')+\\')|(?P<t_REAL>\\d+\\.\\d+([eE][+-]?\\d+)?)|(?P<t_INTEGER>\\d+)|(?P<t_ID>[A-Za-z_][A-Za-z0-9_]*)|(?P<t_COMMENT>\\{[^}]*\\}|\\(\\*([^*]|\\*+[^*)])*\\*+\\))|(?P<t_newline>\\n+)|(?P<t_NE><>|!=)|(?P<t_RANGE>\\.\\.)|(?P<t_ASSIGN>:=)|(?P<t_DOT>\\.)|(?P<t_GE>>=)|(?P<t_LBRACKET>\\[)|(?P<t_LE><=)|(?P<t_LPAREN>\\()|(?P<t_PLUS>\\+)|(?P<t_RBRACKET>\\])|(?P<t_RPAREN>\\))|(?P<t_TIMES>\\*)|(?P<t_COLON>:)|(?P<t_COMMA>,)|(?P<t_DIVIDE>/)|(?P<t_EQ>=)|(?P<t_GT>>)|(?P<t_LT><)|(?P<t_MINUS>-)|(?P<t_SEMI>;)", [None, ('t_TIPO', 'TIPO'), None, ('t_BOOLEAN', 'BOOLEAN'), None, ('t_AND', 'AND'), None, ('t_ARRAY', 'ARRAY'), None, ('t_BEGIN', 'BEGIN'), None, ('t_CASE', 'CASE'), None, ('t_CONST', 'CONST'), None, ('t_DIV', 'DIV'), None, ('t_DOWNTO', 'DOWNTO'), None, ('t_DO', 'DO'), None, ('t_ELSE', 'ELSE'), None, ('t_END', 'END'), None, ('t_FILE', 'FILE'), None, ('t_FOR', 'FOR'), None, ('t_FUNCTION', 'FUNCTION'), None, ('t_GOTO', 'GOTO'), None, ('t_IF', 'IF'), None, ('t_IN', 'IN'), None, ('t_LABEL', 'LABEL'), None, ('t_MOD', 'MOD'), None, ('t_NOT', 'NOT'), None, ('t_OF', 'OF'), None, ('t_OR', 'OR'), None, ('t_PACKED', 'PACKED'), None, ('t_PROCEDURE', 'PROCEDURE'), None, ('t_PROGRAM', 'PROGRAM'), None, ('t_RECORD', 'RECORD'), None, ('t_REPEAT', 'REPEAT'), None, ('t_SET', 'SET'), None, ('t_THEN', 'THEN'), None, ('t_TO', 'TO'), None, ('t_TYPE', 'TYPE'), None, ('t_UNTIL', 'UNTIL'), None, ('t_VAR', 'VAR'), None, ('t_WHILE', 'WHILE'), None, ('t_WITH', 'WITH'), None, ('t_CHAR', 'CHAR'), None, ('t_TEXTO', 'TEXTO'), None, ('t_REAL', 'REAL'), None, ('t_INTEGER', 'INTEGER'), ('t_ID', 'ID'), ('t_COMMENT', 'COMMENT'), None, ('t_newline', 'newline'), (None, 'NE'), (None, 'RANGE'), (None, 'ASSIGN'), (None, 'DOT'), (None, 'GE'), (None, 'LBRACKET'), (None, 'LE'), (None, 'LPAREN'), (None, 'PLUS'), (None, 'RBRACKET'), (None, 'RPAREN'), (None, 'TIMES'), (None, 'COLON'), (None, 'COMMA'), (None, 'DIVIDE'), (None, 'EQ'), (None, 'GT'), (None, 'LT'), (None, 'MINUS'), (None, 'SEMI')])]}
+_lexstateignore = {'INITIAL': ' \t\r'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
@@ -0,0 +1,10 @@
+# lextab_tabela.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AND', 'ARRAY', 'ASSIGN', 'BEGIN', 'BOOLEAN', 'CASE', 'CHAR', 'COLON', 'COMMA', 'CONST', 'DIV', 'DIVIDE', 'DO', 'DOT', 'DOWNTO', 'ELSE', 'END', 'EQ', 'FILE', 'FOR', 'FUNCTION', 'GE', 'GOTO', 'GT', 'ID', 'IF', 'IN', 'INTEGER', 'LABEL', 'LBRACKET', 'LE', 'LPAREN', 'LT', 'MINUS', 'MOD', 'NE', 'NOT', 'OF', 'OR', 'PACKED', 'PLUS', 'PROCEDURE', 'PROGRAM', 'RANGE', 'RBRACKET', 'REAL', 'RECORD', 'REPEAT', 'RPAREN', 'SEMI', 'SET', 'TEXTO', 'THEN', 'TIMES', 'TIPO', 'TO', 'TYPE', 'UNTIL', 'VAR', 'WHILE', 'WITH'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [("(?P<t_CHAR>\\'([^']|\\'\\')\\')|(?P<t_TEXTO>\\'([^']|'')+\\')|(?P<t_REAL>\\d+\\.\\d+([eE][+-]?\\d+)?)|(?P<t_INTEGER>\\d+)|(?P<t_ID>[A-Za-z_][A-Za-z0-9_]*)|(?P<t_COMMENT>\\{[^}]*\\}|\\(\\*([^*]|\\*+[^*)])*\\*+\\))|(?P<t_newline>\\n+)|(?P<t_NE><>|!=)|(?P<t_RANGE>\\.\\.)|(?P<t_ASSIGN>:=)|(?P<t_DOT>\\.)|(?P<t_GE>>=)|(?P<t_LBRACKET>\\[)|(?P<t_LE><=)|(?P<t_LPAREN>\\()|(?P<t_PLUS>\\+)|(?P<t_RBRACKET>\\])|(?P<t_RPAREN>\\))|(?P<t_TIMES>\\*)|(?P<t_COLON>:)|(?P<t_COMMA>,)|(?P<t_DIVIDE>/)|(?P<t_EQ>=)|(?P<t_GT>>)|(?P<t_LT><)|(?P<t_MINUS>-)|(?P<t_SEMI>;)", [None, ('t_CHAR', 'CHAR'), None, ('t_TEXTO', 'TEXTO'), None, ('t_REAL', 'REAL'), None, ('t_INTEGER', 'INTEGER'), ('t_ID', 'ID'), ('t_COMMENT', 'COMMENT'), None, ('t_newline', 'newline'), (None, 'NE'), (None, 'RANGE'), (None, 'ASSIGN'), (None, 'DOT'), (None, 'GE'), (None, 'LBRACKET'), (None, 'LE'), (None, 'LPAREN'), (None, 'PLUS'), (None, 'RBRACKET'), (None, 'RPAREN'), (None, 'TIMES'), (None, 'COLON'), (None, 'COMMA'), (None, 'DIVIDE'), (None, 'EQ'), (None, 'GT'), (None, 'LT'), (None, 'MINUS'), (None, 'SEMI')])]}
+_lexstateignore = {'INITIAL': ' \t\r'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {}
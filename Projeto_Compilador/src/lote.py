@@ -0,0 +1,172 @@
+# Compilação em lote de muitos ficheiros .pas
+#
+# Em vez de lançar um processo Python por ficheiro (cada um a importar os módulos e a
+# carregar as tabelas do lexer/parser), os ficheiros são distribuídos por um
+# ProcessPoolExecutor. Cada trabalhador aquece as suas instâncias uma vez, ao arrancar,
+# e compila depois todos os ficheiros que lhe calham. O .vm de cada ficheiro é escrito
+# ao lado do .pas. Todos os ficheiros são compilados com as mesmas main.OpcoesGeracao.
+
+import io
+import os
+import glob
+import time
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import main
+from ana_sem import SemanticError
+from cache_ast import CacheAST, CONTADORES_CACHE, MAX_BYTES_OMISSAO
+
+SUCESSO = 'sucesso'
+ERRO_SINTATICO = 'erro sintático'
+ERRO_SEMANTICO = 'erro semântico'
+# Outras exceções (ex.: construções que o gerador ainda não suporta)
+ERRO_INTERNO = 'erro interno'
+ESTADOS = (SUCESSO, ERRO_SINTATICO, ERRO_SEMANTICO, ERRO_INTERNO)
+
+# Programa mínimo compilado por cada trabalhador ao arrancar
+_AQUECIMENTO = "program Aquecimento;\nvar i: integer;\nbegin\n  i := 1;\n  writeln(i)\nend.\n"
+
+
+class ResultadoLote:
+    """
+    Resultado da compilação de um ficheiro: estado, tempo (s), a primeira mensagem de erro
+    e os contadores da cache (acertos, falhas, escritas, remoções) desta compilação.
+    """
+    __slots__ = ('caminho', 'estado', 'tempo', 'mensagem', 'cache')
+
+    def __init__(self, caminho, estado, tempo, mensagem='', cache=None):
+        self.caminho = caminho
+        self.estado = estado
+        self.tempo = tempo
+        self.mensagem = mensagem
+        self.cache = cache
+
+    def __repr__(self):
+        return f"ResultadoLote({self.caminho!r}, {self.estado!r}, {self.tempo:.4f})"
+
+
+def expandir(padroes):
+    """Lista os ficheiros .pas de cada padrão: uma diretoria (percorrida recursivamente),
+    um glob (aceita **) ou um ficheiro. Sem repetidos, pela ordem dos padrões."""
+    vistos = set()
+    ficheiros = []
+    for padrao in padroes:
+        if os.path.isdir(padrao):
+            encontrados = glob.glob(os.path.join(padrao, '**', '*.pas'), recursive=True)
+        else:
+            encontrados = glob.glob(padrao, recursive=True)
+        for caminho in sorted(encontrados):
+            if os.path.isfile(caminho) and caminho not in vistos:
+                vistos.add(caminho)
+                ficheiros.append(caminho)
+    return ficheiros
+
+
+# Configuração do trabalhador (definida por _iniciar em cada processo)
+_opcoes = None
+_cache = None
+
+
+def _iniciar(modo_lexer, otimizado, parser, streaming, dir_cache, max_bytes_cache, opcoes, escrita_continua):
+    global _opcoes, _cache
+    _opcoes = (modo_lexer, otimizado, parser, streaming, opcoes, escrita_continua)
+    _cache = CacheAST(dir_cache, max_bytes_cache) if dir_cache else None
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.compilar(_AQUECIMENTO, modo_lexer, otimizado, parser, opcoes=opcoes)
+
+
+def compilar_um(caminho):
+    resultado = _compilar_um(caminho)
+    if _cache is not None:
+        resultado.cache = tuple(getattr(_cache, nome) for nome in CONTADORES_CACHE)
+        for nome in CONTADORES_CACHE:
+            setattr(_cache, nome, 0)
+    return resultado
+
+
+def _compilar_um(caminho):
+    modo_lexer, otimizado, parser, streaming, opcoes, escrita_continua = _opcoes
+    out = caminho.rsplit('.', 1)[0] + '.vm'
+    # Com escrita contínua o .vm é escrito durante a geração (ver main.gerar_para)
+    destino = out if escrita_continua else None
+    saida = io.StringIO()
+    inicio = time.perf_counter()
+    try:
+        # As mensagens do parser iriam misturar-se entre trabalhadores: ficam no resultado
+        with contextlib.redirect_stdout(saida):
+            if streaming:
+                gen = main.compilar_ficheiro(caminho, modo_lexer, otimizado, parser, _cache, opcoes, destino)
+            else:
+                with open(caminho, 'r', encoding='utf-8') as f:
+                    codigo = f.read()
+                gen = main.compilar(codigo, modo_lexer, otimizado, parser, _cache, opcoes, destino)
+        if gen is None:
+            linhas = saida.getvalue().splitlines()
+            return ResultadoLote(caminho, ERRO_SINTATICO, time.perf_counter() - inicio, linhas[0] if linhas else '')
+        if destino is None:
+            gen.write(out)
+        return ResultadoLote(caminho, SUCESSO, time.perf_counter() - inicio)
+    except SemanticError as e:
+        return ResultadoLote(caminho, ERRO_SEMANTICO, time.perf_counter() - inicio, str(e))
+    except Exception as e:
+        return ResultadoLote(caminho, ERRO_INTERNO, time.perf_counter() - inicio, f"{type(e).__name__}: {e}")
+
+
+def compilar_lote(ficheiros, modo_lexer='regras', otimizado=False, parser='lalr', streaming=False,
+                  trabalhadores=None, dir_cache=None, max_bytes_cache=MAX_BYTES_OMISSAO,
+                  opcoes=main.OPCOES_OMISSAO, escrita_continua=False, ao_terminar=None):
+    """
+    Compila 'ficheiros' com as main.OpcoesGeracao 'opcoes' e devolve a lista de
+    ResultadoLote pela mesma ordem. Com 'escrita_continua', cada .vm é escrito à medida
+    que é gerado.
+    'trabalhadores' = 1 compila neste processo; None usa um processo por CPU.
+    'ao_terminar', se dado, é chamado com cada resultado assim que fica disponível.
+    """
+    iniciar = (modo_lexer, otimizado, parser, streaming, dir_cache, max_bytes_cache, opcoes, escrita_continua)
+    if trabalhadores is None:
+        trabalhadores = os.cpu_count() or 1
+    trabalhadores = max(1, min(trabalhadores, len(ficheiros)))
+
+    resultados = []
+    if trabalhadores == 1:
+        _iniciar(*iniciar)
+        for resultado in map(compilar_um, ficheiros):
+            resultados.append(resultado)
+            if ao_terminar:
+                ao_terminar(resultado)
+    else:
+        # Blocos de vários ficheiros por tarefa reduzem as trocas entre processos; quatro
+        # blocos por trabalhador mantêm a carga equilibrada quando os tamanhos variam
+        bloco = max(1, len(ficheiros) // (trabalhadores * 4))
+        with ProcessPoolExecutor(trabalhadores, initializer=_iniciar, initargs=iniciar) as executor:
+            for resultado in executor.map(compilar_um, ficheiros, chunksize=bloco):
+                resultados.append(resultado)
+                if ao_terminar:
+                    ao_terminar(resultado)
+
+    # Os contadores da cache vêm em cada resultado e são acumulados em disco só por este
+    # processo, para que trabalhadores concorrentes não percam contagens uns dos outros
+    if dir_cache:
+        cache = CacheAST(dir_cache, max_bytes_cache)
+        for r in resultados:
+            for nome, valor in zip(CONTADORES_CACHE, r.cache or ()):
+                setattr(cache, nome, getattr(cache, nome) + valor)
+        cache.registar_estatisticas()
+    return resultados
+
+
+def mostrar_resultado(resultado):
+    linha = f"{resultado.estado:<15} {resultado.tempo * 1000:9.1f} ms  {resultado.caminho}"
+    if resultado.mensagem:
+        linha += f"\n{'':<28}{resultado.mensagem}"
+    print(linha)
+
+
+def resumo(resultados, duracao):
+    contagem = {estado: 0 for estado in ESTADOS}
+    for r in resultados:
+        contagem[r.estado] += 1
+    total = len(resultados)
+    linhas = [f"{total} ficheiro(s) em {duracao:.2f} s ({total / duracao if duracao else 0.0:.1f} ficheiros/s):"]
+    linhas += [f"  {estado:<15} {contagem[estado]:6d}" for estado in ESTADOS]
+    return "\n".join(linhas)
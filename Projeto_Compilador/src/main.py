@@ -1,23 +1,307 @@
 import sys
 import os
-from ana_sin import parse
+import time
+import argparse
+from ana_lex import MODOS_LEXER
+from ana_sin import parse, parse_ficheiro
+from ana_sin_descendente import parse_descendente, parse_ficheiro_descendente
 from ana_sem import*
 from gerador_codigo import CodeGenerator
+from constantes import dobrar_constantes
+from peephole import OtimizadorPeephole
+from saida import SaidaContinua
+from alcance import relatorio as relatorio_alcance
+from expansao import relatorio as relatorio_expansao
+from cache_ast import CacheAST, MAX_BYTES_OMISSAO
+
+
+# Parsers disponíveis: nome -> (parse de texto, parse de ficheiro em streaming)
+PARSERS = {
+    'lalr': (parse, parse_ficheiro),
+    'descendente': (parse_descendente, parse_ficheiro_descendente),
+}
+
+
+class OpcoesGeracao:
+    """
+    Opções da análise semântica e da geração de código, construídas uma vez (ver
+    de_argumentos) e passadas inteiras às funções de compilação.
+    Atributos:
+        dobrar (bool): dobra as expressões constantes antes da geração (ver constantes.py).
+        peephole (bool): reescreve o código gerado com as regras de peephole.py.
+        intervalos (bool): omite os CHECK que nunca falham (ver intervalos.py).
+        invariantes (bool): calcula antes dos ciclos as expressões invariantes.
+        eliminar (bool): não gera as sub-rotinas e as variáveis globais mortas (ver alcance.py).
+        expandir (bool): expande em linha as sub-rotinas pequenas nas chamadas (ver expansao.py).
+    """
+    __slots__ = ('dobrar', 'peephole', 'intervalos', 'invariantes', 'eliminar', 'expandir')
+
+    def __init__(self, dobrar=True, peephole=True, intervalos=True, invariantes=True, eliminar=True,
+                 expandir=True):
+        self.dobrar = dobrar
+        self.peephole = peephole
+        self.intervalos = intervalos
+        self.invariantes = invariantes
+        self.eliminar = eliminar
+        self.expandir = expandir
+
+    @classmethod
+    def de_argumentos(cls, args):
+        """Opções dadas pelos argumentos da linha de comandos (ver main)."""
+        return cls(dobrar=not args.sem_dobragem, peephole=not args.sem_peephole,
+                   intervalos=not args.sem_intervalos, invariantes=not args.sem_invariantes,
+                   eliminar=not args.sem_eliminacao, expandir=not args.sem_expansao)
+
+    def gerador(self, saida=None):
+        """CodeGenerator com estas opções."""
+        return CodeGenerator(intervalos=self.intervalos, invariantes=self.invariantes, eliminar=self.eliminar,
+                             expandir=self.expandir, saida=saida)
+
+    def __repr__(self):
+        return f"OpcoesGeracao({', '.join(f'{nome}={getattr(self, nome)}' for nome in self.__slots__)})"
+
+
+OPCOES_OMISSAO = OpcoesGeracao()
+
+
+# Faz a análise semântica e gera o código a partir da AST (sem escrever o ficheiro), com
+# as OpcoesGeracao 'opcoes'. Retorna o CodeGenerator com o código gerado, ou None se
+# houver erro sintático. Com 'destino' (o caminho do .vm), o código é escrito à medida
+# que é gerado (ver saida.py).
+def gerar(result, opcoes=OPCOES_OMISSAO, destino=None):
+    # pp = PrettyPrinter(width=80, indent=4)
+    # pp.pprint(result)
+    if result is None:
+        return None
+    analyzer = SemanticAnalyzer()
+    analyzer.analyze(result)
+    return gerar_codigo(result, opcoes, destino)
+
+
+# Gera o código a partir de uma AST já validada semanticamente
+def gerar_codigo(result, opcoes=OPCOES_OMISSAO, destino=None):
+    if opcoes.dobrar:
+        result = dobrar_constantes(result)
+
+    def gerar_em(saida):
+        gen = opcoes.gerador(saida)
+        gen.build_symtab(result)
+        gen.gen(result)
+        return gen
+    return gerar_para(gerar_em, opcoes.peephole, destino)
+
+
+# Passa o código do CodeGenerator pelo otimizador peephole (entre gen() e write())
+def otimizar_codigo(gen, peephole=True):
+    if peephole:
+        gen.code = OtimizadorPeephole().otimizar(gen.code)
+    return gen
+
+
+# Chama gerar_em(saida), que devolve o CodeGenerator. Sem 'destino', o código fica todo em
+# gen.code e é otimizado no fim. Com 'destino', gerar_em recebe uma SaidaContinua que
+# otimiza e escreve cada bloco num ficheiro temporário, que só substitui o .vm se a
+# geração terminar (um erro deixa o .vm anterior como estava)
+def gerar_para(gerar_em, peephole=True, destino=None):
+    if destino is None:
+        return otimizar_codigo(gerar_em(None), peephole)
+    temporario = destino + '.tmp'
+    try:
+        with open(temporario, 'w') as f:
+            saida = SaidaContinua(f, OtimizadorPeephole() if peephole else None)
+            gen = gerar_em(saida)
+            saida.fechar()
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    os.replace(temporario, destino)
+    return gen
+
+
+# Depois do parse: se houve erros sintáticos (já mostrados um a um pelo parser),
+# mostra o total; caso contrário segue para a análise semântica e geração de código
+def gerar_ou_reportar(resultado, opcoes=OPCOES_OMISSAO, destino=None):
+    result, erros = resultado
+    if erros:
+        print(f"{len(erros)} erro(s) sintático(s) encontrado(s).")
+        return None
+    return gerar(result, opcoes, destino)
+
+
+# Com cache: num acerto salta o parse e a análise semântica e segue diretamente para
+# o CodeGenerator; numa falha, a AST só é guardada depois de passar a análise semântica
+# (programas com erros voltam a ser analisados, para que os erros sejam mostrados).
+def compilar_com_cache(cache, chave, analisar, opcoes=OPCOES_OMISSAO, destino=None):
+    result = cache.obter(chave)
+    if result is not None:
+        return gerar_codigo(result, opcoes, destino)
+    result, erros = analisar()
+    if erros:
+        print(f"{len(erros)} erro(s) sintático(s) encontrado(s).")
+        return None
+    if result is None:
+        return None
+    SemanticAnalyzer().analyze(result)
+    cache.guardar(chave, result)
+    return gerar_codigo(result, opcoes, destino)
+
+
+# Compila o código Pascal dado em texto
+def compilar(codigo, modo_lexer='regras', otimizado=False, parser='lalr', cache=None, opcoes=OPCOES_OMISSAO,
+             destino=None):
+    analisar = lambda: PARSERS[parser][0](codigo, modo_lexer=modo_lexer, otimizado=otimizado, diagnosticos=True)
+    if cache is not None:
+        return compilar_com_cache(cache, cache.chave_texto(codigo), analisar, opcoes, destino)
+    return gerar_ou_reportar(analisar(), opcoes, destino)
+
+
+# Compila o ficheiro Pascal lendo os tokens em streaming (mmap), sem carregar o texto
+def compilar_ficheiro(caminho, modo_lexer='regras', otimizado=False, parser='lalr', cache=None,
+                      opcoes=OPCOES_OMISSAO, destino=None):
+    analisar = lambda: PARSERS[parser][1](caminho, modo_lexer=modo_lexer, otimizado=otimizado, diagnosticos=True)
+    if cache is not None:
+        return compilar_com_cache(cache, cache.chave_ficheiro(caminho), analisar, opcoes, destino)
+    return gerar_ou_reportar(analisar(), opcoes, destino)
+
+
+# Mede o arranque a frio (primeira compilação no processo, que inclui carregar ou
+# construir as tabelas do lexer/parser) e a quente (instâncias já construídas)
+def relatorio_tempos(compilar_fn, modo_lexer, otimizado, repeticoes=5):
+    inicio = time.perf_counter()
+    compilar_fn()
+    frio = time.perf_counter() - inicio
+
+    quente = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        compilar_fn()
+        duracao = time.perf_counter() - inicio
+        if quente is None or duracao < quente:
+            quente = duracao
+
+    modo = 'otimizado' if otimizado else 'normal'
+    print(f"Tempos ({modo}, lexer '{modo_lexer}'):")
+    print(f"  Arranque a frio : {frio * 1000:8.2f} ms")
+    print(f"  Arranque a quente: {quente * 1000:8.2f} ms (melhor de {repeticoes})")
+    print(f"  Custo de arranque: {(frio - quente) * 1000:8.2f} ms")
+
+
+# Modo --fluxo: faz a análise semântica e mostra, por scope (programa e cada rotina), o
+# resultado da análise de inicialização das variáveis (ver fluxo.py)
+def mostrar_fluxo(codigo, modo_lexer, otimizado, parser):
+    result, erros = PARSERS[parser][0](codigo, modo_lexer=modo_lexer, otimizado=otimizado, diagnosticos=True)
+    if erros or result is None:
+        print(f"{len(erros)} erro(s) sintático(s) encontrado(s).")
+        return
+    analyzer = SemanticAnalyzer()
+    try:
+        analyzer.analyze(result)
+    finally:
+        # Num erro semântico mostra os scopes já analisados (o erro é mostrado a seguir)
+        texto = analyzer.relatorio_fluxo()
+        if texto:
+            print(texto)
+
+
+# Modo --lote: compila os ficheiros num conjunto de processos e mostra uma linha por
+# ficheiro e o resumo. Retorna 1 se algum ficheiro não compilou.
+def main_lote(args):
+    import lote
+    ficheiros = lote.expandir(args.lote)
+    if not ficheiros:
+        print(f"Erro: nenhum ficheiro .pas encontrado em {', '.join(args.lote)}.")
+        return 1
+    dir_cache = (args.cache or '.cache_ast') if args.cache is not None or args.cache_stats else None
+    inicio = time.perf_counter()
+    resultados = lote.compilar_lote(ficheiros, args.lexer, args.otimizado, args.parser, args.streaming,
+                                    args.trabalhadores, dir_cache, int(args.cache_max_mb * 1024 * 1024),
+                                    OpcoesGeracao.de_argumentos(args), args.escrita_continua,
+                                    ao_terminar=lote.mostrar_resultado)
+    print(lote.resumo(resultados, time.perf_counter() - inicio))
+    if args.cache_stats:
+        print(CacheAST(dir_cache).relatorio())
+    return 0 if all(r.estado == lote.SUCESSO for r in resultados) else 1
+
 
 def main():
-    if len(sys.argv) != 2:
-        print("Uso: python main.py <nome do ficheiro_pascal>")
-        sys.exit(1)
+    argp = argparse.ArgumentParser(usage="python main.py [opções] <nome do ficheiro_pascal>\n"
+                                         "       python main.py [opções] --lote <diretoria ou glob> ...")
+    argp.add_argument('ficheiro', nargs='?', help="nome do ficheiro Pascal (em ../tests/)")
+    argp.add_argument('--lote', nargs='+', metavar='PADRAO',
+                      help="compila em paralelo todos os .pas das diretorias/globs dados, "
+                           "escrevendo cada .vm ao lado do .pas")
+    argp.add_argument('--trabalhadores', type=int, default=None,
+                      help="número de processos do modo --lote (por omissão: um por CPU)")
+    argp.add_argument('--lexer', choices=MODOS_LEXER, default='regras',
+                      help="modo do lexer (por omissão: regras)")
+    argp.add_argument('--parser', choices=PARSERS, default='lalr',
+                      help="parser LALR (PLY) ou descendente recursivo (por omissão: lalr)")
+    argp.add_argument('--otimizado', action='store_true',
+                      help="usa as tabelas pré-geradas e um lexer clonado de uma instância mestre")
+    argp.add_argument('--tempos', action='store_true',
+                      help="mostra o tempo de arranque a frio vs. a quente")
+    argp.add_argument('--fluxo', action='store_true',
+                      help="mostra, por scope, as variáveis inicializadas em todos os caminhos")
+    argp.add_argument('--sem-dobragem', action='store_true',
+                      help="não dobra as expressões constantes antes de gerar o código")
+    argp.add_argument('--sem-peephole', action='store_true',
+                      help="não aplica as otimizações peephole ao código gerado")
+    argp.add_argument('--sem-intervalos', action='store_true',
+                      help="mantém a verificação (CHECK) de todos os índices de arrays")
+    argp.add_argument('--sem-invariantes', action='store_true',
+                      help="não calcula antes dos ciclos as expressões invariantes")
+    argp.add_argument('--sem-eliminacao', action='store_true',
+                      help="gera todas as sub-rotinas e reserva posição para todas as variáveis globais")
+    argp.add_argument('--mortos', action='store_true',
+                      help="mostra as sub-rotinas e as variáveis globais que a eliminação removeu")
+    argp.add_argument('--sem-expansao', action='store_true',
+                      help="não expande em linha as chamadas das sub-rotinas pequenas")
+    argp.add_argument('--expansoes', action='store_true',
+                      help="mostra que sub-rotinas foram expandidas em linha (e porque não as outras)")
+    argp.add_argument('--escrita-continua', action='store_true',
+                      help="escreve o .vm à medida que é gerado, sem guardar o código todo em memória")
+    argp.add_argument('--streaming', action='store_true',
+                      help="lê os tokens de um mmap do ficheiro em vez de carregar o texto")
+    argp.add_argument('--cache', nargs='?', const='.cache_ast', default=None, metavar='DIR',
+                      help="guarda a AST validada numa cache em disco indexada pelo conteúdo "
+                           "(por omissão em .cache_ast)")
+    argp.add_argument('--cache-max-mb', type=float, default=MAX_BYTES_OMISSAO / (1024 * 1024),
+                      help="tamanho máximo da cache em MiB; remove as entradas usadas há mais tempo")
+    argp.add_argument('--cache-stats', action='store_true',
+                      help="mostra os acertos/falhas acumulados da cache (implica --cache)")
+    args = argp.parse_args()
 
-    nome_ficheiro = sys.argv[1]
+    if args.lote:
+        # Os relatórios por ficheiro não fazem sentido com os ficheiros compilados em paralelo
+        sem_lote = [opcao for opcao in ('tempos', 'fluxo', 'mortos', 'expansoes') if getattr(args, opcao)]
+        if sem_lote:
+            argp.error(f"{', '.join('--' + opcao for opcao in sem_lote)} não pode(m) ser usado(s) com --lote")
+        sys.exit(main_lote(args))
+    if args.ficheiro is None:
+        argp.error("falta o nome do ficheiro Pascal (ou --lote)")
+
+    nome_ficheiro = args.ficheiro
     caminho_ficheiro = f"../tests/{nome_ficheiro}"
 
     if not os.path.isfile(caminho_ficheiro):
         print(f"Erro: o ficheiro '{caminho_ficheiro}' não existe.")
         sys.exit(1)
 
-    with open(caminho_ficheiro, 'r', encoding='utf-8') as f:
-        codigo = f.read()
+    cache = None
+    if args.cache is not None or args.cache_stats:
+        cache = CacheAST(args.cache or '.cache_ast', int(args.cache_max_mb * 1024 * 1024))
+
+    out = caminho_ficheiro.rsplit('.', 1)[0] + '.vm'
+    destino = out if args.escrita_continua else None
+    opcoes = OpcoesGeracao.de_argumentos(args)
+    if args.streaming:
+        compilar_fn = lambda: compilar_ficheiro(caminho_ficheiro, args.lexer, args.otimizado, args.parser, cache,
+                                                opcoes, destino)
+    else:
+        with open(caminho_ficheiro, 'r', encoding='utf-8') as f:
+            codigo = f.read()
+        compilar_fn = lambda: compilar(codigo, args.lexer, args.otimizado, args.parser, cache, opcoes, destino)
 
     # Cria lexer
     # lexer = build_lexer()
@@ -27,21 +311,30 @@ def main():
     #     print(f"{token.type}({token.value}) na linha {token.lineno}")
 
     try:
-        result = parse(codigo)
-        # pp = PrettyPrinter(width=80, indent=4)
-        # pp.pprint(result)
-        if result!=None:
-            analyzer = SemanticAnalyzer()
-            analyzer.analyze(result)
-            gen = CodeGenerator()
-            gen.build_symtab(result)
-            gen.gen(result)
-            out = caminho_ficheiro.rsplit('.', 1)[0] + '.vm'
-            gen.write(out)
+        if args.tempos:
+            relatorio_tempos(compilar_fn, args.lexer, args.otimizado)
+            return
+        if args.fluxo:
+            with open(caminho_ficheiro, 'r', encoding='utf-8') as f:
+                mostrar_fluxo(f.read(), args.lexer, args.otimizado, args.parser)
+            return
+        gen = compilar_fn()
+        if gen is not None:
+            if destino is None:
+                gen.write(out)
             print(f"Código gerado em: {out}")
+            if args.mortos:
+                print(relatorio_alcance(gen.subrotinas_removidas, gen.globais_removidas))
+            if args.expansoes and gen.plano_expansao is not None:
+                print(relatorio_expansao(gen.plano_expansao, gen.chamadas_expandidas))
     except SemanticError as e:
         print(e)
+    finally:
+        if cache is not None:
+            cache.registar_estatisticas()
+            if args.cache_stats:
+                print(cache.relatorio())
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,179 @@
+
+# parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'nonassocIFXnonassocELSEleftORleftANDrightNOTleftEQNELTLEGTGEINleftPLUSMINUSleftTIMESDIVIDEDIVMODleftCOLONAND ARRAY ASSIGN BEGIN BOOLEAN CASE CHAR COLON COMMA CONST DIV DIVIDE DO DOT DOWNTO ELSE END EQ FILE FOR FUNCTION GE GOTO GT ID IF IN INTEGER LABEL LBRACKET LE LPAREN LT MINUS MOD NE NOT OF OR PACKED PLUS PROCEDURE PROGRAM RANGE RBRACKET REAL RECORD REPEAT RPAREN SEMI SET TEXTO THEN TIMES TIPO TO TYPE UNTIL VAR WHILE WITHprogram : PROGRAM ID SEMI block DOTblock : declarations BEGIN statement_list ENDblock : declarations error BEGIN statement_list END\n             | declarations BEGIN statement_list error ENDdeclarations : declarations declaration\n                    | emptydeclaration : const_declaration\n                    | type_declaration\n                    | label_declaration\n                    | var_declaration\n                    | function_declaration\n                    | procedure_declarationconst_declaration : CONST const_listconst_list : const_list CONST_ITEM SEMI\n                  | CONST_ITEM SEMIconst_list : const_list error SEMI\n                  | error SEMICONST_ITEM : ID EQ expressiontype_declaration : TYPE type_listtype_list : type_list type_item SEMI\n                 | type_item SEMItype_list : type_list error SEMI\n                 | error SEMItype_item : ID EQ typelabel_declaration : LABEL label_list SEMIlabel_list : label_list COMMA INTEGER\n                  | INTEGERvar_declaration : VAR var_listvar_list : var_list var_item\n                | var_itemvar_item : ID_LIST COLON type SEMIvar_item : error SEMIfunction_declaration : FUNCTION ID LPAREN params RPAREN COLON type SEMI block SEMIfunction_declaration : FUNCTION error block SEMIprocedure_declaration : PROCEDURE ID LPAREN params RPAREN SEMI block SEMIprocedure_declaration : PROCEDURE error block SEMItype : packed_type\n            | simple_type\n            | id_type\n            | array_type\n            | enum_type\n            | subrange_type\n            | record_type\n            | set_type\n            | file_typepacked_type : PACKED typesimple_type : TIPOid_type : IDarray_type : ARRAY LBRACKET range RBRACKET OF typeenum_type : LPAREN ID_LIST RPARENsubrange_type : const_expr RANGE const_exprrecord_type : RECORD field_list variant_part END\n                   | RECORD field_list ENDset_type : SET OF typefile_type : FILE OF typerange : const_expr RANGE const_exprconst_expr : INTEGER\n                  | REAL\n                  | BOOLEAN\n                  | CHAR\n                  | TEXTO\n                  | IDfield_list : field_list var_item\n                  | var_itemvariant_part : CASE ID COLON TIPO OF variant_listvariant_list : variant_list variant_item SEMI\n                    | variant_item SEMIvariant_item : constant COLON LPAREN field_list RPARENID_LIST : ID\n               | ID_LIST COMMA IDparams : param_list\n              | emptyparam_list : param_list SEMI param\n                  | paramparam : ID_LIST COLON type\n             | VAR ID_LIST COLON type\n             | CONST ID_LIST COLON typestatement_list : statement_list SEMI statement\n                      | statementstatement_list : statement_list error SEMI statementcompound : BEGIN statement_list ENDcompound : BEGIN statement_list error ENDstatement : assignment\n                 | procedure_call\n                 | if_statement\n                 | for_statement\n                 | while_statement\n                 | repeat_statement\n                 | case_statement\n                 | with_statement\n                 | goto_statement\n                 | labeled_statement\n                 | compound\n                 | emptyassignment : variable ASSIGN expressionvariable : variable LBRACKET expression RBRACKET\n                | variable DOT ID\n                | IDprocedure_call : ID LPAREN expression_list RPAREN\n                      | IDif_statement : IF expression THEN statement ELSE statement\n                    | IF expression THEN statement %prec IFXfor_statement : FOR ID ASSIGN expression TO expression DO statement\n                     | FOR ID ASSIGN expression DOWNTO expression DO statementwhile_statement : WHILE expression DO statementrepeat_statement : REPEAT statement_list UNTIL expressionrepeat_statement : REPEAT statement_list error UNTIL expressioncase_statement : CASE expression OF case_list ENDcase_list : case_list case_item SEMI\n                 | case_item SEMIcase_item : constant_list COLON statement_listconstant_list : const_expr\n                     | constant_list COMMA const_exprwith_statement : WITH variable_list DO statementvariable_list : variable\n                     | variable_list COMMA variablegoto_statement : GOTO INTEGERlabeled_statement : INTEGER COLON statementconstant : INTEGER\n                | REAL\n                | BOOLEAN\n                | CHAR\n                | TEXTOexpression : variable\n                  | constant\n                  | TIPO LPAREN expression_list RPAREN\n                  | ID LPAREN expression_list RPAREN\n                  | LPAREN expression RPAREN\n                  | LBRACKET expression_list RBRACKET\n                  | NOT expression\n                  | expression COLON expression\n                  | expression PLUS expression\n                  | expression MINUS expression\n                  | expression TIMES expression\n                  | expression DIVIDE expression\n                  | expression DIV expression\n                  | expression MOD expression\n                  | expression EQ expression\n                  | expression NE expression\n                  | expression LT expression\n                  | expression LE expression\n                  | expression GT expression\n                  | expression GE expression\n                  | expression IN expression\n                  | expression AND expression\n                  | expression OR expressionexpression_list : expression\n                       | expression_list COMMA expressionempty :'
+    
+_lr_action_items = {'PROGRAM':([0,],[2,]),'$end':([1,8,],[0,-1,]),'ID':([2,9,18,19,21,22,23,24,41,42,43,44,45,46,49,50,54,60,61,72,73,74,75,76,81,83,84,98,102,103,104,107,108,109,112,113,114,115,116,118,123,130,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,153,154,156,157,158,162,163,165,166,178,181,183,199,200,208,233,234,242,244,245,246,247,248,249,251,252,257,260,261,265,266,267,274,275,278,281,282,287,291,298,299,300,319,320,],[3,40,53,57,64,65,67,40,82,90,82,40,82,96,40,53,57,64,-30,40,82,82,127,82,82,82,82,40,-15,-17,82,-21,-23,167,-29,167,193,-32,64,64,40,40,82,82,82,82,82,82,82,82,82,82,82,82,82,82,82,82,82,82,82,40,82,238,40,96,-14,-16,-20,-22,167,64,64,64,64,82,82,238,238,238,64,-64,167,167,-31,64,167,40,82,82,-110,40,238,-63,293,167,167,167,-109,238,40,40,167,64,64,]),'SEMI':([3,9,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,40,44,49,51,52,55,56,58,59,63,69,70,71,72,78,79,82,85,86,87,88,89,92,97,98,99,100,101,105,106,117,119,120,121,122,123,124,125,127,130,151,153,155,157,159,160,161,164,167,168,169,170,171,172,173,174,175,176,177,179,186,187,188,189,190,191,192,195,197,204,205,206,207,209,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,231,232,235,238,239,241,255,257,258,259,262,263,264,266,270,271,273,276,277,279,280,284,288,292,294,295,296,297,298,299,305,306,307,309,313,315,321,],[4,-149,-149,72,-79,-83,-84,-85,-86,-87,-88,-89,-90,-91,-92,-93,-94,-100,-149,-149,102,103,107,108,110,-27,115,72,-2,123,-149,-124,-125,-98,-119,-120,-121,-122,-123,72,-117,-149,72,162,163,165,166,201,203,-81,123,-4,-149,-78,-95,-97,-149,-130,-149,123,-149,-118,123,-3,-18,-48,-24,-37,-38,-39,-40,-41,-42,-43,-44,-45,-47,-57,-58,-59,-60,-61,-26,249,251,-74,-82,-80,-96,-99,-102,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,-105,-106,265,-62,-114,-46,283,-149,-126,-127,-107,-108,287,-149,-50,-51,-53,-54,-55,-73,-75,-101,-111,-52,303,-76,-77,304,-149,-149,-103,-104,-49,311,316,318,-68,]),'BEGIN':([4,6,7,9,10,11,12,13,14,15,16,17,24,44,49,50,54,60,61,66,68,72,98,102,103,107,108,110,112,115,123,130,153,157,162,163,165,166,201,203,249,257,266,283,298,299,303,304,311,],[-149,9,-6,24,49,-5,-7,-8,-9,-10,-11,-12,24,24,24,-13,-19,-28,-30,-149,-149,24,24,-15,-17,-21,-23,-25,-29,-32,24,24,24,24,-14,-16,-20,-22,-34,-36,-31,24,24,-149,24,24,-149,-35,-33,]),'error':([4,6,7,9,11,12,13,14,15,16,17,18,19,21,22,23,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,40,44,49,50,54,60,61,66,68,69,72,78,79,82,85,86,87,88,89,92,97,98,99,102,103,107,108,110,112,115,120,123,124,125,127,130,151,153,157,159,162,163,165,166,183,201,203,204,205,206,207,209,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,231,232,239,245,246,249,257,258,259,262,263,266,274,283,284,288,298,299,303,304,305,306,311,319,320,],[-149,10,-6,-149,-5,-7,-8,-9,-10,-11,-12,52,56,63,66,68,-149,71,-79,-83,-84,-85,-86,-87,-88,-89,-90,-91,-92,-93,-94,-100,-149,-149,101,106,63,-30,-149,-149,121,-149,-124,-125,-98,-119,-120,-121,-122,-123,155,-117,-149,160,-15,-17,-21,-23,-25,-29,-32,-81,-149,-78,-95,-97,-149,-130,-149,-149,-118,-14,-16,-20,-22,63,-34,-36,-82,-80,-96,-99,-102,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,-105,-106,-114,63,-64,-31,-149,-126,-127,-107,-108,-149,-63,-149,-101,160,-149,-149,-149,-35,-103,-104,-33,63,63,]),'CONST':([4,6,7,11,12,13,14,15,16,17,50,54,60,61,66,68,102,103,107,108,110,112,115,116,118,162,163,165,166,201,203,249,251,283,303,304,311,],[-149,18,-6,-5,-7,-8,-9,-10,-11,-12,-13,-19,-28,-30,-149,-149,-15,-17,-21,-23,-25,-29,-32,200,200,-14,-16,-20,-22,-34,-36,-31,200,-149,-149,-35,-33,]),'TYPE':([4,6,7,11,12,13,14,15,16,17,50,54,60,61,66,68,102,103,107,108,110,112,115,162,163,165,166,201,203,249,283,303,304,311,],[-149,19,-6,-5,-7,-8,-9,-10,-11,-12,-13,-19,-28,-30,-149,-149,-15,-17,-21,-23,-25,-29,-32,-14,-16,-20,-22,-34,-36,-31,-149,-149,-35,-33,]),'LABEL':([4,6,7,11,12,13,14,15,16,17,50,54,60,61,66,68,102,103,107,108,110,112,115,162,163,165,166,201,203,249,283,303,304,311,],[-149,20,-6,-5,-7,-8,-9,-10,-11,-12,-13,-19,-28,-30,-149,-149,-15,-17,-21,-23,-25,-29,-32,-14,-16,-20,-22,-34,-36,-31,-149,-149,-35,-33,]),'VAR':([4,6,7,11,12,13,14,15,16,17,50,54,60,61,66,68,102,103,107,108,110,112,115,116,118,162,163,165,166,201,203,249,251,283,303,304,311,],[-149,21,-6,-5,-7,-8,-9,-10,-11,-12,-13,-19,-28,-30,-149,-149,-15,-17,-21,-23,-25,-29,-32,199,199,-14,-16,-20,-22,-34,-36,-31,199,-149,-149,-35,-33,]),'FUNCTION':([4,6,7,11,12,13,14,15,16,17,50,54,60,61,66,68,102,103,107,108,110,112,115,162,163,165,166,201,203,249,283,303,304,311,],[-149,22,-6,-5,-7,-8,-9,-10,-11,-12,-13,-19,-28,-30,-149,-149,-15,-17,-21,-23,-25,-29,-32,-14,-16,-20,-22,-34,-36,-31,-149,-149,-35,-33,]),'PROCEDURE':([4,6,7,11,12,13,14,15,16,17,50,54,60,61,66,68,102,103,107,108,110,112,115,162,163,165,166,201,203,249,283,303,304,311,],[-149,23,-6,-5,-7,-8,-9,-10,-11,-12,-13,-19,-28,-30,-149,-149,-15,-17,-21,-23,-25,-29,-32,-14,-16,-20,-22,-34,-36,-31,-149,-149,-35,-33,]),'DOT':([5,39,40,70,78,82,95,96,122,127,161,206,240,],[8,75,-98,-2,75,-98,75,-98,-4,-97,-3,-96,75,]),'IF':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[41,41,41,41,41,41,41,41,41,41,41,41,41,41,]),'FOR':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[42,42,42,42,42,42,42,42,42,42,42,42,42,42,]),'WHILE':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[43,43,43,43,43,43,43,43,43,43,43,43,43,43,]),'REPEAT':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[44,44,44,44,44,44,44,44,44,44,44,44,44,44,]),'CASE':([9,24,44,49,72,98,115,123,130,153,157,245,246,249,257,266,274,298,299,],[45,45,45,45,45,45,-32,45,45,45,45,275,-64,-31,45,45,-63,45,45,]),'WITH':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[46,46,46,46,46,46,46,46,46,46,46,46,46,46,]),'GOTO':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[47,47,47,47,47,47,47,47,47,47,47,47,47,47,]),'INTEGER':([9,20,24,41,43,44,45,47,49,72,73,74,76,81,83,84,98,104,109,111,113,123,130,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,153,154,156,157,178,208,233,234,242,244,247,248,252,257,260,261,265,266,267,278,281,282,287,291,298,299,300,310,312,316,318,],[48,59,48,85,85,48,85,97,48,48,85,85,85,85,85,85,48,85,186,191,186,48,48,85,85,85,85,85,85,85,85,85,85,85,85,85,85,85,85,85,85,85,48,85,186,48,186,85,85,186,186,186,186,186,186,48,85,85,-110,48,186,186,186,186,-109,186,48,48,186,85,85,-67,-66,]),'END':([9,24,25,26,27,28,29,30,31,32,33,34,35,36,37,38,40,49,69,71,72,78,79,82,85,86,87,88,89,97,98,99,115,120,121,123,124,125,127,130,151,153,157,159,204,205,206,207,209,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,231,232,234,239,245,246,249,257,258,259,262,263,265,272,274,284,287,298,299,305,306,312,316,318,],[-149,-149,70,-79,-83,-84,-85,-86,-87,-88,-89,-90,-91,-92,-93,-94,-100,-149,120,122,-149,-124,-125,-98,-119,-120,-121,-122,-123,-117,-149,161,-32,-81,204,-149,-78,-95,-97,-149,-130,-149,-149,-118,-82,-80,-96,-99,-102,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,-105,-106,263,-114,273,-64,-31,-149,-126,-127,-107,-108,-110,292,-63,-101,-109,-149,-149,-103,-104,-65,-67,-66,]),'UNTIL':([26,27,28,29,30,31,32,33,34,35,36,37,38,40,44,72,78,79,82,85,86,87,88,89,92,97,98,120,123,124,125,127,130,151,153,155,157,159,204,205,206,207,209,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,231,232,239,257,258,259,262,263,284,298,299,305,306,],[-79,-83,-84,-85,-86,-87,-88,-89,-90,-91,-92,-93,-94,-100,-149,-149,-124,-125,-98,-119,-120,-121,-122,-123,154,-117,-149,-81,-149,-78,-95,-97,-149,-130,-149,233,-149,-118,-82,-80,-96,-99,-102,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,-105,-106,-114,-149,-126,-127,-107,-108,-101,-149,-149,-103,-104,]),'ELSE':([27,28,29,30,31,32,33,34,35,36,37,38,40,78,79,82,85,86,87,88,89,97,98,120,125,127,130,151,153,157,159,204,206,207,209,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,231,232,239,257,258,259,262,263,284,298,299,305,306,],[-83,-84,-85,-86,-87,-88,-89,-90,-91,-92,-93,-94,-100,-124,-125,-98,-119,-120,-121,-122,-123,-117,-149,-81,-95,-97,-149,-130,-149,-149,-118,-82,-96,-99,257,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,-105,-106,-114,-149,-126,-127,-107,-108,-101,-149,-149,-103,-104,]),'ASSIGN':([39,40,90,127,206,],[73,-98,152,-97,-96,]),'LBRACKET':([39,40,41,43,45,73,74,76,78,81,82,83,84,95,96,104,127,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,154,180,206,208,233,240,260,261,],[74,-98,83,83,83,83,83,83,74,83,-98,83,83,74,-98,83,-97,83,83,83,83,83,83,83,83,83,83,83,83,83,83,83,83,83,83,83,83,242,-96,83,83,74,83,83,]),'LPAREN':([40,41,43,45,65,67,73,74,76,80,81,82,83,84,104,109,113,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,154,178,208,233,247,248,252,260,261,278,281,282,300,317,],[76,81,81,81,116,118,81,81,81,147,81,149,81,81,81,181,181,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,81,181,81,81,181,181,181,81,81,181,181,181,181,319,]),'TIPO':([41,43,45,73,74,76,81,83,84,104,109,113,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,154,178,208,233,247,248,252,260,261,278,281,282,300,302,],[80,80,80,80,80,80,80,80,80,80,179,179,80,80,80,80,80,80,80,80,80,80,80,80,80,80,80,80,80,80,80,80,179,80,80,179,179,179,80,80,179,179,179,179,308,]),'NOT':([41,43,45,73,74,76,81,83,84,104,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,154,208,233,260,261,],[84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,84,]),'REAL':([41,43,45,73,74,76,81,83,84,104,109,113,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,154,156,178,208,233,234,242,244,247,248,252,260,261,265,267,278,281,282,287,291,300,310,312,316,318,],[86,86,86,86,86,86,86,86,86,86,187,187,86,86,86,86,86,86,86,86,86,86,86,86,86,86,86,86,86,86,86,86,187,187,86,86,187,187,187,187,187,187,86,86,-110,187,187,187,187,-109,187,187,86,86,-67,-66,]),'BOOLEAN':([41,43,45,73,74,76,81,83,84,104,109,113,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,154,156,178,208,233,234,242,244,247,248,252,260,261,265,267,278,281,282,287,291,300,310,312,316,318,],[87,87,87,87,87,87,87,87,87,87,188,188,87,87,87,87,87,87,87,87,87,87,87,87,87,87,87,87,87,87,87,87,188,188,87,87,188,188,188,188,188,188,87,87,-110,188,188,188,188,-109,188,188,87,87,-67,-66,]),'CHAR':([41,43,45,73,74,76,81,83,84,104,109,113,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,154,156,178,208,233,234,242,244,247,248,252,260,261,265,267,278,281,282,287,291,300,310,312,316,318,],[88,88,88,88,88,88,88,88,88,88,189,189,88,88,88,88,88,88,88,88,88,88,88,88,88,88,88,88,88,88,88,88,189,189,88,88,189,189,189,189,189,189,88,88,-110,189,189,189,189,-109,189,189,88,88,-67,-66,]),'TEXTO':([41,43,45,73,74,76,81,83,84,104,109,113,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,154,156,178,208,233,234,242,244,247,248,252,260,261,265,267,278,281,282,287,291,300,310,312,316,318,],[89,89,89,89,89,89,89,89,89,89,190,190,89,89,89,89,89,89,89,89,89,89,89,89,89,89,89,89,89,89,89,89,190,190,89,89,190,190,190,190,190,190,89,89,-110,190,190,190,190,-109,190,190,89,89,-67,-66,]),'COLON':([48,62,64,77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,186,187,188,189,190,193,198,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,236,237,238,250,253,254,256,258,259,262,285,286,289,293,314,],[98,113,-69,131,-124,-125,-98,-119,-120,-121,-122,-123,131,131,131,131,-97,131,131,131,131,-57,-58,-59,-60,-61,-70,252,-96,-131,131,131,131,131,131,131,131,131,131,131,131,131,131,131,131,-128,-129,131,131,266,-112,-62,278,281,282,131,-126,-127,131,131,131,-113,302,317,]),'EQ':([53,57,77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[104,109,138,-124,-125,-98,-119,-120,-121,-122,-123,138,138,138,138,-97,138,138,138,138,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,138,138,-128,-129,138,138,138,-126,-127,138,138,138,]),'COMMA':([58,59,62,64,78,79,82,85,86,87,88,89,94,95,96,127,128,129,150,151,186,187,188,189,190,191,193,198,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,226,227,228,229,236,237,238,240,243,253,254,256,258,259,289,],[111,-27,114,-69,-124,-125,-98,-119,-120,-121,-122,-123,158,-115,-98,-97,208,-147,208,-130,-57,-58,-59,-60,-61,-26,-70,114,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,208,-128,208,-129,267,-112,-62,-116,114,114,114,-148,-126,-127,-113,]),'RPAREN':([64,78,79,82,85,86,87,88,89,115,116,118,127,128,129,148,151,167,169,170,171,172,173,174,175,176,177,179,186,187,188,189,190,193,194,195,196,197,202,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,226,227,228,229,238,241,243,246,249,256,258,259,270,271,273,274,276,277,279,280,292,295,296,307,320,],[-69,-124,-125,-98,-119,-120,-121,-122,-123,-32,-149,-149,-97,207,-147,227,-130,-48,-37,-38,-39,-40,-41,-42,-43,-44,-45,-47,-57,-58,-59,-60,-61,-70,250,-71,-72,-74,255,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,258,-128,259,-129,-62,-46,270,-64,-31,-148,-126,-127,-50,-51,-53,-63,-54,-55,-73,-75,-52,-76,-77,-49,321,]),'THEN':([77,78,79,82,85,86,87,88,89,127,151,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,258,259,],[130,-124,-125,-98,-119,-120,-121,-122,-123,-97,-130,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,-126,-127,]),'PLUS':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[132,-124,-125,-98,-119,-120,-121,-122,-123,132,132,132,132,-97,132,132,132,132,-96,-131,-132,-133,-134,-135,-136,-137,132,132,132,132,132,132,132,132,132,-128,-129,132,132,132,-126,-127,132,132,132,]),'MINUS':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[133,-124,-125,-98,-119,-120,-121,-122,-123,133,133,133,133,-97,133,133,133,133,-96,-131,-132,-133,-134,-135,-136,-137,133,133,133,133,133,133,133,133,133,-128,-129,133,133,133,-126,-127,133,133,133,]),'TIMES':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[134,-124,-125,-98,-119,-120,-121,-122,-123,134,134,134,134,-97,134,134,134,134,-96,-131,134,134,-134,-135,-136,-137,134,134,134,134,134,134,134,134,134,-128,-129,134,134,134,-126,-127,134,134,134,]),'DIVIDE':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[135,-124,-125,-98,-119,-120,-121,-122,-123,135,135,135,135,-97,135,135,135,135,-96,-131,135,135,-134,-135,-136,-137,135,135,135,135,135,135,135,135,135,-128,-129,135,135,135,-126,-127,135,135,135,]),'DIV':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[136,-124,-125,-98,-119,-120,-121,-122,-123,136,136,136,136,-97,136,136,136,136,-96,-131,136,136,-134,-135,-136,-137,136,136,136,136,136,136,136,136,136,-128,-129,136,136,136,-126,-127,136,136,136,]),'MOD':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[137,-124,-125,-98,-119,-120,-121,-122,-123,137,137,137,137,-97,137,137,137,137,-96,-131,137,137,-134,-135,-136,-137,137,137,137,137,137,137,137,137,137,-128,-129,137,137,137,-126,-127,137,137,137,]),'NE':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[139,-124,-125,-98,-119,-120,-121,-122,-123,139,139,139,139,-97,139,139,139,139,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,139,139,-128,-129,139,139,139,-126,-127,139,139,139,]),'LT':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[140,-124,-125,-98,-119,-120,-121,-122,-123,140,140,140,140,-97,140,140,140,140,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,140,140,-128,-129,140,140,140,-126,-127,140,140,140,]),'LE':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[141,-124,-125,-98,-119,-120,-121,-122,-123,141,141,141,141,-97,141,141,141,141,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,141,141,-128,-129,141,141,141,-126,-127,141,141,141,]),'GT':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[142,-124,-125,-98,-119,-120,-121,-122,-123,142,142,142,142,-97,142,142,142,142,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,142,142,-128,-129,142,142,142,-126,-127,142,142,142,]),'GE':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[143,-124,-125,-98,-119,-120,-121,-122,-123,143,143,143,143,-97,143,143,143,143,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,143,143,-128,-129,143,143,143,-126,-127,143,143,143,]),'IN':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[144,-124,-125,-98,-119,-120,-121,-122,-123,144,144,144,144,-97,144,144,144,144,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,144,144,-128,-129,144,144,144,-126,-127,144,144,144,]),'AND':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[145,-124,-125,-98,-119,-120,-121,-122,-123,145,145,145,145,-97,145,145,-130,145,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,145,-128,-129,145,145,145,-126,-127,145,145,145,]),'OR':([77,78,79,82,85,86,87,88,89,91,93,125,126,127,129,148,151,164,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,232,256,258,259,262,285,286,],[146,-124,-125,-98,-119,-120,-121,-122,-123,146,146,146,146,-97,146,146,-130,146,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,146,146,146,-126,-127,146,146,146,]),'DO':([78,79,82,85,86,87,88,89,91,94,95,96,127,151,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,240,258,259,285,286,],[-124,-125,-98,-119,-120,-121,-122,-123,153,157,-115,-98,-97,-130,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,-116,-126,-127,298,299,]),'OF':([78,79,82,85,86,87,88,89,93,127,151,184,185,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,258,259,290,308,],[-124,-125,-98,-119,-120,-121,-122,-123,156,-97,-130,247,248,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,-126,-127,300,310,]),'RBRACKET':([78,79,82,85,86,87,88,89,126,127,129,150,151,186,187,188,189,190,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,238,256,258,259,268,301,],[-124,-125,-98,-119,-120,-121,-122,-123,206,-97,-147,229,-130,-57,-58,-59,-60,-61,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,-62,-148,-126,-127,290,-56,]),'TO':([78,79,82,85,86,87,88,89,127,151,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,258,259,],[-124,-125,-98,-119,-120,-121,-122,-123,-97,-130,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,260,-126,-127,]),'DOWNTO':([78,79,82,85,86,87,88,89,127,151,206,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,227,229,230,258,259,],[-124,-125,-98,-119,-120,-121,-122,-123,-97,-130,-96,-131,-132,-133,-134,-135,-136,-137,-138,-139,-140,-141,-142,-143,-144,-145,-146,-128,-129,261,-126,-127,]),'PACKED':([109,113,178,247,248,252,278,281,282,300,],[178,178,178,178,178,178,178,178,178,178,]),'ARRAY':([109,113,178,247,248,252,278,281,282,300,],[180,180,180,180,180,180,180,180,180,180,]),'RECORD':([109,113,178,247,248,252,278,281,282,300,],[183,183,183,183,183,183,183,183,183,183,]),'SET':([109,113,178,247,248,252,278,281,282,300,],[184,184,184,184,184,184,184,184,184,184,]),'FILE':([109,113,178,247,248,252,278,281,282,300,],[185,185,185,185,185,185,185,185,185,185,]),'RANGE':([167,182,186,187,188,189,190,238,269,],[-62,244,-57,-58,-59,-60,-61,-62,291,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'program':([0,],[1,]),'block':([4,66,68,283,303,],[5,117,119,297,309,]),'declarations':([4,66,68,283,303,],[6,6,6,6,6,]),'empty':([4,9,24,44,49,66,68,72,98,116,118,123,130,153,157,257,266,283,298,299,303,],[7,38,38,38,38,7,7,38,38,196,196,38,38,38,38,38,38,7,38,38,7,]),'declaration':([6,],[11,]),'const_declaration':([6,],[12,]),'type_declaration':([6,],[13,]),'label_declaration':([6,],[14,]),'var_declaration':([6,],[15,]),'function_declaration':([6,],[16,]),'procedure_declaration':([6,],[17,]),'statement_list':([9,24,44,49,266,],[25,69,92,99,288,]),'statement':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[26,26,26,26,124,159,205,209,231,239,284,26,305,306,]),'assignment':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[27,27,27,27,27,27,27,27,27,27,27,27,27,27,]),'procedure_call':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[28,28,28,28,28,28,28,28,28,28,28,28,28,28,]),'if_statement':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[29,29,29,29,29,29,29,29,29,29,29,29,29,29,]),'for_statement':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[30,30,30,30,30,30,30,30,30,30,30,30,30,30,]),'while_statement':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[31,31,31,31,31,31,31,31,31,31,31,31,31,31,]),'repeat_statement':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[32,32,32,32,32,32,32,32,32,32,32,32,32,32,]),'case_statement':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[33,33,33,33,33,33,33,33,33,33,33,33,33,33,]),'with_statement':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[34,34,34,34,34,34,34,34,34,34,34,34,34,34,]),'goto_statement':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[35,35,35,35,35,35,35,35,35,35,35,35,35,35,]),'labeled_statement':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[36,36,36,36,36,36,36,36,36,36,36,36,36,36,]),'compound':([9,24,44,49,72,98,123,130,153,157,257,266,298,299,],[37,37,37,37,37,37,37,37,37,37,37,37,37,37,]),'variable':([9,24,41,43,44,45,46,49,72,73,74,76,81,83,84,98,104,123,130,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,153,154,157,158,208,233,257,260,261,266,298,299,],[39,39,78,78,39,78,95,39,39,78,78,78,78,78,78,39,78,39,39,78,78,78,78,78,78,78,78,78,78,78,78,78,78,78,78,78,78,78,39,78,39,240,78,78,39,78,78,39,39,39,]),'const_list':([18,],[50,]),'CONST_ITEM':([18,50,],[51,100,]),'type_list':([19,],[54,]),'type_item':([19,54,],[55,105,]),'label_list':([20,],[58,]),'var_list':([21,],[60,]),'var_item':([21,60,183,245,319,320,],[61,112,246,274,246,274,]),'ID_LIST':([21,60,116,118,181,183,199,200,245,251,319,320,],[62,62,198,198,243,62,253,254,62,198,62,62,]),'expression':([41,43,45,73,74,76,81,83,84,104,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,154,208,233,260,261,],[77,91,93,125,126,129,148,129,151,164,210,211,212,213,214,215,216,217,218,219,220,221,222,223,224,225,129,129,230,232,256,262,285,286,]),'constant':([41,43,45,73,74,76,81,83,84,104,131,132,133,134,135,136,137,138,139,140,141,142,143,144,145,146,147,149,152,154,208,233,260,261,310,312,],[79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,79,314,314,]),'variable_list':([46,],[94,]),'expression_list':([76,83,147,149,],[128,150,226,228,]),'type':([109,113,178,247,248,252,278,281,282,300,],[168,192,241,276,277,280,294,295,296,307,]),'packed_type':([109,113,178,247,248,252,278,281,282,300,],[169,169,169,169,169,169,169,169,169,169,]),'simple_type':([109,113,178,247,248,252,278,281,282,300,],[170,170,170,170,170,170,170,170,170,170,]),'id_type':([109,113,178,247,248,252,278,281,282,300,],[171,171,171,171,171,171,171,171,171,171,]),'array_type':([109,113,178,247,248,252,278,281,282,300,],[172,172,172,172,172,172,172,172,172,172,]),'enum_type':([109,113,178,247,248,252,278,281,282,300,],[173,173,173,173,173,173,173,173,173,173,]),'subrange_type':([109,113,178,247,248,252,278,281,282,300,],[174,174,174,174,174,174,174,174,174,174,]),'record_type':([109,113,178,247,248,252,278,281,282,300,],[175,175,175,175,175,175,175,175,175,175,]),'set_type':([109,113,178,247,248,252,278,281,282,300,],[176,176,176,176,176,176,176,176,176,176,]),'file_type':([109,113,178,247,248,252,278,281,282,300,],[177,177,177,177,177,177,177,177,177,177,]),'const_expr':([109,113,156,178,234,242,244,247,248,252,267,278,281,282,291,300,],[182,182,237,182,237,269,271,182,182,182,289,182,182,182,301,182,]),'params':([116,118,],[194,202,]),'param_list':([116,118,],[195,195,]),'param':([116,118,251,],[197,197,279,]),'case_list':([156,],[234,]),'case_item':([156,234,],[235,264,]),'constant_list':([156,234,],[236,236,]),'field_list':([183,319,],[245,320,]),'range':([242,],[268,]),'variant_part':([245,],[272,]),'variant_list':([310,],[312,]),'variant_item':([310,312,],[313,315,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> program","S'",1,None,None,None),
+  ('program -> PROGRAM ID SEMI block DOT','program',5,'p_program','ana_sin.py',46),
+  ('block -> declarations BEGIN statement_list END','block',4,'p_block','ana_sin.py',53),
+  ('block -> declarations error BEGIN statement_list END','block',5,'p_block_error','ana_sin.py',60),
+  ('block -> declarations BEGIN statement_list error END','block',5,'p_block_error','ana_sin.py',61),
+  ('declarations -> declarations declaration','declarations',2,'p_declarations','ana_sin.py',70),
+  ('declarations -> empty','declarations',1,'p_declarations','ana_sin.py',71),
+  ('declaration -> const_declaration','declaration',1,'p_declaration','ana_sin.py',83),
+  ('declaration -> type_declaration','declaration',1,'p_declaration','ana_sin.py',84),
+  ('declaration -> label_declaration','declaration',1,'p_declaration','ana_sin.py',85),
+  ('declaration -> var_declaration','declaration',1,'p_declaration','ana_sin.py',86),
+  ('declaration -> function_declaration','declaration',1,'p_declaration','ana_sin.py',87),
+  ('declaration -> procedure_declaration','declaration',1,'p_declaration','ana_sin.py',88),
+  ('const_declaration -> CONST const_list','const_declaration',2,'p_const_declaration','ana_sin.py',96),
+  ('const_list -> const_list CONST_ITEM SEMI','const_list',3,'p_const_list','ana_sin.py',101),
+  ('const_list -> CONST_ITEM SEMI','const_list',2,'p_const_list','ana_sin.py',102),
+  ('const_list -> const_list error SEMI','const_list',3,'p_const_list_error','ana_sin.py',112),
+  ('const_list -> error SEMI','const_list',2,'p_const_list_error','ana_sin.py',113),
+  ('CONST_ITEM -> ID EQ expression','CONST_ITEM',3,'p_CONST_ITEM','ana_sin.py',118),
+  ('type_declaration -> TYPE type_list','type_declaration',2,'p_type_declaration','ana_sin.py',126),
+  ('type_list -> type_list type_item SEMI','type_list',3,'p_type_list','ana_sin.py',132),
+  ('type_list -> type_item SEMI','type_list',2,'p_type_list','ana_sin.py',133),
+  ('type_list -> type_list error SEMI','type_list',3,'p_type_list_error','ana_sin.py',142),
+  ('type_list -> error SEMI','type_list',2,'p_type_list_error','ana_sin.py',143),
+  ('type_item -> ID EQ type','type_item',3,'p_type_item','ana_sin.py',148),
+  ('label_declaration -> LABEL label_list SEMI','label_declaration',3,'p_label_declaration','ana_sin.py',157),
+  ('label_list -> label_list COMMA INTEGER','label_list',3,'p_label_list','ana_sin.py',163),
+  ('label_list -> INTEGER','label_list',1,'p_label_list','ana_sin.py',164),
+  ('var_declaration -> VAR var_list','var_declaration',2,'p_var_declaration','ana_sin.py',177),
+  ('var_list -> var_list var_item','var_list',2,'p_var_list','ana_sin.py',182),
+  ('var_list -> var_item','var_list',1,'p_var_list','ana_sin.py',183),
+  ('var_item -> ID_LIST COLON type SEMI','var_item',4,'p_var_item','ana_sin.py',193),
+  ('var_item -> error SEMI','var_item',2,'p_var_item_error','ana_sin.py',199),
+  ('function_declaration -> FUNCTION ID LPAREN params RPAREN COLON type SEMI block SEMI','function_declaration',10,'p_function_declaration','ana_sin.py',207),
+  ('function_declaration -> FUNCTION error block SEMI','function_declaration',4,'p_function_declaration_error','ana_sin.py',212),
+  ('procedure_declaration -> PROCEDURE ID LPAREN params RPAREN SEMI block SEMI','procedure_declaration',8,'p_procedure_declaration','ana_sin.py',220),
+  ('procedure_declaration -> PROCEDURE error block SEMI','procedure_declaration',4,'p_procedure_declaration_error','ana_sin.py',225),
+  ('type -> packed_type','type',1,'p_type','ana_sin.py',233),
+  ('type -> simple_type','type',1,'p_type','ana_sin.py',234),
+  ('type -> id_type','type',1,'p_type','ana_sin.py',235),
+  ('type -> array_type','type',1,'p_type','ana_sin.py',236),
+  ('type -> enum_type','type',1,'p_type','ana_sin.py',237),
+  ('type -> subrange_type','type',1,'p_type','ana_sin.py',238),
+  ('type -> record_type','type',1,'p_type','ana_sin.py',239),
+  ('type -> set_type','type',1,'p_type','ana_sin.py',240),
+  ('type -> file_type','type',1,'p_type','ana_sin.py',241),
+  ('packed_type -> PACKED type','packed_type',2,'p_packed_type','ana_sin.py',246),
+  ('simple_type -> TIPO','simple_type',1,'p_simple_type','ana_sin.py',251),
+  ('id_type -> ID','id_type',1,'p_id_type','ana_sin.py',256),
+  ('array_type -> ARRAY LBRACKET range RBRACKET OF type','array_type',6,'p_array_type_range','ana_sin.py',261),
+  ('enum_type -> LPAREN ID_LIST RPAREN','enum_type',3,'p_enum_type','ana_sin.py',268),
+  ('subrange_type -> const_expr RANGE const_expr','subrange_type',3,'p_subrange_type','ana_sin.py',274),
+  ('record_type -> RECORD field_list variant_part END','record_type',4,'p_record_type','ana_sin.py',287),
+  ('record_type -> RECORD field_list END','record_type',3,'p_record_type','ana_sin.py',288),
+  ('set_type -> SET OF type','set_type',3,'p_set_type','ana_sin.py',297),
+  ('file_type -> FILE OF type','file_type',3,'p_file_type','ana_sin.py',303),
+  ('range -> const_expr RANGE const_expr','range',3,'p_range','ana_sin.py',313),
+  ('const_expr -> INTEGER','const_expr',1,'p_const_expr','ana_sin.py',319),
+  ('const_expr -> REAL','const_expr',1,'p_const_expr','ana_sin.py',320),
+  ('const_expr -> BOOLEAN','const_expr',1,'p_const_expr','ana_sin.py',321),
+  ('const_expr -> CHAR','const_expr',1,'p_const_expr','ana_sin.py',322),
+  ('const_expr -> TEXTO','const_expr',1,'p_const_expr','ana_sin.py',323),
+  ('const_expr -> ID','const_expr',1,'p_const_expr','ana_sin.py',324),
+  ('field_list -> field_list var_item','field_list',2,'p_field_list','ana_sin.py',332),
+  ('field_list -> var_item','field_list',1,'p_field_list','ana_sin.py',333),
+  ('variant_part -> CASE ID COLON TIPO OF variant_list','variant_part',6,'p_variant_part','ana_sin.py',346),
+  ('variant_list -> variant_list variant_item SEMI','variant_list',3,'p_variant_list','ana_sin.py',352),
+  ('variant_list -> variant_item SEMI','variant_list',2,'p_variant_list','ana_sin.py',353),
+  ('variant_item -> constant COLON LPAREN field_list RPAREN','variant_item',5,'p_variant_item','ana_sin.py',364),
+  ('ID_LIST -> ID','ID_LIST',1,'p_ID_LIST','ana_sin.py',371),
+  ('ID_LIST -> ID_LIST COMMA ID','ID_LIST',3,'p_ID_LIST','ana_sin.py',372),
+  ('params -> param_list','params',1,'p_params','ana_sin.py',384),
+  ('params -> empty','params',1,'p_params','ana_sin.py',385),
+  ('param_list -> param_list SEMI param','param_list',3,'p_param_list','ana_sin.py',391),
+  ('param_list -> param','param_list',1,'p_param_list','ana_sin.py',392),
+  ('param -> ID_LIST COLON type','param',3,'p_param','ana_sin.py',405),
+  ('param -> VAR ID_LIST COLON type','param',4,'p_param','ana_sin.py',406),
+  ('param -> CONST ID_LIST COLON type','param',4,'p_param','ana_sin.py',407),
+  ('statement_list -> statement_list SEMI statement','statement_list',3,'p_statement_list','ana_sin.py',420),
+  ('statement_list -> statement','statement_list',1,'p_statement_list','ana_sin.py',421),
+  ('statement_list -> statement_list error SEMI statement','statement_list',4,'p_statement_list_error','ana_sin.py',438),
+  ('compound -> BEGIN statement_list END','compound',3,'p_compound','ana_sin.py',446),
+  ('compound -> BEGIN statement_list error END','compound',4,'p_compound_error','ana_sin.py',451),
+  ('statement -> assignment','statement',1,'p_statement','ana_sin.py',459),
+  ('statement -> procedure_call','statement',1,'p_statement','ana_sin.py',460),
+  ('statement -> if_statement','statement',1,'p_statement','ana_sin.py',461),
+  ('statement -> for_statement','statement',1,'p_statement','ana_sin.py',462),
+  ('statement -> while_statement','statement',1,'p_statement','ana_sin.py',463),
+  ('statement -> repeat_statement','statement',1,'p_statement','ana_sin.py',464),
+  ('statement -> case_statement','statement',1,'p_statement','ana_sin.py',465),
+  ('statement -> with_statement','statement',1,'p_statement','ana_sin.py',466),
+  ('statement -> goto_statement','statement',1,'p_statement','ana_sin.py',467),
+  ('statement -> labeled_statement','statement',1,'p_statement','ana_sin.py',468),
+  ('statement -> compound','statement',1,'p_statement','ana_sin.py',469),
+  ('statement -> empty','statement',1,'p_statement','ana_sin.py',470),
+  ('assignment -> variable ASSIGN expression','assignment',3,'p_assignment','ana_sin.py',478),
+  ('variable -> variable LBRACKET expression RBRACKET','variable',4,'p_variable','ana_sin.py',488),
+  ('variable -> variable DOT ID','variable',3,'p_variable','ana_sin.py',489),
+  ('variable -> ID','variable',1,'p_variable','ana_sin.py',490),
+  ('procedure_call -> ID LPAREN expression_list RPAREN','procedure_call',4,'p_procedure_call','ana_sin.py',503),
+  ('procedure_call -> ID','procedure_call',1,'p_procedure_call','ana_sin.py',504),
+  ('if_statement -> IF expression THEN statement ELSE statement','if_statement',6,'p_if_statement','ana_sin.py',515),
+  ('if_statement -> IF expression THEN statement','if_statement',4,'p_if_statement','ana_sin.py',516),
+  ('for_statement -> FOR ID ASSIGN expression TO expression DO statement','for_statement',8,'p_for_statement','ana_sin.py',527),
+  ('for_statement -> FOR ID ASSIGN expression DOWNTO expression DO statement','for_statement',8,'p_for_statement','ana_sin.py',528),
+  ('while_statement -> WHILE expression DO statement','while_statement',4,'p_while_statement','ana_sin.py',537),
+  ('repeat_statement -> REPEAT statement_list UNTIL expression','repeat_statement',4,'p_repeat_statement','ana_sin.py',545),
+  ('repeat_statement -> REPEAT statement_list error UNTIL expression','repeat_statement',5,'p_repeat_statement_error','ana_sin.py',550),
+  ('case_statement -> CASE expression OF case_list END','case_statement',5,'p_case_statement','ana_sin.py',558),
+  ('case_list -> case_list case_item SEMI','case_list',3,'p_case_list','ana_sin.py',563),
+  ('case_list -> case_item SEMI','case_list',2,'p_case_list','ana_sin.py',564),
+  ('case_item -> constant_list COLON statement_list','case_item',3,'p_case_item','ana_sin.py',573),
+  ('constant_list -> const_expr','constant_list',1,'p_constant_list','ana_sin.py',578),
+  ('constant_list -> constant_list COMMA const_expr','constant_list',3,'p_constant_list','ana_sin.py',579),
+  ('with_statement -> WITH variable_list DO statement','with_statement',4,'p_with_statement','ana_sin.py',590),
+  ('variable_list -> variable','variable_list',1,'p_variable_list','ana_sin.py',595),
+  ('variable_list -> variable_list COMMA variable','variable_list',3,'p_variable_list','ana_sin.py',596),
+  ('goto_statement -> GOTO INTEGER','goto_statement',2,'p_goto_statement','ana_sin.py',608),
+  ('labeled_statement -> INTEGER COLON statement','labeled_statement',3,'p_labeled_statement','ana_sin.py',616),
+  ('constant -> INTEGER','constant',1,'p_constant','ana_sin.py',623),
+  ('constant -> REAL','constant',1,'p_constant','ana_sin.py',624),
+  ('constant -> BOOLEAN','constant',1,'p_constant','ana_sin.py',625),
+  ('constant -> CHAR','constant',1,'p_constant','ana_sin.py',626),
+  ('constant -> TEXTO','constant',1,'p_constant','ana_sin.py',627),
+  ('expression -> variable','expression',1,'p_expression','ana_sin.py',634),
+  ('expression -> constant','expression',1,'p_expression','ana_sin.py',635),
+  ('expression -> TIPO LPAREN expression_list RPAREN','expression',4,'p_expression','ana_sin.py',636),
+  ('expression -> ID LPAREN expression_list RPAREN','expression',4,'p_expression','ana_sin.py',637),
+  ('expression -> LPAREN expression RPAREN','expression',3,'p_expression','ana_sin.py',638),
+  ('expression -> LBRACKET expression_list RBRACKET','expression',3,'p_expression','ana_sin.py',639),
+  ('expression -> NOT expression','expression',2,'p_expression','ana_sin.py',640),
+  ('expression -> expression COLON expression','expression',3,'p_expression','ana_sin.py',641),
+  ('expression -> expression PLUS expression','expression',3,'p_expression','ana_sin.py',642),
+  ('expression -> expression MINUS expression','expression',3,'p_expression','ana_sin.py',643),
+  ('expression -> expression TIMES expression','expression',3,'p_expression','ana_sin.py',644),
+  ('expression -> expression DIVIDE expression','expression',3,'p_expression','ana_sin.py',645),
+  ('expression -> expression DIV expression','expression',3,'p_expression','ana_sin.py',646),
+  ('expression -> expression MOD expression','expression',3,'p_expression','ana_sin.py',647),
+  ('expression -> expression EQ expression','expression',3,'p_expression','ana_sin.py',648),
+  ('expression -> expression NE expression','expression',3,'p_expression','ana_sin.py',649),
+  ('expression -> expression LT expression','expression',3,'p_expression','ana_sin.py',650),
+  ('expression -> expression LE expression','expression',3,'p_expression','ana_sin.py',651),
+  ('expression -> expression GT expression','expression',3,'p_expression','ana_sin.py',652),
+  ('expression -> expression GE expression','expression',3,'p_expression','ana_sin.py',653),
+  ('expression -> expression IN expression','expression',3,'p_expression','ana_sin.py',654),
+  ('expression -> expression AND expression','expression',3,'p_expression','ana_sin.py',655),
+  ('expression -> expression OR expression','expression',3,'p_expression','ana_sin.py',656),
+  ('expression_list -> expression','expression_list',1,'p_expression_list','ana_sin.py',681),
+  ('expression_list -> expression_list COMMA expression','expression_list',3,'p_expression_list','ana_sin.py',682),
+  ('empty -> <empty>','empty',0,'p_empty','ana_sin.py',693),
+]
@@ -0,0 +1,368 @@
+# Otimização peephole do código EWVM gerado
+#
+# O CodeGenerator emite as instruções uma a uma, sem nunca as rever; ficam sequências como
+# 'JUMP L3' logo antes de 'L3:', 'PUSHI 0 / ADD' ou 'PUSHI 2 / PUSHI 1 / SUB' (o ajuste do
+# limite inferior de um array com índice constante). Este módulo reescreve o código (um
+# Codigo de instrucoes.py, com os opcodes e argumentos já separados) entre gen() e write()
+# com um conjunto de regras: cada Regra tem um padrão (os opcodes de uma janela de
+# instruções consecutivas) e uma função que devolve as instruções (op, arg) que substituem
+# a janela, ou None se não se aplica.
+#
+# Cada passagem percorre o código uma vez: cada instrução é acrescentada à saída e as
+# regras cujo padrão termina no seu opcode são testadas contra o fim da saída; quando uma
+# se aplica, a janela é substituída e o novo fim volta a ser testado (o resultado de uma
+# regra pode completar o padrão de outra). Como cada janela é testada quando a sua última
+# instrução entra na saída, as regras que só olham para a janela ficam no ponto fixo ao fim
+# de uma passagem. As que dependem do código todo (os rótulos usados e o destino final de
+# cada salto) usam um Contexto calculado no início da passagem; se uma reescrita o muda
+# (um rótulo deixa de ser usado, ou passa a ser seguido de outro JUMP), faz-se outra
+# passagem, até ao ponto fixo.
+#
+# O EWVM não tem uma instrução de incremento, por isso 'PUSHG k / PUSHI 1 / ADD /
+# STOREG k' já é a forma mais curta de k := k + 1.
+
+from collections import Counter
+from instrucoes import (Codigo, ROTULO, REFERENCIAS_ROTULO, PUSHI, STOREG, PUSHG, STOREL, PUSHL, DUP,
+                        ADD, SUB, MUL, DIV, MOD, EQUAL, INF, INFEQ, SUP, SUPEQ, JUMP, JZ, CHECK)
+
+# Saltos (a instrução JUMP ou JZ e o rótulo de destino)
+SALTOS = (JUMP, JZ)
+
+# Limites dos inteiros que se dobram
+MIN_INTEIRO = -2 ** 31
+MAX_INTEIRO = 2 ** 31 - 1
+
+# Número máximo de passagens do ponto fixo (cada passagem só pára se nada mudar)
+MAX_PASSAGENS = 20
+
+
+class Contexto:
+    """
+    Informação do código inteiro, calculada no início de cada passagem.
+    Atributos:
+        referencias (Counter): rótulo -> número de instruções que o referem (mais as
+            referências de fora do código, de 'externas', aos rótulos nele definidos).
+        saltos (dict): rótulo -> destino do JUMP que é a primeira instrução a seguir.
+        destinos (dict): rótulo -> rótulo onde um salto para ele acaba por ir parar
+            (seguindo os rótulos cuja primeira instrução é um JUMP, sem ciclos).
+    """
+    __slots__ = ('referencias', 'saltos', 'destinos')
+
+    def __init__(self, instrucoes, externas=None):
+        # instrucoes: pares (opcode, argumento)
+        self.referencias = Counter()
+        self.saltos = salto_seguinte = {}
+        pendentes = []
+        for op, arg in instrucoes:
+            if op == ROTULO:
+                pendentes.append(arg)
+                if externas and arg in externas:
+                    self.referencias[arg] += externas[arg]
+                continue
+            if op in REFERENCIAS_ROTULO:
+                self.referencias[arg] += 1
+            for rotulo in pendentes:
+                if op == JUMP:
+                    salto_seguinte[rotulo] = arg
+            pendentes = []
+        self.destinos = {}
+        for rotulo in salto_seguinte:
+            visitados = [rotulo]
+            atual = rotulo
+            while atual in salto_seguinte:
+                atual = salto_seguinte[atual]
+                if atual in visitados:
+                    # Ciclo de saltos (um ciclo infinito no programa): fica como está
+                    atual = rotulo
+                    break
+                visitados.append(atual)
+            if atual != rotulo:
+                self.destinos[rotulo] = atual
+
+
+def _casa_elemento(esperado, op):
+    # Se o opcode 'op' casa com um elemento de um padrão
+    if esperado is None:
+        return op != ROTULO
+    if type(esperado) is tuple:
+        return op in esperado
+    return op == esperado
+
+
+class Regra:
+    """
+    Regra de reescrita de uma janela de instruções.
+    Atributos:
+        nome (str): Nome usado nos contadores.
+        padrao (tuple): Um elemento por instrução da janela: um opcode, um tuplo de
+            opcodes, ou None (qualquer instrução que não seja um rótulo).
+        reescrever (callable): (lista de (opcode, argumento), Contexto) -> lista de pares
+            (opcode, argumento) que substituem a janela, ou None se a regra não se aplica.
+    """
+    __slots__ = ('nome', 'padrao', 'reescrever')
+
+    def __init__(self, nome, padrao, reescrever):
+        self.nome = nome
+        self.padrao = tuple(padrao)
+        self.reescrever = reescrever
+
+    def casa(self, ops):
+        # Se o fim da lista de opcodes 'ops' casa com o padrão
+        if len(ops) < len(self.padrao):
+            return False
+        for k in range(-1, -len(self.padrao) - 1, -1):
+            if not _casa_elemento(self.padrao[k], ops[k]):
+                return False
+        return True
+
+    def __repr__(self):
+        return f"Regra({self.nome!r}, {self.padrao!r})"
+
+
+# -------- regras --------
+
+def _inteiro(arg):
+    try:
+        return int(arg)
+    except (TypeError, ValueError):
+        return None
+
+
+def _salto_para_seguinte(janela, contexto):
+    # JUMP L / L:  ->  L:  (também com outro rótulo entre os dois, como num if sem else)
+    (_, destino), *rotulos = janela
+    if any(rotulo == destino for _, rotulo in rotulos):
+        return rotulos
+    return None
+
+
+def _codigo_morto(janela, contexto):
+    # Depois de um JUMP, uma instrução que não é um rótulo nunca é executada
+    (_, destino), _ = janela
+    return [(JUMP, destino)]
+
+
+def _rotulo_sem_uso(janela, contexto):
+    ((_, rotulo),) = janela
+    if contexto.referencias[rotulo] == 0:
+        return []
+    return None
+
+
+def _encadear_saltos(janela, contexto):
+    # JUMP/JZ L1, com L1: JUMP L2  ->  JUMP/JZ L2
+    ((op, destino),) = janela
+    final = contexto.destinos.get(destino)
+    if final is None:
+        return None
+    return [(op, final)]
+
+
+def _salto_condicional_constante(janela, contexto):
+    # PUSHI 0 / JZ L  ->  JUMP L;  PUSHI c / JZ L (c != 0)  ->  nada
+    (_, valor), (_, destino) = janela
+    valor = _inteiro(valor)
+    if valor is None:
+        return None
+    return [(JUMP, destino)] if valor == 0 else []
+
+
+_OPERACOES_INTEIRAS = {
+    ADD: lambda a, b: a + b,
+    SUB: lambda a, b: a - b,
+    MUL: lambda a, b: a * b,
+    DIV: lambda a, b: a // b if a >= 0 and b > 0 else None,
+    MOD: lambda a, b: a % b if a >= 0 and b > 0 else None,
+    EQUAL: lambda a, b: int(a == b),
+    INF: lambda a, b: int(a < b),
+    INFEQ: lambda a, b: int(a <= b),
+    SUP: lambda a, b: int(a > b),
+    SUPEQ: lambda a, b: int(a >= b),
+}
+
+
+def _dobrar_inteiros(janela, contexto):
+    # PUSHI a / PUSHI b / op  ->  PUSHI (a op b)
+    (_, a), (_, b), (op, _) = janela
+    a, b = _inteiro(a), _inteiro(b)
+    if a is None or b is None:
+        return None
+    valor = _OPERACOES_INTEIRAS[op](a, b)
+    if valor is None or not MIN_INTEIRO <= valor <= MAX_INTEIRO:
+        return None
+    return [(PUSHI, valor)]
+
+
+def _neutro_aritmetico(janela, contexto):
+    # PUSHI 0 / ADD|SUB e PUSHI 1 / MUL|DIV não alteram o valor no topo da pilha
+    (_, valor), (op, _) = janela
+    valor = _inteiro(valor)
+    if (op in (ADD, SUB) and valor == 0) or (op in (MUL, DIV) and valor == 1):
+        return []
+    return None
+
+
+def _indice_constante(janela, contexto):
+    # PUSHI k / CHECK a,b com a <= k <= b: a verificação nunca falha
+    (_, valor), (_, (inferior, superior)) = janela
+    valor = _inteiro(valor)
+    if valor is None or not inferior <= valor <= superior:
+        return None
+    return [(PUSHI, valor)]
+
+
+def _guardar_carregar(janela, contexto):
+    # STOREG n / PUSHG n  ->  DUP 1 / STOREG n (o valor já está na pilha; idem STOREL/PUSHL)
+    (op, guardado), (_, carregado) = janela
+    if guardado != carregado:
+        return None
+    return [(DUP, 1), (op, guardado)]
+
+
+REGRAS = (
+    Regra('salto_para_seguinte', (JUMP, ROTULO), _salto_para_seguinte),
+    Regra('salto_para_seguinte', (JUMP, ROTULO, ROTULO), _salto_para_seguinte),
+    Regra('codigo_morto', (JUMP, None), _codigo_morto),
+    Regra('rotulo_sem_uso', (ROTULO,), _rotulo_sem_uso),
+    Regra('encadear_saltos', (SALTOS,), _encadear_saltos),
+    Regra('salto_condicional_constante', (PUSHI, JZ), _salto_condicional_constante),
+    Regra('dobrar_inteiros', (PUSHI, PUSHI, tuple(_OPERACOES_INTEIRAS)), _dobrar_inteiros),
+    Regra('neutro_aritmetico', (PUSHI, (ADD, SUB, MUL, DIV)), _neutro_aritmetico),
+    Regra('indice_constante', (PUSHI, CHECK), _indice_constante),
+    Regra('guardar_carregar', (STOREG, PUSHG), _guardar_carregar),
+    Regra('guardar_carregar_local', (STOREL, PUSHL), _guardar_carregar),
+)
+
+# Nomes das regras, pela ordem (uma regra pode ter mais do que um padrão)
+NOMES_REGRAS = tuple(dict.fromkeys(regra.nome for regra in REGRAS))
+
+
+def escolher_regras(nomes):
+    """As regras de REGRAS com os nomes dados (ex.: para ativar só algumas)."""
+    desconhecidos = set(nomes) - set(NOMES_REGRAS)
+    if desconhecidos:
+        raise KeyError(f"Regras desconhecidas: {', '.join(sorted(desconhecidos))}")
+    return tuple(regra for regra in REGRAS if regra.nome in nomes)
+
+
+class OtimizadorPeephole:
+    """
+    Aplica as regras até ao ponto fixo. Uso:
+        opt = OtimizadorPeephole()              # ou OtimizadorPeephole(regras)
+        codigo = opt.otimizar(gen.code)         # novo Codigo
+        opt.contadores                          # nome da regra -> aplicações
+    'regras' é uma sequência de Regra (por omissão, REGRAS); a ordem define a prioridade
+    quando várias regras casam com o fim da saída.
+    """
+
+    def __init__(self, regras=None, max_passagens=MAX_PASSAGENS):
+        self.regras = tuple(REGRAS if regras is None else regras)
+        self.max_passagens = max_passagens
+        self.contadores = Counter()
+        self.passagens = 0
+        # (penúltimo opcode, último opcode) da saída -> regras cujo padrão pode casar,
+        # pela ordem de self.regras (calculado na primeira vez que o par aparece)
+        self._candidatas = {}
+
+    def _regras_para(self, par):
+        penultimo, ultimo = par
+        regras = []
+        for regra in self.regras:
+            padrao = regra.padrao
+            if not _casa_elemento(padrao[-1], ultimo):
+                continue
+            if len(padrao) > 1 and (penultimo is None or not _casa_elemento(padrao[-2], penultimo)):
+                continue
+            regras.append(regra)
+        self._candidatas[par] = regras
+        return regras
+
+    def otimizar(self, codigo, externas=None):
+        """Devolve um novo Codigo com as instruções de 'codigo' (um Codigo ou uma lista de
+        linhas do .vm) reescritas pelas regras. 'externas' (rótulo -> número) conta as
+        referências a rótulos feitas fora de 'codigo' (ver saida.py)."""
+        if not isinstance(codigo, Codigo):
+            codigo = Codigo.de_texto(codigo)
+        ops = list(codigo.ops)
+        args = list(codigo.args)
+        for _ in range(self.max_passagens):
+            self.passagens += 1
+            ops, args, repetir = self._passagem(ops, args, externas)
+            if not repetir:
+                break
+        return Codigo(ops, args)
+
+    def _passagem(self, ops, args, externas=None):
+        # Uma passagem: devolve as novas listas paralelas (opcode, argumento) e se é
+        # preciso outra passagem (se uma reescrita mudou o que o contexto descreve)
+        contexto = Contexto(zip(ops, args), externas)
+        referencias = contexto.referencias
+        candidatas = self._candidatas
+        contadores = self.contadores
+        saltos = contexto.saltos
+        s_ops, s_args = [], []
+        # Rótulos na saída (para saber se um rótulo que deixou de ser usado já lá está)
+        emitidos = Counter()
+        repetir = False
+        for k in range(len(ops)):
+            op = ops[k]
+            s_ops.append(op)
+            s_args.append(args[k])
+            if op == ROTULO:
+                emitidos[args[k]] += 1
+            if op == JUMP and len(s_ops) > 1 and s_ops[-2] == ROTULO and saltos.get(s_args[-2]) != args[k]:
+                repetir = True
+            par = (s_ops[-2] if len(s_ops) > 1 else None, op)
+            regras = candidatas.get(par)
+            if regras is None:
+                regras = self._regras_para(par)
+            while regras:
+                for regra in regras:
+                    n = len(regra.padrao)
+                    if n > 2 and not regra.casa(s_ops):
+                        continue
+                    janela = list(zip(s_ops[-n:], s_args[-n:]))
+                    novas = regra.reescrever(janela, contexto)
+                    if novas is None:
+                        continue
+                    # Mantém as referências aos rótulos exatas (para rotulo_sem_uso)
+                    sem_uso = []
+                    for o, a in janela:
+                        if o in REFERENCIAS_ROTULO:
+                            referencias[a] -= 1
+                            if not referencias[a]:
+                                sem_uso.append(a)
+                        elif o == ROTULO:
+                            emitidos[a] -= 1
+                    del s_ops[-n:], s_args[-n:]
+                    for o, a in novas:
+                        if o in REFERENCIAS_ROTULO:
+                            referencias[a] += 1
+                        elif o == ROTULO:
+                            emitidos[a] += 1
+                        s_ops.append(o)
+                        s_args.append(a)
+                        if o == JUMP and len(s_ops) > 1 and s_ops[-2] == ROTULO and saltos.get(s_args[-2]) != a:
+                            repetir = True
+                    contadores[regra.nome] += 1
+                    # Um rótulo sem uso que já está na saída, antes do fim (o fim volta a
+                    # ser testado), só é removido na próxima passagem
+                    for a in sem_uso:
+                        if emitidos[a] and not (s_ops and s_ops[-1] == ROTULO and s_args[-1] == a):
+                            repetir = True
+                    break
+                else:
+                    break
+                if not s_ops:
+                    break
+                par = (s_ops[-2] if len(s_ops) > 1 else None, s_ops[-1])
+                regras = candidatas.get(par)
+                if regras is None:
+                    regras = self._regras_para(par)
+        return s_ops, s_args, repetir
+
+
+def otimizar(codigo, regras=None):
+    """Devolve (Codigo otimizado, contadores por regra) para o código 'codigo'."""
+    opt = OtimizadorPeephole(regras)
+    return opt.otimizar(codigo), opt.contadores
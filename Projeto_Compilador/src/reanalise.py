@@ -0,0 +1,232 @@
+# Reanálise semântica incremental, por unidade do programa
+#
+# SemanticAnalyzer.analyze percorre sempre o programa inteiro. Aqui, o programa é dividido
+# em unidades — cada declaração do bloco principal (uma function/procedure, com as rotinas
+# que contém, ou um var/const/type/label) e, no fim, o corpo do programa — e, de cada
+# unidade analisada, guarda-se o que ela deixou no estado do analisador:
+# - os símbolos que definiu no scope global (e, numa rotina, o seu efeito: as variáveis
+#   exteriores que atribui em todos os caminhos);
+# - as operações que fez no grafo de fluxo do programa (declarações de variáveis globais
+#   e usos em expressões constantes);
+# - os resumos de fluxo das rotinas que fechou;
+# - os nomes que menciona (todas as strings da sua subárvore, em minúsculas): um
+#   superconjunto dos nomes globais de que o seu resultado depende.
+#
+# Numa nova versão da AST, as unidades são percorridas pela ordem do programa. Uma unidade
+# é reanalisada se o seu nó mudou ou se menciona um nome cuja definição mudou; as outras
+# são repostas a partir do que guardaram (símbolos, efeitos, operações e resumos), sem
+# visitar a subárvore. Uma rotina reanalisada só altera os seus dependentes se a sua
+# assinatura (parâmetros, retorno e efeito) mudou. Um var/const/type/label reanalisado
+# cria símbolos novos: todos os seus nomes contam como alterados e o corpo do programa é
+# sempre reanalisado (o grafo do programa recebe as suas declarações).
+#
+# O resultado (o SemanticError lançado, ou nenhum, e os resumos de fluxo) é o mesmo de uma
+# análise completa; como nesta, a análise pára na primeira unidade com erro e as
+# seguintes ficam por analisar.
+
+from ana_sem import SemanticAnalyzer, SemanticError
+from fluxo import GrafoFluxo, relatorio
+
+
+class _GrafoPrograma(GrafoFluxo):
+    """Grafo do programa principal que regista as operações feitas pelas declarações."""
+
+    def __init__(self, nome):
+        super().__init__(nome)
+        # (função de GrafoFluxo, argumentos), pela ordem; None deixa de registar
+        self.registo = []
+
+    def declarar(self, sym, inicializada=False):
+        if self.registo is not None:
+            self.registo.append((GrafoFluxo.declarar, (sym, inicializada)))
+        super().declarar(sym, inicializada)
+
+    def usar(self, sym, nome):
+        if self.registo is not None:
+            self.registo.append((GrafoFluxo.usar, (sym, nome)))
+        super().usar(sym, nome)
+
+    def definir(self, sym):
+        if self.registo is not None:
+            self.registo.append((GrafoFluxo.definir, (sym,)))
+        super().definir(sym)
+
+
+class Unidade:
+    """
+    Resultado guardado da análise de uma unidade do programa.
+    Atributos:
+        no (tuple): Nó da unidade na versão da AST em que foi analisada.
+        nomes (frozenset): Strings da subárvore, em minúsculas.
+        rotina (bool): Se a unidade é uma function/procedure.
+        definidos (list): (nome, Symbol) definidos no scope global, pela ordem.
+        efeitos (dict): Symbol da rotina -> variáveis exteriores que atribui.
+        operacoes (list): Operações feitas no grafo do programa.
+        resumos (list): ResumoFluxo das rotinas fechadas na unidade.
+    """
+    __slots__ = ('no', 'nomes', 'rotina', 'definidos', 'efeitos', 'operacoes', 'resumos')
+
+    def __init__(self, no, nomes, rotina):
+        self.no = no
+        self.nomes = nomes
+        self.rotina = rotina
+        self.definidos = []
+        self.efeitos = {}
+        self.operacoes = []
+        self.resumos = []
+
+    def assinatura(self, nome):
+        """O que os dependentes veem do símbolo global 'nome' definido por esta unidade."""
+        for n, sym in self.definidos:
+            if n == nome:
+                return (sym.kind, sym.type, getattr(sym, 'params', None),
+                        getattr(sym, 'return_type', None), self.efeitos.get(sym))
+        return None
+
+
+def nomes_mencionados(no):
+    """Todas as strings da subárvore 'no', em minúsculas."""
+    nomes = set()
+    pilha = [no]
+    while pilha:
+        atual = pilha.pop()
+        if type(atual) is str:
+            nomes.add(atual.lower())
+        elif isinstance(atual, (tuple, list)):
+            pilha.extend(atual)
+    return frozenset(nomes)
+
+
+class AnaliseIncremental:
+    """
+    Análise semântica que, de uma versão da AST para a seguinte, só reanalisa as unidades
+    alteradas e as que dependem delas. Uso:
+        inc = AnaliseIncremental()
+        inc.analisar(ast)                   # primeira análise (completa)
+        inc.analisar(ast2)                  # só o que mudou
+        inc.substituir('p', nova_decl)      # troca a declaração da rotina 'p' e reanalisa
+    analisar e substituir lançam o SemanticError que a análise completa lançaria.
+    """
+
+    def __init__(self):
+        self.ast = None
+        self.unidades = []
+        # Resumos de fluxo da última análise, como SemanticAnalyzer.fluxos
+        self.fluxos = []
+        # Índices das unidades visitadas na última análise (o corpo é len(declarações))
+        self.reanalisadas = []
+
+    def relatorio_fluxo(self):
+        return relatorio(self.fluxos)
+
+    def substituir(self, nome, decl):
+        """Substitui a declaração da function/procedure 'nome' do bloco principal por
+        'decl' e reanalisa o programa."""
+        _, nome_programa, (_, decls, comp) = self.ast
+        nl = nome.lower()
+        novas = list(decls)
+        for k, d in enumerate(novas):
+            if d and d[0] in ('function', 'procedure') and d[1].lower() == nl:
+                novas[k] = decl
+                break
+        else:
+            raise KeyError(f"Rotina '{nome}' não declarada no bloco principal")
+        self.analisar(('program', nome_programa, ('block', novas, comp)))
+
+    def analisar(self, ast):
+        """Analisa 'ast', reaproveitando as unidades da análise anterior que não mudaram."""
+        _, nome_programa, (_, decls, comp) = ast
+        decls = list(decls or ())
+        if self.ast is None or self.ast[1] != nome_programa:
+            self.unidades = []
+        self.ast = ast
+        antigas = self.unidades
+        self.unidades = novas = []
+        self.reanalisadas = []
+
+        analisador = SemanticAnalyzer()
+        grafo = analisador.fluxo = _GrafoPrograma(nome_programa)
+        escopo = analisador.global_scope
+        # Nomes globais cuja definição mudou nesta versão
+        alterados = set()
+        declaracoes_alteradas = False
+
+        for k, decl in enumerate(decls):
+            antiga = antigas[k] if k < len(antigas) else None
+            if antiga is not None and (antiga.no is decl or antiga.no == decl) and not (antiga.nomes & alterados):
+                # Repõe a unidade sem a visitar
+                for nome, sym in antiga.definidos:
+                    escopo.bind(nome, sym)
+                analisador.efeitos.update(antiga.efeitos)
+                for metodo, args in antiga.operacoes:
+                    if metodo is GrafoFluxo.declarar:
+                        analisador.variaveis.add(args[0])
+                    metodo(grafo, *args)
+                analisador.fluxos.extend(antiga.resumos)
+                novas.append(antiga)
+                continue
+
+            unidade = self._visitar(analisador, grafo, k, decl)
+            novas.append(unidade)
+            nomes = {n for n, _ in unidade.definidos}
+            if antiga is not None:
+                nomes.update(n for n, _ in antiga.definidos)
+            if unidade.rotina and (antiga is None or antiga.rotina):
+                # Uma rotina só afeta os dependentes se a assinatura ou o efeito mudou
+                alterados.update(n for n in nomes
+                                 if antiga is None or unidade.assinatura(n) != antiga.assinatura(n))
+            else:
+                alterados.update(nomes)
+                declaracoes_alteradas = True
+
+        # O corpo do programa: a última unidade
+        k = len(decls)
+        antiga = antigas[k] if k < len(antigas) else None
+        if (antiga is not None and not declaracoes_alteradas and (antiga.no is comp or antiga.no == comp)
+                and not (antiga.nomes & alterados)):
+            analisador.fluxos.extend(antiga.resumos)
+            novas.append(antiga)
+        else:
+            grafo.registo = None
+            unidade = Unidade(comp, nomes_mencionados(comp), False)
+            self.reanalisadas.append(k)
+            self._executar(analisador, self._visitar_corpo, analisador, comp)
+            unidade.resumos = analisador.fluxos[-1:]
+            novas.append(unidade)
+        self.fluxos = analisador.fluxos
+
+    def _visitar(self, analisador, grafo, k, decl):
+        # Analisa a declaração 'decl' e devolve a Unidade com o que ela deixou no estado
+        escopo = analisador.global_scope
+        definidos = len(escopo.symbols)
+        operacoes = len(grafo.registo)
+        fluxos = len(analisador.fluxos)
+        self.reanalisadas.append(k)
+        # Se a unidade falhar, a exceção sai daqui: self.unidades fica só com as unidades
+        # anteriores e as seguintes serão analisadas na próxima versão
+        self._executar(analisador, analisador.visit, decl)
+        unidade = Unidade(decl, nomes_mencionados(decl) if decl else frozenset(),
+                          bool(decl) and decl[0] in ('function', 'procedure'))
+        unidade.definidos = list(escopo.symbols.items())[definidos:]
+        unidade.efeitos = {sym: analisador.efeitos[sym] for _, sym in unidade.definidos if sym in analisador.efeitos}
+        unidade.operacoes = grafo.registo[operacoes:]
+        unidade.resumos = analisador.fluxos[fluxos:]
+        return unidade
+
+    @staticmethod
+    def _visitar_corpo(analisador, comp):
+        # Como o fim de SemanticAnalyzer.visit_program
+        analisador.visit(comp)
+        analisador._fechar_fluxo()
+
+    def _executar(self, analisador, funcao, *args):
+        # Como SemanticAnalyzer.analyze: num erro, os grafos ainda abertos são verificados
+        try:
+            funcao(*args)
+        except SemanticError:
+            self.fluxos = analisador.fluxos
+            analisador._verificar_pendentes()
+            raise
+        except Exception:
+            self.fluxos = analisador.fluxos
+            raise
@@ -0,0 +1,133 @@
+# Escrita contínua do código gerado
+#
+# O CodeGenerator guarda todas as instruções em self.code até ao write(), que produz o
+# texto do .vm de uma vez: a memória do código cresce com o programa inteiro. Em modo
+# contínuo (CodeGenerator(saida=SaidaContinua(ficheiro))), o gerador entrega as
+# instruções ao destino no fim de uma instrução do bloco principal ou de uma sub-rotina,
+# logo que tenha pelo menos bloco_minimo instruções, e recomeça com um Codigo vazio.
+# Nesses pontos nenhum salto atravessa a fronteira: os rótulos de um if/while/for só são
+# referidos dentro da própria instrução. O destino formata cada bloco e junta o texto num
+# buffer, que só vai para o ficheiro quando passa de tamanho_buffer caracteres. A memória
+# passa a depender de bloco_minimo e do maior bloco (uma instrução de topo ou uma
+# sub-rotina), não do programa.
+#
+# Com um otimizador (OtimizadorPeephole), cada bloco é otimizado antes de ser escrito.
+# Os padrões das regras têm no máximo 3 instruções: as últimas CAUDA instruções já
+# otimizadas ficam retidas e entram no bloco seguinte (ex.: um STOREG no fim de uma
+# instrução e o PUSHG da mesma variável no início da seguinte). As referências do código
+# já escrito aos rótulos retidos e os rótulos das sub-rotinas (que podem ser chamadas de
+# blocos ainda por gerar) contam como referências externas ao bloco. O resultado é o de
+# otimizar o programa inteiro, exceto que o rótulo de uma sub-rotina nunca chamada não é
+# removido.
+
+from collections import Counter
+
+from instrucoes import Codigo, ROTULO, REFERENCIAS_ROTULO
+
+# Caracteres de texto acumulados antes de cada escrita no ficheiro
+TAMANHO_BUFFER = 1 << 16
+# Instruções que o gerador junta antes de entregar um bloco (cada bloco tem o custo fixo
+# de uma chamada ao otimizador)
+BLOCO_MINIMO = 1024
+# Instruções otimizadas retidas para o bloco seguinte (tamanho máximo dos padrões - 1)
+CAUDA = 2
+
+
+class SaidaContinua:
+    """
+    Destino das instruções do CodeGenerator em modo contínuo. Uso:
+        with open('programa.vm', 'w') as f:
+            saida = SaidaContinua(f, OtimizadorPeephole())   # ou sem otimizador
+            gen = CodeGenerator(saida=saida)
+            gen.build_symtab(ast)
+            gen.gen(ast)
+            saida.fechar()
+    Atributos:
+        bloco_minimo (int): Instruções a partir das quais o gerador entrega um bloco.
+        instrucoes (int): Instruções escritas.
+        blocos (int): Blocos recebidos do gerador.
+        maior_bloco (int): Instruções do maior bloco recebido.
+    """
+
+    def __init__(self, ficheiro, otimizador=None, tamanho_buffer=TAMANHO_BUFFER, bloco_minimo=BLOCO_MINIMO):
+        self.ficheiro = ficheiro
+        self.otimizador = otimizador
+        self.tamanho_buffer = tamanho_buffer
+        self.bloco_minimo = bloco_minimo
+        self.instrucoes = 0
+        self.blocos = 0
+        self.maior_bloco = 0
+        self._buffer = []
+        self._tamanho = 0
+        self._cauda = Codigo()
+        # Rótulo ainda não escrito -> referências de fora do bloco em otimização: as das
+        # sub-rotinas reservadas e as do código escrito aos rótulos retidos na cauda
+        self._externas = Counter()
+        # Rótulo retido na cauda -> referências do código escrito que lhe foram contadas
+        self._na_cauda = {}
+
+    def reservar(self, rotulos):
+        """Conta cada rótulo de 'rotulos' como referido por código ainda não gerado."""
+        for rotulo in rotulos:
+            self._externas[rotulo] += 1
+
+    def receber(self, codigo):
+        """Recebe um bloco completo de instruções (um Codigo) do gerador."""
+        self.blocos += 1
+        if len(codigo) > self.maior_bloco:
+            self.maior_bloco = len(codigo)
+        if self.otimizador is None:
+            self._escrever(codigo)
+            return
+        entrada = self._cauda
+        entrada.extend(codigo)
+        otimizado = self.otimizador.otimizar(entrada, self._externas)
+        corte = max(len(otimizado) - CAUDA, 0)
+        pronto = Codigo(otimizado.ops[:corte], otimizado.args[:corte])
+        self._cauda = Codigo(otimizado.ops[corte:], otimizado.args[corte:])
+        self._atualizar_externas(pronto)
+        self._escrever(pronto)
+
+    def _atualizar_externas(self, pronto):
+        # Só contam as referências aos rótulos que as regras ainda vão ver: os rótulos dos
+        # blocos seguintes são referidos só dentro desses blocos, exceto os reservados
+        externas = self._externas
+        for rotulo, n in self._na_cauda.items():
+            if externas[rotulo] > n:
+                externas[rotulo] -= n
+            else:
+                externas.pop(rotulo, None)
+        for op, arg in pronto.instrucoes():
+            if op == ROTULO:
+                externas.pop(arg, None)
+        # Um rótulo que continua retido guarda as referências que já tinha
+        na_cauda = {arg: self._na_cauda.get(arg, 0) for op, arg in self._cauda.instrucoes() if op == ROTULO}
+        if na_cauda:
+            for op, arg in pronto.instrucoes():
+                if op in REFERENCIAS_ROTULO and arg in na_cauda:
+                    na_cauda[arg] += 1
+            for rotulo, n in na_cauda.items():
+                if n:
+                    externas[rotulo] += n
+        self._na_cauda = na_cauda
+
+    def fechar(self):
+        """Escreve as instruções retidas e o buffer (o ficheiro fica aberto)."""
+        if self._cauda:
+            self._escrever(self._cauda)
+            self._cauda = Codigo()
+        self._despejar()
+
+    def _escrever(self, codigo):
+        texto = codigo.texto()
+        self.instrucoes += len(codigo)
+        self._buffer.append(texto)
+        self._tamanho += len(texto)
+        if self._tamanho >= self.tamanho_buffer:
+            self._despejar()
+
+    def _despejar(self):
+        if self._buffer:
+            self.ficheiro.write(''.join(self._buffer))
+            self._buffer = []
+            self._tamanho = 0
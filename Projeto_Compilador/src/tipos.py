@@ -0,0 +1,70 @@
+# Universo canónico dos tipos usados pela análise semântica
+#
+# A análise semântica representa os tipos como strings em minúsculas ('integer', 'real',
+# nomes de records, ...) e tuplos ('array', elem), ('set', elem). Essas representações
+# aparecem tal e qual nas mensagens de erro, por isso mantêm-se; o que muda é que cada tipo
+# passa a existir uma só vez:
+# - os nomes de tipos são strings internadas (canonico('INTEGER') is INTEGER);
+# - os tuplos de array e set são construídos por hash-consing (array_de(INTEGER) devolve
+#   sempre o mesmo objeto).
+# Assim, dois tipos canónicos são iguais se e só se forem o mesmo objeto, e as comparações
+# do analisador passam a ser testes de identidade, sem .lower()/.upper() nem tuplos novos.
+
+import sys
+
+INTEGER = sys.intern('integer')
+REAL = sys.intern('real')
+BOOLEAN = sys.intern('boolean')
+CHAR = sys.intern('char')
+TEXTO = sys.intern('texto')
+ENUM = sys.intern('enum')
+SET = sys.intern('set')
+FILE = sys.intern('file')
+RECORD = sys.intern('record')
+ARRAY = sys.intern('array')
+LABEL = sys.intern('label')
+UNKNOWN = sys.intern('unknown')
+
+NUMERICOS = frozenset((INTEGER, REAL))
+ORDINAIS = frozenset((INTEGER, CHAR, ENUM, BOOLEAN))
+
+# nome (como aparece na AST ou no código) -> string canónica
+_NOMES = {nome: nome for nome in (INTEGER, REAL, BOOLEAN, CHAR, TEXTO, ENUM, SET, FILE, RECORD, ARRAY,
+                                  LABEL, UNKNOWN)}
+# tipo do elemento -> tuplo único
+_ARRAYS = {}
+_SETS = {}
+
+
+def canonico(nome):
+    """String canónica (minúsculas, internada) do nome de tipo 'nome'."""
+    tipo = _NOMES.get(nome)
+    if tipo is None:
+        tipo = _NOMES.get(nome.lower())
+        if tipo is None:
+            tipo = sys.intern(nome.lower())
+            _NOMES[tipo] = tipo
+        _NOMES[nome] = tipo
+    return tipo
+
+
+def _consolidar(tabela, construtor, elem):
+    try:
+        tipo = tabela.get(elem)
+    except TypeError:
+        # Elemento não hashable (ex.: a representação de um record anónimo): não há
+        # instância única, devolve um tuplo novo como antes
+        return (construtor, elem)
+    if tipo is None:
+        tipo = tabela[elem] = (construtor, elem)
+    return tipo
+
+
+def array_de(elem):
+    """O tipo ('array', elem), único para cada tipo de elemento canónico."""
+    return _consolidar(_ARRAYS, ARRAY, elem)
+
+
+def conjunto_de(elem):
+    """O tipo ('set', elem), único para cada tipo de elemento canónico."""
+    return _consolidar(_SETS, SET, elem)
@@ -0,0 +1,43 @@
+# Despacho dos percursos da AST
+#
+# SemanticAnalyzer.visit e CodeGenerator.gen escolhiam o método de cada nó com
+# getattr(self, f"visit_{node[0]}"): uma string formatada e uma procura de atributo em
+# cada visita. Aqui, cada subclasse de Visitante recolhe uma vez (ao ser definida) os
+# seus métodos com o prefixo PREFIXO, e cada instância liga-os no construtor numa tabela
+# tag -> método ligado. O despacho passa a ser uma só indexação: tabela[node[0]](node).
+
+
+class _TabelaDespacho(dict):
+    """Dicionário tag -> método ligado; as tags sem método devolvem o método 'omissao'."""
+    __slots__ = ('omissao',)
+
+    def __init__(self, omissao):
+        super().__init__()
+        self.omissao = omissao
+
+    def __missing__(self, tag):
+        return self.omissao
+
+
+class Visitante:
+    """
+    Classe base dos percursos da AST de tuplos. As subclasses definem PREFIXO (ex.:
+    'visit_') e os métodos PREFIXO + tag; a tabela da classe inclui os métodos herdados.
+    """
+    PREFIXO = None
+    # tag -> função (não ligada), calculado uma vez por classe
+    _FUNCOES = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.PREFIXO:
+            n = len(cls.PREFIXO)
+            cls._FUNCOES = {nome[n:]: getattr(cls, nome) for nome in dir(cls)
+                            if nome.startswith(cls.PREFIXO) and callable(getattr(cls, nome))}
+
+    def tabela_despacho(self, omissao):
+        """Liga os métodos da classe a esta instância. 'omissao' trata as tags sem método."""
+        tabela = _TabelaDespacho(omissao)
+        for tag, funcao in self._FUNCOES.items():
+            tabela[tag] = funcao.__get__(self, type(self))
+        return tabela
@@ -0,0 +1,5 @@
+# Os testes importam os módulos do compilador diretamente de ../src
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
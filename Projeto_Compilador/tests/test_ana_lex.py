@@ -0,0 +1,121 @@
+# Testes diferenciais do StreamingLexer e do relex_incremental: os tokens lidos do
+# ficheiro em blocos pequenos, ou atualizados após uma edição, têm de ser iguais aos do
+# lexer PLY sobre o texto todo
+import random
+
+import pytest
+
+from ana_lex import build_lexer, StreamingLexer, CompactTokenStream, relex_incremental
+
+# Pedaços de texto juntos ao acaso (com ou sem espaços entre eles): palavras-reservadas
+# coladas a números, strings com "''", comentários e mudanças de linha
+PEDACOS = ("begin", "end", "do", "div", "x", "_y1", "1", "10", "3.14", "2.5e3", ":=", "..", "(",
+           ")", "*", ";", "'a'", "'it''s'", "''''", "'xyz'", "{ c }", "{ a\nb }", "(* d *)",
+           "(* e\n*)", "\n", "\r\n", "é")
+
+
+def _texto_aleatorio(aleatorio, n):
+    partes = []
+    for _ in range(n):
+        partes.append(aleatorio.choice(PEDACOS))
+        partes.append(aleatorio.choice(("", "", " ", "\n")))
+    return "".join(partes)
+
+
+def _tokens(lexer):
+    return [(tok.type, tok.value, tok.lineno, tok.lexpos) for tok in iter(lexer.token, None)]
+
+
+def _comparar(tmp_path, texto, tamanho_bloco, modo='regras'):
+    caminho = tmp_path / 'fonte.pas'
+    caminho.write_bytes(texto.encode('utf-8'))
+    esperado = build_lexer(modo)
+    esperado.input(texto.replace('\r\n', '\n'))
+    with StreamingLexer(str(caminho), modo=modo, tamanho_bloco=tamanho_bloco) as lexer:
+        assert _tokens(lexer) == _tokens(esperado)
+
+
+@pytest.mark.parametrize('modo', ('regras', 'tabela'))
+@pytest.mark.parametrize('tamanho_bloco', (1, 7, 64, 512))
+def test_streaming_igual_ao_lexer_completo(tmp_path, capsys, modo, tamanho_bloco):
+    aleatorio = random.Random(tamanho_bloco)
+    for _ in range(40):
+        _comparar(tmp_path, _texto_aleatorio(aleatorio, aleatorio.randint(1, 400)), tamanho_bloco, modo)
+
+
+def test_palavra_reservada_colada_a_numero_no_recarregamento(tmp_path):
+    # '1end' / '10do' são INTEGER + ID, mesmo com o recomeço da janela entre eles
+    _comparar(tmp_path, "x := 1end; y := 10do\n" * 200, 16)
+
+
+def test_string_com_aspas_duplicadas_depois_da_janela(tmp_path):
+    _comparar(tmp_path, "writeln('it''s " + "x" * 1000 + "');\n", 512)
+
+
+PROGRAMA = """program P;
+var i, s: integer;
+begin
+  { comentario }
+  s := 0;
+  for i := 1 to 10 do s := s + i;
+  (* outro
+     comentario *)
+  writeln('soma: ', s, 'it''s');
+  writeln(s)
+end.
+"""
+
+
+def _colunas(fluxo):
+    return [(fluxo.tipo(i), fluxo.valor(i), fluxo.inicios[i], fluxo.fins[i], fluxo.linhas[i])
+            for i in range(len(fluxo))]
+
+
+def _editar(texto, offset, apagados, inseridos, modo='regras'):
+    lexer = build_lexer(modo)
+    novo = relex_incremental(CompactTokenStream(texto, lexer), offset, apagados, inseridos, lexer)
+    completo = CompactTokenStream(texto[:offset] + inseridos + texto[offset + apagados:], build_lexer(modo))
+    assert novo.texto == completo.texto
+    assert _colunas(novo) == _colunas(completo)
+    assert novo.instaveis == completo.instaveis
+
+
+@pytest.mark.parametrize('modo', ('regras', 'tabela'))
+@pytest.mark.parametrize('offset, apagados, inseridos', [
+    # Início, meio e fim do texto
+    (0, 0, "{ cabecalho }\n"),
+    (0, 7, "program"),
+    (0, 8, ""),
+    (PROGRAMA.index("s := 0"), 6, "s := 10 div 2"),
+    (PROGRAMA.index("10 do"), 2, "1end"),
+    (PROGRAMA.index("to 10"), 2, "downto"),
+    (len(PROGRAMA) - 5, 5, "end;"),
+    (len(PROGRAMA), 0, "\n{ fim }"),
+    # Dentro de strings: alterar, fechar antes do tempo, duplicar a aspa
+    (PROGRAMA.index("soma: "), 4, "total"),
+    (PROGRAMA.index("soma: ") + 2, 0, "'"),
+    (PROGRAMA.index("it''s") + 2, 1, ""),
+    (PROGRAMA.index("it''s"), 0, "''"),
+    # Dentro de comentários: alterar, abrir e fechar
+    (PROGRAMA.index("comentario }"), 10, "nota"),
+    (PROGRAMA.index("{ comentario }") + 13, 1, ""),
+    (PROGRAMA.index("outro"), 0, "*) x := 1; (*"),
+    (PROGRAMA.index("(* outro") + 1, 1, ""),
+    (PROGRAMA.index("comentario *)") + 11, 2, ""),
+    (PROGRAMA.index("s := 0"), 0, "(* "),
+])
+def test_relex_incremental_igual_ao_completo(capsys, modo, offset, apagados, inseridos):
+    _editar(PROGRAMA, offset, apagados, inseridos, modo)
+
+
+def test_relex_incremental_edicoes_sucessivas(capsys):
+    aleatorio = random.Random(0)
+    lexer = build_lexer('tabela')
+    fluxo = CompactTokenStream(PROGRAMA * 5, lexer)
+    for _ in range(300):
+        offset = aleatorio.randint(0, len(fluxo.texto))
+        apagados = aleatorio.randint(0, min(3, len(fluxo.texto) - offset))
+        inseridos = aleatorio.choice(PEDACOS) if aleatorio.random() < 0.8 else ""
+        fluxo = relex_incremental(fluxo, offset, apagados, inseridos, lexer)
+        completo = CompactTokenStream(fluxo.texto, build_lexer('tabela'))
+        assert _colunas(fluxo) == _colunas(completo)
@@ -0,0 +1,25 @@
+# Teste diferencial: o parser descendente (ana_sin_descendente.py) tem de produzir a
+# mesma AST e os mesmos erros sintáticos que o parser LALR em todos os tests/*.pas
+import glob
+import os
+
+import pytest
+
+from ana_sin import parse
+from ana_sin_descendente import parse_descendente
+
+PROGRAMAS = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.pas')))
+
+
+def _erros(diagnosticos):
+    return [(d.lineno, d.lexpos, d.token, d.valor, d.mensagem) for d in diagnosticos]
+
+
+@pytest.mark.parametrize('caminho', PROGRAMAS, ids=os.path.basename)
+def test_descendente_igual_ao_lalr(capsys, caminho):
+    with open(caminho, encoding='utf-8') as f:
+        codigo = f.read()
+    esperado, erros_esperados = parse(codigo, diagnosticos=True)
+    arvore, erros = parse_descendente(codigo, diagnosticos=True)
+    assert arvore == esperado
+    assert _erros(erros) == _erros(erros_esperados)
@@ -0,0 +1,95 @@
+# Testes do CodeGenerator: os programas são compilados por main.compilar e executados no
+# simulador da VM de desempenho.py, com e sem cada otimização
+import os
+
+import main
+from desempenho import contar_instrucoes
+from instrucoes import CALL
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+
+
+def _executar(codigo, **opcoes):
+    gen = main.compilar(codigo, opcoes=main.OpcoesGeracao(**opcoes))
+    _, saida = contar_instrucoes(gen.code)
+    return saida
+
+
+# O valor inicial do for chama uma function (expandida em linha) que altera a variável
+# do limite final: o limite invariante só pode ser calculado depois do valor inicial
+FOR_INICIO_ALTERA_LIMITE = """program r;
+var a, i, s: integer;
+function g(x: integer): integer;
+begin
+  a := 10;
+  g := x
+end;
+begin
+  a := 1;
+  s := 0;
+  for i := g(1) to a + 1 do s := s + 1;
+  writeln(s)
+end.
+"""
+
+
+def test_invariantes_do_for_depois_do_valor_inicial(capsys):
+    assert _executar(FOR_INICIO_ALTERA_LIMITE, invariantes=False) == "11\n"
+    assert _executar(FOR_INICIO_ALTERA_LIMITE) == "11\n"
+
+
+def _compilar_teste(nome, **opcoes):
+    with open(os.path.join(PASTA, nome), encoding='utf-8') as f:
+        return main.compilar(f.read(), opcoes=main.OpcoesGeracao(**opcoes))
+
+
+# A function de test7_with_functions.pas é expandida em linha: o programa compila (o
+# gerador não gera sub-rotinas fora de linha), com ou sem a eliminação de código morto,
+# e o código é o do .vm guardado
+def test_expansao_test7_with_functions(capsys):
+    with open(os.path.join(PASTA, 'test7_with_functions.vm')) as f:
+        esperado = f.read().splitlines()
+    for eliminar in (True, False):
+        gen = _compilar_teste('test7_with_functions.pas', eliminar=eliminar)
+        assert [d.nome for d in gen.plano_expansao.decisoes if d.expandida] == ['BinToInt']
+        assert gen.chamadas_expandidas == 1
+        assert gen.code.linhas() == esperado
+        assert all(op != CALL for op, _ in gen.code.instrucoes())
+
+
+# Parâmetros var e por valor, variáveis locais e resultado de uma function expandidos
+# em linha, incluindo uma chamada dentro de outra sub-rotina expandida
+EXPANSAO_PARAMETROS = """program e;
+var a, b, r: integer;
+procedure troca(var x, y: integer);
+var t: integer;
+begin
+  t := x;
+  x := y;
+  y := t
+end;
+function soma(x, y: integer): integer;
+begin
+  x := x + y;
+  soma := x
+end;
+function dobro(x: integer): integer;
+begin
+  dobro := soma(x, x)
+end;
+begin
+  a := 1;
+  b := 2;
+  troca(a, b);
+  r := soma(a, b * 10) + dobro(a);
+  writeln(a);
+  writeln(b);
+  writeln(r)
+end.
+"""
+
+
+def test_expansao_parametros(capsys):
+    gen = main.compilar(EXPANSAO_PARAMETROS)
+    assert gen.chamadas_expandidas == 4
+    assert contar_instrucoes(gen.code)[1] == "2\n1\n16\n"